@@ -12,6 +12,8 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, Sequence
 
+from onepass.text_index import QGramIndex
+
 try:  # pragma: no cover - 运行时可选依赖
     from pypinyin import Style, lazy_pinyin
 except Exception:  # pragma: no cover - 容忍未安装 pypinyin
@@ -28,8 +30,6 @@ LOGGER = logging.getLogger(__name__)
 _RE_SPACE = re.compile(r"\s+")
 _CJK_RE = re.compile(r"[\u3400-\u9fff]")
 _DEFAULT_ALIAS_PATH = Path(__file__).resolve().parents[1] / "config" / "alias_map_zh.json"
-_HASH_BASE = 257
-_HASH_MASK = (1 << 64) - 1
 
 
 @dataclass(slots=True)
@@ -152,57 +152,6 @@ def _first_key(char: str) -> str:
     return char[0]
 
 
-def _rolling_hash_power(base: int, exp: int) -> int:
-    if exp <= 0:
-        return 1
-    return pow(base, exp, 1 << 64)
-
-
-def _fast_candidates(words_chars: str, line_chars: str, k: int, limit: int) -> list[int]:
-    if not words_chars or not line_chars or limit <= 0:
-        return []
-    limit = max(1, limit)
-    max_k = min(max(k, 3), len(words_chars), len(line_chars))
-    best_hits: dict[int, int] = {}
-    for current_k in range(max_k, 2, -1):
-        if len(line_chars) < current_k or len(words_chars) < current_k:
-            continue
-        high = _rolling_hash_power(_HASH_BASE, current_k - 1)
-        index: dict[int, list[int]] = {}
-        hash_value = 0
-        for idx, ch in enumerate(words_chars):
-            hash_value = ((hash_value * _HASH_BASE) + ord(ch)) & _HASH_MASK
-            if idx + 1 >= current_k:
-                start = idx + 1 - current_k
-                index.setdefault(hash_value, []).append(start)
-                leading = ord(words_chars[start])
-                hash_value = (hash_value - (leading * high)) & _HASH_MASK
-        if not index:
-            continue
-        line_hash = 0
-        for idx, ch in enumerate(line_chars):
-            line_hash = ((line_hash * _HASH_BASE) + ord(ch)) & _HASH_MASK
-            if idx + 1 >= current_k:
-                candidate_positions = index.get(line_hash)
-                if candidate_positions:
-                    segment = line_chars[idx + 1 - current_k : idx + 1]
-                    for pos in candidate_positions:
-                        if words_chars[pos : pos + current_k] == segment:
-                            best_hits[pos] = best_hits.get(pos, 0) + 1
-                leading = ord(line_chars[idx + 1 - current_k])
-                line_hash = (line_hash - (leading * high)) & _HASH_MASK
-        if best_hits:
-            break
-    if not best_hits:
-        snippet_len = min(max_k, len(line_chars))
-        snippet = line_chars[:snippet_len]
-        pos = words_chars.find(snippet)
-        if pos >= 0:
-            best_hits[pos] = 1
-    ordered = sorted(best_hits.items(), key=lambda item: (-item[1], item[0]))
-    return [pos for pos, _ in ordered[:limit]]
-
-
 def _coarse_features(text: str) -> dict[str, int]:
     if not text:
         return {}
@@ -252,6 +201,7 @@ class StableMatcher:
         self._processed = processed
         self._map = mapping
         self._first_keys = "".join(_first_key(ch) for ch in self._processed)
+        self._qgrams = QGramIndex(self._processed)
         self._alias_pairs = _load_alias_pairs(alias_map_path)
 
     def match(self, request: MatchRequest) -> MatchResponse:
@@ -259,7 +209,7 @@ class StableMatcher:
         if not target_processed:
             return MatchResponse(False, None, None, 1.0, "", "", 0, 0, 0, 0, 0.0)
         target_keys = "".join(_first_key(ch) for ch in target_processed)
-        candidates = _fast_candidates(self._processed, target_processed, request.min_anchor_ngram, request.max_windows)
+        candidates = self._qgrams.candidates(target_processed, request.min_anchor_ngram, request.max_windows)
         LOGGER.info(
             "stable-match: candidates=%s target_len=%s anchor=%s ratio=%.2f",
             len(candidates),
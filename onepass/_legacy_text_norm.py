@@ -10,6 +10,9 @@ import unicodedata  # 进行 Unicode 归一化
 from pathlib import Path  # 使用 Path 处理路径
 from typing import Any, Dict, Mapping, Sequence
 
+from .alias_matcher import cached_matcher
+from .norm_memo import memoize_normalizer
+
 try:  # 优先复用脚本目录实现的折行规则，便于单独调试
     from scripts.text_normalize import collapse_lines_preserve_spacing_rules
 except ModuleNotFoundError:  # pragma: no cover - fallback when脚本不可用
@@ -229,7 +232,16 @@ def apply_alias_map(text: str, alias_map: Mapping[str, Sequence[str]] | None) ->
 
     if not alias_map or not text:
         return text
-    result = text
+    return cached_matcher("legacy", alias_map, lambda: _alias_rules(alias_map)).apply(text)
+
+
+def _alias_rules(alias_map: Mapping[str, Sequence[str]]) -> list[tuple[str, str]]:
+    """按原有遍历顺序展开 (变体, 主形) 替换规则。
+
+    :class:`AliasMatcher` 逐条等价于 ``str.replace``，但只处理文本中实际出现的变体。
+    """
+
+    rules: list[tuple[str, str]] = []
     for canonical, variants in alias_map.items():
         canonical_str = str(canonical or "").strip()
         if not canonical_str:
@@ -238,8 +250,8 @@ def apply_alias_map(text: str, alias_map: Mapping[str, Sequence[str]] | None) ->
             variant_str = str(variant or "").strip()
             if not variant_str or variant_str == canonical_str:
                 continue
-            result = result.replace(variant_str, canonical_str)
-    return result
+            rules.append((variant_str, canonical_str))
+    return rules
 
 
 def normalize_text(
@@ -914,8 +926,9 @@ _RE_ALIGN_ASCII_WORD_SPACE = re.compile(
 )
 
 
+@memoize_normalizer("align")
 def normalize_for_align(text: str) -> str:
-    """规范化文本以便做粗对齐。"""
+    """规范化文本以便做粗对齐（短文本结果经 LRU 缓存复用）。"""
 
     text = text.translate(_REMOVE_ZERO_WIDTH)  # 删除零宽与控制字符
     text = unicodedata.normalize("NFKC", text)  # 使用 NFKC 统一全半角
@@ -0,0 +1,211 @@
+"""Compiled alias replacement shared by the text normalizers."""
+from __future__ import annotations
+
+from bisect import bisect_right
+from heapq import heapify, heappop, heappush
+from typing import Callable, Dict, Iterable, List, Tuple
+
+__all__ = ["AliasMatcher", "cached_matcher"]
+
+
+class AliasMatcher:
+    """Apply an ordered list of ``str.replace`` rules via one Aho–Corasick scan.
+
+    The result is identical to running ``text = text.replace(key, value)`` for
+    every rule in order. A rule whose key is absent is a no-op, so one scan
+    collects the keys present in the text and only their rules are visited,
+    in rule order. A replacement can only create a new key occurrence around
+    the spots it rewrote, so after each one just those windows are rescanned
+    and the rules of newly present keys are queued. Cascades, where an
+    earlier replacement creates or destroys a later key, therefore behave
+    exactly as before, while typical text costs one pass instead of one
+    ``str.replace`` per rule.
+    """
+
+    __slots__ = (
+        "rules",
+        "_goto",
+        "_fail",
+        "_outputs",
+        "_dict_link",
+        "_key_rules",
+        "_empty_rules",
+        "_max_key_len",
+    )
+
+    def __init__(self, rules: Iterable[Tuple[str, str]]) -> None:
+        self.rules: List[Tuple[str, str]] = [
+            (key, value) for key, value in rules if key != value
+        ]
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[int] = [-1]
+        self._key_rules: List[List[int]] = []
+        self._empty_rules: List[int] = []
+        self._max_key_len = 0
+        key_ids: Dict[str, int] = {}
+        for rule_idx, (key, _) in enumerate(self.rules):
+            if not key:
+                self._empty_rules.append(rule_idx)
+                continue
+            key_id = key_ids.get(key)
+            if key_id is None:
+                key_id = key_ids[key] = len(self._key_rules)
+                self._key_rules.append([])
+                self._insert(key, key_id)
+                self._max_key_len = max(self._max_key_len, len(key))
+            self._key_rules[key_id].append(rule_idx)
+        self._build_links()
+
+    def _insert(self, key: str, key_id: int) -> None:
+        goto = self._goto
+        state = 0
+        for ch in key:
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][ch] = nxt
+                goto.append({})
+                self._outputs.append(-1)
+            state = nxt
+        self._outputs[state] = key_id
+
+    def _build_links(self) -> None:
+        goto = self._goto
+        outputs = self._outputs
+        fail = [0] * len(goto)
+        dict_link = [-1] * len(goto)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                back = fail[state]
+                while back and ch not in goto[back]:
+                    back = fail[back]
+                link = fail[nxt] = goto[back].get(ch, 0)
+                dict_link[nxt] = link if outputs[link] >= 0 else dict_link[link]
+        self._fail = fail
+        self._dict_link = dict_link
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def _present_keys(self, text: str) -> List[int]:
+        """Return the id of every key occurring in *text* (overlaps included)."""
+
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        dict_link = self._dict_link
+        seen = set()
+        found: List[int] = []
+        state = 0
+        for ch in text:
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            if not state or state in seen:
+                continue
+            seen.add(state)
+            if outputs[state] >= 0:
+                found.append(outputs[state])
+            # Every state on the dictionary-link chain is a suffix match too;
+            # stop at the first one collected earlier in this scan.
+            probe = dict_link[state]
+            while probe > 0 and probe not in seen:
+                seen.add(probe)
+                found.append(outputs[probe])
+                probe = dict_link[probe]
+        return found
+
+    def _changed_windows(self, text: str, key: str, value: str) -> List[Tuple[int, int]]:
+        """Return spans of ``text.replace(key, value)`` that may hold new keys.
+
+        Any new occurrence overlaps an inserted *value* (or, for an empty
+        value, straddles the junction left behind), so it fits in a window of
+        ``max_key_len - 1`` characters around each insertion.
+        """
+
+        reach = self._max_key_len - 1
+        shift = len(value) - len(key)
+        windows: List[Tuple[int, int]] = []
+        count = 0
+        pos = text.find(key)
+        while pos >= 0:
+            start = pos + count * shift
+            lo = max(0, start - reach)
+            hi = start + len(value) + reach
+            if windows and lo <= windows[-1][1]:
+                windows[-1] = (windows[-1][0], hi)
+            else:
+                windows.append((lo, hi))
+            count += 1
+            pos = text.find(key, pos + len(key))
+        return windows
+
+    def apply(self, text: str) -> str:
+        """Return *text* with every rule applied in order."""
+
+        if not text or not self.rules:
+            return text
+        rules = self.rules
+        key_rules = self._key_rules
+        queued = set(self._empty_rules)
+        for key_id in self._present_keys(text):
+            queued.update(key_rules[key_id])
+        heap = list(queued)
+        heapify(heap)
+        while heap:
+            rule_idx = heappop(heap)
+            key, value = rules[rule_idx]
+            if key and key not in text:
+                continue  # destroyed by an earlier replacement
+            if key:
+                windows = self._changed_windows(text, key, value)
+                text = text.replace(key, value)
+                found = [
+                    key_id
+                    for lo, hi in windows
+                    for key_id in self._present_keys(text[lo:hi])
+                ]
+            else:
+                text = text.replace(key, value)
+                found = self._present_keys(text)
+            for key_id in found:
+                indices = key_rules[key_id]
+                for later in indices[bisect_right(indices, rule_idx) :]:
+                    if later not in queued:
+                        queued.add(later)
+                        heappush(heap, later)
+        return text
+
+
+_CACHE: Dict[Tuple[str, int], Tuple[object, int, AliasMatcher]] = {}
+_CACHE_LIMIT = 64
+
+
+def cached_matcher(
+    kind: str,
+    source: object,
+    build_rules: Callable[[], Iterable[Tuple[str, str]]],
+) -> AliasMatcher:
+    """Return the matcher compiled from *source*, building it on first use.
+
+    Entries are keyed by ``(kind, id(source))`` and keep *source* alive so the
+    id cannot be reused; a change in ``len(source)`` triggers a rebuild.
+    """
+
+    cache_key = (kind, id(source))
+    size = len(source)  # type: ignore[arg-type]
+    entry = _CACHE.get(cache_key)
+    if entry is not None and entry[0] is source and entry[1] == size:
+        return entry[2]
+    matcher = AliasMatcher(build_rules())
+    if len(_CACHE) >= _CACHE_LIMIT:
+        _CACHE.clear()
+    _CACHE[cache_key] = (source, size, matcher)
+    return matcher
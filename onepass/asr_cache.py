@@ -0,0 +1,319 @@
+"""词级 ASR 规范化结果的磁盘缓存。
+
+同一份词级 JSON 在调参重跑时会反复经历解析、逐词规范化、拼接字符映射与
+构建 token 流。本模块把这些结果按内容哈希写成紧凑的二进制文件（默认位于
+``out/.cache/asr/``），后续运行通过 ``mmap`` 直接载入：各数据段按块拷贝成
+数组后即关闭映射，长驻进程（Web 服务）不会累积映射与文件句柄。
+"""
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Mapping, Sequence
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+
+from .asr_loader import Word, WordArray, load_words
+from .canonicalize import CanonicalAliasMap
+from .match_core import TokenStream, build_token_stream
+from .norm_memo import NORMALIZER_VERSION
+from .text_index import SuffixArrayIndex
+
+LOGGER = logging.getLogger(__name__)
+
+
+_MAGIC = b"OPASRC01"
+_HEADER = struct.Struct("<8sI")
+_ALIGN = 8
+
+
+@dataclass(slots=True)
+class NormalizedASR:
+    """词级 JSON 规范化后的完整结果，可直接交给 ``compute_retake_keep_last``。"""
+
+    words: WordArray
+    normalized_words: list[str]
+    asr_norm_str: str
+    char_map: list[tuple[int, int]]
+    token_stream: TokenStream
+    meta: dict = field(default_factory=dict)
+    cache_hit: bool = False
+
+
+def _alias_payload(alias: Mapping | CanonicalAliasMap | None) -> object:
+    if alias is None:
+        return None
+    mapping = alias.mapping if isinstance(alias, CanonicalAliasMap) else alias
+    return sorted(
+        (str(key), list(value) if isinstance(value, (list, tuple)) else value)
+        for key, value in mapping.items()
+    )
+
+
+def asr_cache_key(
+    raw: bytes | Path,
+    alias_map: Mapping[str, Sequence[str]] | None = None,
+    match_alias_map: Mapping[str, str] | CanonicalAliasMap | None = None,
+) -> str:
+    """返回 (JSON 内容, 别名表, 规范化版本) 对应的缓存键。
+
+    ``raw`` 传入路径时分块读取文件计算哈希，不把整个 JSON 读入内存。
+    """
+
+    digest = hashlib.sha1()
+    if isinstance(raw, Path):
+        with raw.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+    else:
+        digest.update(raw)
+    extra = {
+        "version": NORMALIZER_VERSION,
+        "alias_map": _alias_payload(alias_map),
+        "match_alias_map": _alias_payload(match_alias_map),
+    }
+    digest.update(json.dumps(extra, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def normalize_asr(
+    words: Sequence[Word],
+    *,
+    alias_map: Mapping[str, Sequence[str]] | None = None,
+    match_alias_map: Mapping[str, str] | CanonicalAliasMap | None = None,
+    build_index: bool = False,
+    meta: dict | None = None,
+) -> NormalizedASR:
+    """在内存中完成逐词规范化、字符映射与 token 流构建。"""
+
+    from .retake_keep_last import _normalize_words  # 延迟导入避免循环依赖
+
+    word_list = WordArray.from_words(words)
+    normalized_words, asr_norm_str, char_map = _normalize_words(word_list, alias_map)
+    stream = build_token_stream(word_list, match_alias_map, build_index=build_index)
+    return NormalizedASR(
+        words=word_list,
+        normalized_words=list(normalized_words),
+        asr_norm_str=asr_norm_str,
+        char_map=list(char_map),
+        token_stream=stream,
+        meta=dict(meta or {}),
+    )
+
+
+def _pack_strings(values: Sequence[str]) -> tuple[bytes, array]:
+    offsets = array("q", [0])
+    chunks: list[bytes] = []
+    cursor = 0
+    for value in values:
+        encoded = value.encode("utf-8", "surrogatepass")
+        chunks.append(encoded)
+        cursor += len(encoded)
+        offsets.append(cursor)
+    return b"".join(chunks), offsets
+
+
+def _unpack_strings(blob: bytes, offsets: Sequence[int]) -> list[str]:
+    return [
+        blob[offsets[idx] : offsets[idx + 1]].decode("utf-8", "surrogatepass")
+        for idx in range(len(offsets) - 1)
+    ]
+
+
+def write_asr_cache(path: Path, normalized: NormalizedASR) -> None:
+    """把规范化结果写成单个二进制缓存文件（先写临时文件再原子替换）。"""
+
+    words = WordArray.from_words(normalized.words)
+    stream = normalized.token_stream
+    norm_blob, norm_offsets = _pack_strings(normalized.normalized_words)
+    sections: list[tuple[str, bytes]] = [
+        ("starts", words.starts.tobytes()),
+        ("ends", words.ends.tobytes()),
+        ("char_map", array("q", (value for pair in normalized.char_map for value in pair)).tobytes()),
+        ("boundaries", array("q", stream.char_boundaries).tobytes()),
+        ("word_offsets", words.offsets.tobytes()),
+        ("norm_offsets", norm_offsets.tobytes()),
+        ("word_blob", words.buffer.encode("utf-8", "surrogatepass")),
+        ("norm_blob", norm_blob),
+        ("asr_norm_str", normalized.asr_norm_str.encode("utf-8", "surrogatepass")),
+        ("canonical_text", stream.canonical_text.encode("utf-8", "surrogatepass")),
+    ]
+    if stream.anchor_index is not None:
+        sections.append(("suffixes", array("i", stream.anchor_index.suffixes).tobytes()))
+    layout: dict[str, list[int]] = {}
+    cursor = 0
+    for name, data in sections:
+        layout[name] = [cursor, len(data)]
+        cursor += len(data) + (-len(data)) % _ALIGN
+    header = json.dumps(
+        {
+            "version": NORMALIZER_VERSION,
+            "byteorder": sys.byteorder,
+            "count": len(words),
+            "alias_hits": stream.alias_hits,
+            "meta": normalized.meta,
+            "sections": layout,
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+    header += b" " * ((-(_HEADER.size + len(header))) % _ALIGN)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(_HEADER.pack(_MAGIC, len(header)))
+        handle.write(header)
+        for _, data in sections:
+            handle.write(data)
+            handle.write(b"\0" * ((-len(data)) % _ALIGN))
+    os.replace(tmp_path, path)
+
+
+def read_asr_cache(path: Path) -> NormalizedASR | None:
+    """通过 mmap 载入缓存；格式或版本不符时返回 ``None``。"""
+
+    try:
+        with path.open("rb") as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    view = memoryview(mapped)
+    try:
+        magic, header_len = _HEADER.unpack_from(view, 0)
+        if magic != _MAGIC:
+            return None
+        header = json.loads(bytes(view[_HEADER.size : _HEADER.size + header_len]).decode("utf-8"))
+        if header.get("version") != NORMALIZER_VERSION or header.get("byteorder") != sys.byteorder:
+            return None
+        base = _HEADER.size + header_len
+        layout = header["sections"]
+
+        def _section(name: str) -> memoryview:
+            offset, size = layout[name]
+            return view[base + offset : base + offset + size]
+
+        count = int(header["count"])
+        # 词文本以字符偏移写入（``word_offsets`` 为字符位置而非字节位置）
+        starts = array("d")
+        starts.frombytes(_section("starts"))
+        ends = array("d")
+        ends.frombytes(_section("ends"))
+        offsets = array("q")
+        offsets.frombytes(_section("word_offsets"))
+        buffer = bytes(_section("word_blob")).decode("utf-8", "surrogatepass")
+        normalized_words = _unpack_strings(bytes(_section("norm_blob")), _section("norm_offsets").cast("q"))
+        if (
+            len(starts) != count
+            or len(ends) != count
+            or len(offsets) != count + 1
+            or offsets[-1] != len(buffer)
+            or len(normalized_words) != count
+        ):
+            return None
+        words = WordArray(buffer, offsets, starts, ends)
+        flat_map = _section("char_map").cast("q").tolist()
+        char_map = list(zip(flat_map[0::2], flat_map[1::2]))
+        canonical = bytes(_section("canonical_text")).decode("utf-8", "surrogatepass")
+        anchor_index = None
+        if "suffixes" in layout:
+            suffixes = array("i")
+            suffixes.frombytes(_section("suffixes"))
+            anchor_index = SuffixArrayIndex.from_suffixes(canonical, suffixes)
+        stream = TokenStream(
+            tokens=words,
+            canonical_text=canonical,
+            raw_text=words.buffer,
+            starts=words.starts,
+            ends=words.ends,
+            char_boundaries=_section("boundaries").cast("q").tolist(),
+            alias_hits=int(header.get("alias_hits", 0)),
+            anchor_index=anchor_index,
+        )
+        return NormalizedASR(
+            words=words,
+            normalized_words=normalized_words,
+            asr_norm_str=bytes(_section("asr_norm_str")).decode("utf-8", "surrogatepass"),
+            char_map=char_map,
+            token_stream=stream,
+            meta=dict(header.get("meta") or {}),
+            cache_hit=True,
+        )
+    except (KeyError, TypeError, ValueError, struct.error):
+        return None
+    finally:
+        view.release()
+        try:
+            mapped.close()
+        except BufferError:  # pragma: no cover - 残留切片随垃圾回收释放映射
+            pass
+
+
+def load_normalized_asr(
+    json_path: Path,
+    *,
+    alias_map: Mapping[str, Sequence[str]] | None = None,
+    match_alias_map: Mapping[str, str] | CanonicalAliasMap | None = None,
+    build_index: bool = False,
+    cache_dir: Path | None = None,
+) -> NormalizedASR:
+    """加载词级 JSON 的规范化结果，命中缓存时跳过解析与规范化。
+
+    ``cache_dir`` 为 ``None`` 时等价于 ``load_words`` + :func:`normalize_asr`。
+    缓存写入失败只记录警告，不影响本次结果。
+    """
+
+    if cache_dir is None:
+        doc = load_words(json_path)
+        return normalize_asr(
+            doc.words,
+            alias_map=alias_map,
+            match_alias_map=match_alias_map,
+            build_index=build_index,
+            meta=doc.meta,
+        )
+    try:
+        key = asr_cache_key(json_path, alias_map, match_alias_map)
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"未找到词级 JSON 文件: {json_path}. 请确认路径正确或素材已导出。") from exc
+    cache_path = Path(cache_dir) / f"{key}.bin"
+    cached = read_asr_cache(cache_path) if cache_path.exists() else None
+    if cached is not None and (cached.token_stream.anchor_index is not None or not build_index):
+        cached.meta["source"] = str(json_path)
+        LOGGER.info("[asr-cache] hit stem=%s path=%s", json_path.name, cache_path)
+        return cached
+    if cached is not None:
+        # 旧缓存缺少后缀数组：沿用规范化结果，仅补建索引
+        stream = cached.token_stream
+        stream.anchor_index = SuffixArrayIndex(stream.canonical_text) if stream.canonical_text else None
+        normalized = cached
+    else:
+        doc = load_words(json_path)
+        normalized = normalize_asr(
+            doc.words,
+            alias_map=alias_map,
+            match_alias_map=match_alias_map,
+            build_index=build_index,
+            meta=doc.meta,
+        )
+    try:
+        write_asr_cache(cache_path, normalized)
+        LOGGER.info("[asr-cache] stored stem=%s path=%s", json_path.name, cache_path)
+    except OSError as exc:
+        LOGGER.warning("[asr-cache] 写入缓存失败: %s (%s)", cache_path, exc)
+    return normalized
+
+
+__all__ = [
+    "NORMALIZER_VERSION",
+    "NormalizedASR",
+    "asr_cache_key",
+    "load_normalized_asr",
+    "normalize_asr",
+    "read_asr_cache",
+    "write_asr_cache",
+]
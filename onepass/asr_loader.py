@@ -1,12 +1,19 @@
 """统一的词级 ASR JSON 适配层。"""
 from __future__ import annotations
 
+from array import array
+from collections.abc import Sequence as SequenceABC
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, Iterator, List, Sequence
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, overload
+import io
 import json
 
-from .words_loader import load_tokens
+from .utils.json_stream import JSONStreamReader
+from .words_loader import Token, load_tokens, token_from_entry
+
+STREAM_THRESHOLD_BYTES = 32 * 1024 * 1024
+"""不小于该大小的词级 JSON 在 ``load_words(stream=None)`` 时改用流式解析。"""
 
 
 @dataclass(slots=True)
@@ -23,11 +30,156 @@ class Word:
         return self.end - self.start
 
 
+class WordArray(SequenceABC):
+    """词级序列的列式存储（struct-of-arrays）。
+
+    全部词面拼接为一个字符串 ``buffer``，``offsets`` 记录每个词的字符起点
+    （长度为词数 + 1），起止时间分别存放在 ``array('d')`` 列中。按下标访问
+    返回 :class:`Word` 快照，兼容旧代码的 ``words[i].start`` / 迭代写法；
+    修改快照不会写回数组。热点代码应直接读取 ``starts`` / ``ends`` 列。
+    """
+
+    __slots__ = ("buffer", "offsets", "starts", "ends")
+
+    def __init__(
+        self,
+        buffer: str = "",
+        offsets: array | None = None,
+        starts: array | None = None,
+        ends: array | None = None,
+    ) -> None:
+        self.buffer = buffer
+        self.offsets = offsets if offsets is not None else array("q", [0])
+        self.starts = starts if starts is not None else array("d")
+        self.ends = ends if ends is not None else array("d")
+        if not (len(self.offsets) == len(self.starts) + 1 == len(self.ends) + 1):
+            raise ValueError("WordArray 列长度不一致：offsets 应比 starts/ends 多 1。")
+
+    @classmethod
+    def from_columns(
+        cls,
+        texts: Iterable[str],
+        starts: Iterable[float],
+        ends: Iterable[float],
+    ) -> "WordArray":
+        """由词面、起点、终点三列构建。"""
+
+        text_list = list(texts)
+        offsets = array("q", [0])
+        cursor = 0
+        for text in text_list:
+            cursor += len(text)
+            offsets.append(cursor)
+        return cls("".join(text_list), offsets, array("d", starts), array("d", ends))
+
+    @classmethod
+    def from_words(cls, words: Iterable[Word]) -> "WordArray":
+        """由 :class:`Word` 序列构建；已是 ``WordArray`` 时原样返回。"""
+
+        if isinstance(words, WordArray):
+            return words
+        word_list = list(words)
+        return cls.from_columns(
+            (word.text for word in word_list),
+            (word.start for word in word_list),
+            (word.end for word in word_list),
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def text(self, index: int) -> str:
+        """返回第 ``index`` 个词的词面。"""
+
+        offsets = self.offsets
+        return self.buffer[offsets[index] : offsets[index + 1]]
+
+    def texts(self) -> list[str]:
+        """返回全部词面列表。"""
+
+        buffer = self.buffer
+        offsets = self.offsets
+        return [buffer[offsets[idx] : offsets[idx + 1]] for idx in range(len(self.starts))]
+
+    @overload
+    def __getitem__(self, index: int) -> Word: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "WordArray": ...
+
+    def __getitem__(self, index):
+        count = len(self.starts)
+        if isinstance(index, slice):
+            lo, hi, step = index.indices(count)
+            if step != 1:
+                return self.take(range(lo, hi, step))
+            hi = max(lo, hi)
+            base = self.offsets[lo]
+            return WordArray(
+                self.buffer[base : self.offsets[hi]],
+                array("q", (offset - base for offset in self.offsets[lo : hi + 1])),
+                self.starts[lo:hi],
+                self.ends[lo:hi],
+            )
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("WordArray index out of range")
+        return Word(text=self.text(index), start=self.starts[index], end=self.ends[index])
+
+    def take(self, indices: Iterable[int]) -> "WordArray":
+        """按给定下标顺序取出词，返回新的 ``WordArray``。"""
+
+        picked = list(indices)
+        return WordArray.from_columns(
+            (self.text(idx) for idx in picked),
+            (self.starts[idx] for idx in picked),
+            (self.ends[idx] for idx in picked),
+        )
+
+    def __iter__(self) -> Iterator[Word]:
+        buffer = self.buffer
+        offsets = self.offsets
+        for idx, (start, end) in enumerate(zip(self.starts, self.ends)):
+            yield Word(text=buffer[offsets[idx] : offsets[idx + 1]], start=start, end=end)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, WordArray):
+            return (
+                self.starts == other.starts
+                and self.ends == other.ends
+                and self.texts() == other.texts()
+            )
+        if isinstance(other, SequenceABC) and not isinstance(other, (str, bytes)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"WordArray(count={len(self)}, chars={len(self.buffer)})"
+
+    @property
+    def nbytes(self) -> int:
+        """列数据占用的大致字节数（不含对象头）。"""
+
+        return (
+            len(self.buffer.encode("utf-8", "surrogatepass"))
+            + self.offsets.itemsize * len(self.offsets)
+            + self.starts.itemsize * len(self.starts)
+            + self.ends.itemsize * len(self.ends)
+        )
+
+
 @dataclass(slots=True)
 class ASRDoc:
-    """封装词级序列与可选元数据。"""
+    """封装词级序列与可选元数据。
+
+    ``load_words`` 返回的 ``words`` 为 :class:`WordArray`；手动构造时也可传入
+    ``Word`` 列表。
+    """
 
-    words: List[Word]
+    words: Sequence[Word]
     meta: dict | None = field(default=None)
 
     def __post_init__(self) -> None:
@@ -94,6 +246,56 @@ def _iter_words_from_segment(segment: object) -> Iterable[Word]:
     return parsed
 
 
+class _WordColumns:
+    """增量构建 :class:`WordArray` 的列缓冲，不为每个词保留 Python 对象。"""
+
+    __slots__ = ("_text", "offsets", "starts", "ends")
+
+    def __init__(self) -> None:
+        self._text = io.StringIO()
+        self.offsets = array("q", [0])
+        self.starts = array("d")
+        self.ends = array("d")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def append(self, text: str, start: float, end: float) -> None:
+        self._text.write(text)
+        self.offsets.append(self.offsets[-1] + len(text))
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def to_word_array(self) -> WordArray:
+        return WordArray(self._text.getvalue(), self.offsets, self.starts, self.ends)
+
+
+def _append_token(columns: _WordColumns, token: Token | None) -> None:
+    """按 ``load_tokens`` 的结果追加词：去空白、要求 ``end > start``。"""
+
+    if token is None:
+        return
+    text = str(token.get("text", "")).strip()
+    if not text:
+        return
+    try:
+        start = float(token.get("start", 0.0))
+        end = float(token.get("end", start))
+    except Exception:
+        return
+    if end <= start:
+        return
+    columns.append(text, start, end)
+
+
+def _append_raw(columns: _WordColumns, raw: object) -> None:
+    """按 :func:`_word_from_raw` 的兜底规则追加词。"""
+
+    word = _word_from_raw(raw)
+    if word is not None:
+        columns.append(word.text, word.start, word.end)
+
+
 def _load_raw_json(json_path: Path) -> object:
     """读取 JSON 文件并提供统一的错误信息。"""
 
@@ -116,54 +318,145 @@ def _load_raw_json(json_path: Path) -> object:
         ) from exc
 
 
-def load_words(json_path: Path) -> ASRDoc:
-    """加载词级 ASR JSON 并返回统一数据结构。"""
+def _columns_from_json(json_path: Path) -> _WordColumns:
+    """完整载入 JSON 后提取词列（小文件默认路径）。"""
 
     data = _load_raw_json(json_path)
-    parsed_tokens = load_tokens(data)
-    words: List[Word] = []
-    if parsed_tokens:
-        for token in parsed_tokens:
-            text = str(token.get("text", "")).strip()
-            if not text:
-                continue
-            try:
-                start = float(token.get("start", 0.0))
-                end = float(token.get("end", start))
-            except Exception:
-                continue
-            if end <= start:
-                continue
-            words.append(Word(text=text, start=start, end=end))
-    if not words:
-        if isinstance(data, dict):
-            segments = data.get("segments")
-            if isinstance(segments, Sequence):
-                for segment in segments:
-                    words.extend(_iter_words_from_segment(segment))
-            if not words and isinstance(data.get("words"), Sequence):
-                for item in data["words"]:
-                    word = _word_from_raw(item)
-                    if word is not None:
-                        words.append(word)
-        elif isinstance(data, Sequence):
-            for item in data:
-                word = _word_from_raw(item)
-                if word is not None:
-                    words.append(word)
-
-    if not words:  # 若最终仍无有效词，给出友好提示
+    columns = _WordColumns()
+    for token in load_tokens(data):
+        _append_token(columns, token)
+    if columns:
+        return columns
+    if isinstance(data, dict):
+        segments = data.get("segments")
+        if isinstance(segments, Sequence):
+            for segment in segments:
+                for word in _iter_words_from_segment(segment):
+                    columns.append(word.text, word.start, word.end)
+        if not columns and isinstance(data.get("words"), Sequence):
+            for item in data["words"]:
+                _append_raw(columns, item)
+    elif isinstance(data, Sequence):
+        for item in data:
+            _append_raw(columns, item)
+    return columns
+
+
+_STREAM_KEYS = ("words", "segments", "items")
+
+
+def _stream_sources(
+    json_path: Path,
+    append: Callable[[_WordColumns, object], None],
+) -> Dict[str, _WordColumns | None]:
+    """单遍流式读取 JSON，按来源分别收集词列。
+
+    键为 ``words`` / ``segments`` / ``items``（顶层对象）或 ``list``（顶层数组）；
+    值为 ``None`` 表示该键存在但不是数组。每次只解码一个词条（``segments``
+    为一个分段），不构建完整对象树。重复键以最后一次出现为准，与 ``json.loads`` 一致。
+    """
+
+    sources: Dict[str, _WordColumns | None] = {}
+    try:
+        handle = json_path.open("rb")
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(
+            f"未找到词级 JSON 文件: {json_path}. 请确认路径正确或素材已导出。"
+        ) from exc
+    except OSError as exc:  # pragma: no cover - I/O 错误提示
+        raise OSError(
+            f"无法读取 {json_path}: {exc}. 请检查权限或关闭占用该文件的程序。"
+        ) from exc
+    try:
+        with handle:
+            reader = JSONStreamReader(handle)
+            head = reader.peek()
+            if head == "{":
+                for key in reader.iter_object():
+                    if key not in _STREAM_KEYS:
+                        reader.skip_value()
+                        continue
+                    if reader.peek() != "[":
+                        reader.skip_value()
+                        sources[key] = None
+                        continue
+                    columns = _WordColumns()
+                    sources[key] = columns
+                    for _ in reader.iter_array():
+                        item = reader.read_value()
+                        if key != "segments":
+                            append(columns, item)
+                            continue
+                        entries = item.get("words") if isinstance(item, dict) else None
+                        if isinstance(entries, list):
+                            for entry in entries:
+                                append(columns, entry)
+            elif head == "[":
+                columns = _WordColumns()
+                sources["list"] = columns
+                for _ in reader.iter_array():
+                    append(columns, reader.read_value())
+            else:
+                reader.skip_value()
+            reader.finish()
+    except json.JSONDecodeError as exc:
+        raise ValueError(
+            f"解析 JSON 失败: {json_path}. 请确认文件是否完整且为合法 JSON。"
+        ) from exc
+    return sources
+
+
+def _columns_from_stream(json_path: Path) -> _WordColumns:
+    """流式提取词列，选择规则与 :func:`_columns_from_json` 相同。"""
+
+    sources = _stream_sources(json_path, lambda columns, item: _append_token(columns, token_from_entry(item)))
+    for key in ("words", "segments", "items", "list"):  # 与 load_tokens 的优先级一致
+        columns = sources.get(key)
+        if columns is not None:
+            if columns:
+                return columns
+            break
+    # 兜底规则只在主规则一无所获时触发，此时再读一遍文件
+    sources = _stream_sources(json_path, _append_raw)
+    for key in ("segments", "words", "list"):
+        columns = sources.get(key)
+        if columns:
+            return columns
+    return _WordColumns()
+
+
+def load_words(json_path: Path, *, stream: bool | None = None) -> ASRDoc:
+    """加载词级 ASR JSON 并返回统一数据结构（``words`` 为 :class:`WordArray`）。
+
+    ``stream`` 为 ``None`` 时按文件大小自动选择：不小于
+    :data:`STREAM_THRESHOLD_BYTES` 的文件逐条解码 ``words[]`` /
+    ``segments[].words[]`` 并直接写入列缓冲，避免数 GB 的对象树峰值；
+    两种方式得到的结果相同。
+    """
+
+    if stream is None:
+        try:
+            stream = json_path.stat().st_size >= STREAM_THRESHOLD_BYTES
+        except OSError:
+            stream = False  # 交给常规路径给出统一的错误提示
+    columns = _columns_from_stream(json_path) if stream else _columns_from_json(json_path)
+
+    if not columns:  # 若最终仍无有效词，给出友好提示
         raise ValueError(
             "JSON 中未找到有效的词级条目。请确认导出的 ASR 结果包含 words 字段。"
         )
 
+    words = columns.to_word_array()
+    starts = words.starts
     fixes: list[str] = []  # 记录修复动作
-    is_sorted = all(words[i].start <= words[i + 1].start for i in range(len(words) - 1))  # 检查时间是否递增
+    is_sorted = all(starts[i] <= starts[i + 1] for i in range(len(starts) - 1))  # 检查时间是否递增
     if not is_sorted:  # 如果出现逆序
-        words = sorted(words, key=lambda item: (item.start, item.end))  # 稳定排序纠正顺序
+        ends = words.ends
+        order = sorted(range(len(starts)), key=lambda idx: (starts[idx], ends[idx]))  # 稳定排序纠正顺序
+        words = words.take(order)
         fixes.append("words_reordered_by_start")  # 在元数据中记录修复标记
 
-    total_duration = words[-1].end - words[0].start  # 计算整体时间跨度
+    total_duration = words.ends[-1] - words.starts[0]  # 计算整体时间跨度
     if total_duration <= 0:  # 若总时长不合理
         raise ValueError(
             "词级时间戳总时长异常 (<=0)。请检查 start/end 是否正确或重新导出 JSON。"
@@ -176,4 +469,4 @@ def load_words(json_path: Path) -> ASRDoc:
     return ASRDoc(words=words, meta=meta)  # 返回标准化文档对象
 
 
-__all__ = ["Word", "ASRDoc", "load_words"]
+__all__ = ["Word", "WordArray", "ASRDoc", "STREAM_THRESHOLD_BYTES", "load_words"]
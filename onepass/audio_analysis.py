@@ -0,0 +1,362 @@
+"""源音频分析结果缓存：时长、采样参数、逐帧包络与静音区间。
+
+同一份源音频会在 retake（``_resolve_audio_duration`` / 静音探测）、渲染
+（``edl_renderer.probe_duration``、``scripts/edl_to_ffmpeg``）与 Web
+``/api/render`` 等阶段被反复探测。本模块按 (绝对路径, 文件大小, 修改时间)
+缓存一次分析结果：进程内直接复用；调用 :func:`set_cache_dir` 配置目录后还会写成
+紧凑的二进制 sidecar（``magic + JSON 头 + 对齐数据段``，与
+:mod:`onepass.asr_cache` 相同的布局），后续进程读取即可跳过 ffprobe 与解码。
+
+文件大小或修改时间变化即视为失效，重新分析后覆盖旧记录。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+import wave
+
+from .silence_detect import SilenceEnvelope, analyze_audio
+from .silence_probe import probe_silence_ffmpeg
+
+try:  # 包络数组依赖 NumPy；缺失时只缓存时长与静音区间
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+
+LOGGER = logging.getLogger(__name__)
+
+__all__ = [
+    "AudioAnalysis",
+    "audio_duration",
+    "get_cache_dir",
+    "lookup_analysis",
+    "read_analysis",
+    "remember_duration",
+    "set_cache_dir",
+    "silence_ranges",
+    "write_analysis",
+]
+
+ANALYSIS_VERSION = 1
+_MAGIC = b"OPAUDA01"
+_HEADER = struct.Struct("<8sI")
+_ALIGN = 8
+_MEMORY_LIMIT = 64
+
+SilenceKey = Tuple[float, float]
+
+
+@dataclass(slots=True)
+class AudioAnalysis:
+    """单个源音频的分析记录。``envelope`` 仅在完成过 PCM 解码时存在。"""
+
+    path: str
+    size: int
+    mtime_ns: int
+    duration: float | None = None
+    sample_rate: int = 0
+    channels: int = 0
+    envelope: SilenceEnvelope | None = None
+    silences: Dict[SilenceKey, List[Tuple[float, float]]] = field(default_factory=dict)
+
+
+_lock = threading.Lock()
+_memory: Dict[str, AudioAnalysis] = {}
+_cache_dir: Path | None = (
+    Path(os.environ["ONEPASS_AUDIO_CACHE"]).expanduser() if os.environ.get("ONEPASS_AUDIO_CACHE") else None
+)
+
+
+def set_cache_dir(path: Path | None) -> None:
+    """设置 sidecar 目录；``None`` 表示只在进程内缓存。"""
+
+    global _cache_dir
+    _cache_dir = Path(path).expanduser() if path is not None else None
+
+
+def get_cache_dir() -> Path | None:
+    return _cache_dir
+
+
+def _identity(audio: Path) -> Tuple[str, int, int] | None:
+    try:
+        resolved = Path(audio).expanduser().resolve()
+        stat = resolved.stat()
+    except OSError:
+        return None
+    return str(resolved), stat.st_size, stat.st_mtime_ns
+
+
+def _sidecar_path(resolved: str) -> Path | None:
+    if _cache_dir is None:
+        return None
+    digest = hashlib.sha1(resolved.encode("utf-8", "surrogatepass")).hexdigest()[:24]
+    return _cache_dir / f"{digest}.bin"
+
+
+def _silence_key(noise_db: float, min_d: float) -> SilenceKey:
+    return round(float(noise_db), 3), round(float(min_d), 4)
+
+
+def write_analysis(path: Path, analysis: AudioAnalysis) -> None:
+    """把分析记录写成单个二进制文件（先写临时文件再原子替换）。"""
+
+    sections: list[tuple[str, bytes]] = []
+    envelope = analysis.envelope
+    if envelope is not None and np is not None:
+        sections.append(("peak", np.asarray(envelope.peak, dtype=np.float32).tobytes()))
+        sections.append(("rms", np.asarray(envelope.rms, dtype=np.float32).tobytes()))
+    layout: dict[str, list[int]] = {}
+    cursor = 0
+    for name, data in sections:
+        layout[name] = [cursor, len(data)]
+        cursor += len(data) + (-len(data)) % _ALIGN
+    header = json.dumps(
+        {
+            "version": ANALYSIS_VERSION,
+            "byteorder": sys.byteorder,
+            "path": analysis.path,
+            "size": analysis.size,
+            "mtime_ns": analysis.mtime_ns,
+            "duration": analysis.duration,
+            "sample_rate": analysis.sample_rate,
+            "channels": analysis.channels,
+            "frame_sec": envelope.frame_sec if envelope is not None else None,
+            "envelope_duration": envelope.duration if envelope is not None else None,
+            "silences": [
+                [noise_db, min_d, [list(item) for item in ranges]]
+                for (noise_db, min_d), ranges in analysis.silences.items()
+            ],
+            "sections": layout,
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+    header += b" " * ((-(_HEADER.size + len(header))) % _ALIGN)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(_HEADER.pack(_MAGIC, len(header)))
+        handle.write(header)
+        for _, data in sections:
+            handle.write(data)
+            handle.write(b"\0" * ((-len(data)) % _ALIGN))
+    os.replace(tmp_path, path)
+
+
+def read_analysis(path: Path) -> AudioAnalysis | None:
+    """读取分析记录；格式或版本不符时返回 ``None``。"""
+
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    try:
+        magic, header_len = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            return None
+        header = json.loads(data[_HEADER.size : _HEADER.size + header_len].decode("utf-8"))
+        if header.get("version") != ANALYSIS_VERSION or header.get("byteorder") != sys.byteorder:
+            return None
+        base = _HEADER.size + header_len
+        layout = header["sections"]
+        envelope = None
+        if np is not None and "peak" in layout and "rms" in layout:
+            arrays = {}
+            for name in ("peak", "rms"):
+                offset, size = layout[name]
+                arrays[name] = np.frombuffer(data, dtype=np.float32, count=size // 4, offset=base + offset)
+            if len(arrays["peak"]) != len(arrays["rms"]):
+                return None
+            envelope = SilenceEnvelope(
+                frame_sec=float(header["frame_sec"]),
+                duration=float(header["envelope_duration"]),
+                peak=arrays["peak"],
+                rms=arrays["rms"],
+                sample_rate=int(header.get("sample_rate") or 0),
+                channels=int(header.get("channels") or 0),
+            )
+        duration = header.get("duration")
+        return AudioAnalysis(
+            path=str(header["path"]),
+            size=int(header["size"]),
+            mtime_ns=int(header["mtime_ns"]),
+            duration=float(duration) if duration is not None else None,
+            sample_rate=int(header.get("sample_rate") or 0),
+            channels=int(header.get("channels") or 0),
+            envelope=envelope,
+            silences={
+                _silence_key(noise_db, min_d): [(float(start), float(end)) for start, end in ranges]
+                for noise_db, min_d, ranges in header.get("silences", [])
+            },
+        )
+    except (KeyError, TypeError, ValueError, struct.error):
+        return None
+
+
+def lookup_analysis(audio: Path) -> AudioAnalysis | None:
+    """返回与当前文件状态一致的缓存记录（进程内优先，其次 sidecar）。"""
+
+    identity = _identity(audio)
+    if identity is None:
+        return None
+    return _lookup(identity)
+
+
+def _lookup(identity: Tuple[str, int, int]) -> AudioAnalysis | None:
+    resolved, size, mtime_ns = identity
+    with _lock:
+        record = _memory.get(resolved)
+    if record is not None and (record.size, record.mtime_ns) == (size, mtime_ns):
+        return record
+    sidecar = _sidecar_path(resolved)
+    if sidecar is None or not sidecar.exists():
+        return None
+    record = read_analysis(sidecar)
+    if record is None or (record.path, record.size, record.mtime_ns) != identity:
+        return None
+    LOGGER.debug("[audio-cache] hit path=%s sidecar=%s", resolved, sidecar)
+    with _lock:
+        _remember(record)
+    return record
+
+
+def _remember(record: AudioAnalysis) -> None:
+    if record.path not in _memory and len(_memory) >= _MEMORY_LIMIT:
+        _memory.pop(next(iter(_memory)))
+    _memory[record.path] = record
+
+
+def _store(record: AudioAnalysis) -> None:
+    with _lock:
+        _remember(record)
+    sidecar = _sidecar_path(record.path)
+    if sidecar is None:
+        return
+    try:
+        write_analysis(sidecar, record)
+    except OSError as exc:
+        LOGGER.warning("[audio-cache] 写入缓存失败: %s (%s)", sidecar, exc)
+
+
+def _record_for(identity: Tuple[str, int, int]) -> AudioAnalysis:
+    record = _lookup(identity)
+    if record is not None:
+        return record
+    resolved, size, mtime_ns = identity
+    return AudioAnalysis(path=resolved, size=size, mtime_ns=mtime_ns)
+
+
+def _wave_header(path: str, size: int) -> Tuple[float, int, int] | None:
+    if not path.lower().endswith(".wav"):
+        return None
+    try:
+        with wave.open(path, "rb") as reader:
+            rate = reader.getframerate()
+            if rate <= 0:
+                return None
+            nframes = reader.getnframes()
+            channels = reader.getnchannels()
+            # 管道写出的 WAV 把 data 长度记为 0xFFFFFFFF，帧数超出文件大小时头部不可信
+            if nframes * reader.getsampwidth() * channels > size:
+                LOGGER.debug("[audio-cache] WAV 头帧数与文件大小不符，改用探测: %s", path)
+                return None
+            return nframes / rate, rate, channels
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+def remember_duration(audio: Path, duration: float) -> None:
+    """记录外部探测（如 ffprobe）得到的时长，供其他阶段复用。"""
+
+    identity = _identity(audio)
+    if identity is None or not duration or duration <= 0:
+        return
+    record = _record_for(identity)
+    with _lock:
+        if record.duration == duration:
+            return
+        record.duration = float(duration)
+    _store(record)
+
+
+def audio_duration(
+    audio: Path,
+    probe: Callable[[Path], Optional[float]] | None = None,
+) -> float | None:
+    """返回音频时长：缓存 → WAV 头 → ``probe``（通常为 ffprobe）。
+
+    ``probe`` 的异常原样抛出，由调用方沿用各自的错误处理；全部失败时返回 ``None``。
+    """
+
+    identity = _identity(audio)
+    if identity is None:
+        return probe(Path(audio)) if probe is not None else None
+    record = _record_for(identity)
+    if record.duration:
+        return record.duration
+    header = _wave_header(identity[0], identity[1])
+    if header is not None:
+        with _lock:
+            record.duration, record.sample_rate, record.channels = header
+    elif probe is not None:
+        value = probe(Path(audio))
+        if not value or value <= 0:
+            return None
+        with _lock:
+            record.duration = float(value)
+    else:
+        return None
+    _store(record)
+    return record.duration
+
+
+def silence_ranges(
+    audio: Path,
+    noise_db: float = -35.0,
+    min_d: float = 0.18,
+) -> Tuple[List[Tuple[float, float]], str]:
+    """返回 ``(静音区间, 来源)``，来源为 ``cache`` / ``native`` / ``ffmpeg``。
+
+    优先使用缓存的区间或包络；否则进程内解码一次（:func:`analyze_audio`），
+    同时记下时长与包络；仍不可用时回退到 ffmpeg ``silencedetect``。
+    """
+
+    identity = _identity(audio)
+    if identity is None:
+        return probe_silence_ffmpeg(audio, noise_db=noise_db, min_d=min_d), "ffmpeg"
+    key = _silence_key(noise_db, min_d)
+    record = _record_for(identity)
+    with _lock:
+        cached = record.silences.get(key)
+        envelope = record.envelope
+    if cached is not None:
+        return list(cached), "cache"
+    source = "cache"
+    if envelope is None:
+        envelope = analyze_audio(Path(identity[0]))
+        if envelope is not None:
+            with _lock:
+                record.envelope = envelope
+                record.duration = envelope.duration
+                record.sample_rate = envelope.sample_rate
+                record.channels = envelope.channels
+            source = "native"
+    if envelope is not None:
+        ranges = envelope.detect(noise_db, min_d)
+    else:
+        ranges = probe_silence_ffmpeg(audio, noise_db=noise_db, min_d=min_d)
+        source = "ffmpeg"
+        if not ranges:
+            return ranges, source  # 失败与"没有静音"无法区分，不写入缓存
+    with _lock:
+        record.silences[key] = list(ranges)
+    _store(record)
+    return ranges, source
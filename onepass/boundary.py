@@ -1,51 +1,91 @@
 """静音吸附与段后处理工具。"""
 from __future__ import annotations
 
-from typing import Iterable, List, Tuple
+from typing import Iterable, List, Optional, Sequence, Tuple
 
-from .silence_probe import nearest_silence_boundary
+from .silence_probe import SilenceIndex
 
 SnapLabel = str
 
 
+def _as_index(silence: Iterable[Tuple[float, float]] | SilenceIndex | None) -> SilenceIndex:
+    if isinstance(silence, SilenceIndex):
+        return silence
+    return SilenceIndex.from_ranges(silence)
+
+
+def _apply_snap(
+    t0: float,
+    t1: float,
+    new_start: Optional[float],
+    new_end: Optional[float],
+    min_duration: float,
+) -> Tuple[float, float, SnapLabel, bool]:
+    start = float(t0 or 0.0)
+    end = float(t1 or 0.0)
+    if new_start is not None and new_start < end:
+        start = new_start
+    if new_end is not None and new_end > start:
+        end = new_end
+    if new_start is not None and new_end is not None:
+        snapped = "both"
+    elif new_start is not None:
+        snapped = "start"
+    elif new_end is not None:
+        snapped = "end"
+    else:
+        snapped = "no-snap"
+    if end < start:
+        end = start
+    duration = end - start
+    too_short = duration < max(0.0, min_duration)
+    return start, end, snapped, too_short
+
+
 def snap_segment(
     t0: float,
     t1: float,
-    silence: Iterable[Tuple[float, float]] | None,
+    silence: Iterable[Tuple[float, float]] | SilenceIndex | None,
     radius: float,
     min_duration: float,
 ) -> Tuple[float, float, SnapLabel, bool]:
     """对单个片段进行静音吸附。
 
+    ``silence`` 可以是静音区间列表或预先构建的 :class:`SilenceIndex`；
+    多次调用时应传入索引，避免每次重建。
     返回 (start, end, snapped_label, too_short)。
     """
 
-    silence_ranges: List[Tuple[float, float]] = list(silence or [])
+    index = _as_index(silence)
     start = float(t0 or 0.0)
     end = float(t1 or 0.0)
-    snapped = "no-snap"
-    if not silence_ranges or radius <= 0:
-        snapped = "no-snap"
-    else:
-        new_start = nearest_silence_boundary(start, silence_ranges, radius)
-        new_end = nearest_silence_boundary(end, silence_ranges, radius)
-        if new_start is not None and new_start < end:
-            start = new_start
-        if new_end is not None and new_end > start:
-            end = new_end
-        if new_start is not None and new_end is not None:
-            snapped = "both"
-        elif new_start is not None:
-            snapped = "start"
-        elif new_end is not None:
-            snapped = "end"
-        else:
-            snapped = "no-snap"
-    if end < start:
-        end = start
-    duration = end - start
-    too_short = duration < max(0.0, min_duration)
-    return start, end, snapped, too_short
+    if not index or radius <= 0:
+        return _apply_snap(start, end, None, None, min_duration)
+    return _apply_snap(start, end, index.nearest(start, radius), index.nearest(end, radius), min_duration)
+
+
+def snap_segments(
+    spans: Sequence[Tuple[float, float]],
+    silence: Iterable[Tuple[float, float]] | SilenceIndex | None,
+    radius: float,
+    min_duration: float,
+) -> List[Tuple[float, float, SnapLabel, bool]]:
+    """批量吸附全部片段，结果与逐个调用 :func:`snap_segment` 相同。
+
+    起止点的最近边界互不依赖，因此所有端点合并成一次批量查询。
+    """
+
+    index = _as_index(silence)
+    starts = [float(t0 or 0.0) for t0, _ in spans]
+    ends = [float(t1 or 0.0) for _, t1 in spans]
+    if not index or radius <= 0:
+        return [_apply_snap(start, end, None, None, min_duration) for start, end in zip(starts, ends)]
+    nearest = index.nearest_many(starts + ends, radius)
+    count = len(spans)
+    return [
+        _apply_snap(starts[idx], ends[idx], nearest[idx], nearest[count + idx], min_duration)
+        for idx in range(count)
+    ]
 
 
-__all__ = ["snap_segment", "SnapLabel"]
+__all__ = ["snap_segment", "snap_segments", "SnapLabel"]
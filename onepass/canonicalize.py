@@ -8,6 +8,8 @@ import unicodedata
 from pathlib import Path
 from typing import Dict
 
+from .alias_matcher import AliasMatcher, cached_matcher
+
 _WS_RE = re.compile(r"[ \t\r\f\v]+")
 _ROMAN_RE = re.compile(r"[A-Za-z0-9]+(?:[A-Za-z0-9 ]+[A-Za-z0-9]+)?")
 
@@ -28,6 +30,19 @@ class CanonicalAliasMap:
             _ALIAS_SORT_CACHE[key] = cached
         return cached
 
+    def matcher(self) -> AliasMatcher:
+        """Return the compiled replacement matcher for this mapping (cached)."""
+
+        return _alias_matcher(self.mapping, self.replacements)
+
+
+def _alias_matcher(mapping: Dict[str, str], keys=None) -> AliasMatcher:
+    def _rules() -> list[tuple[str, str]]:
+        ordered = keys() if keys is not None else sorted(mapping.keys(), key=len, reverse=True)
+        return [(key, mapping[key]) for key in ordered if mapping.get(key)]
+
+    return cached_matcher("canonical", mapping, _rules)
+
 
 def load_alias_map(path: str | Path | None) -> dict[str, str]:
     """Load alias mapping as ``variant -> canonical`` dictionary."""
@@ -70,19 +85,10 @@ def load_alias_map(path: str | Path | None) -> dict[str, str]:
 def apply_alias(text: str, alias: dict[str, str] | CanonicalAliasMap | None) -> str:
     if not text or not alias:
         return text
-    if isinstance(alias, CanonicalAliasMap):
-        mapping = alias.mapping
-        keys = alias.replacements()
-    else:
-        mapping = alias
-        keys = sorted(alias.keys(), key=len, reverse=True)
-    result = text
-    for key in keys:
-        replacement = mapping.get(key)
-        if not replacement or key not in result:
-            continue
-        result = result.replace(key, replacement)
-    return result
+    # Same result as replacing every key longest-first with str.replace,
+    # but the compiled matcher only touches keys that occur in the text.
+    matcher = alias.matcher() if isinstance(alias, CanonicalAliasMap) else _alias_matcher(alias)
+    return matcher.apply(text)
 
 
 def canonicalize(text: str, alias: dict[str, str] | CanonicalAliasMap | None = None) -> str:
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional
 
 _DEBUG_ALIGN_ENABLED: bool = False
 
@@ -65,3 +65,49 @@ def log_debug(message: str, *args: object, limit: Dict[str, Any] | None = None)
                 return
             limit["count"] = current + 1
     get_debug_logger().info(message, *args)
+
+
+class DebugSink:
+    """Collect optional debug rows per channel (``"match"``, ``"timeline"``...).
+
+    Hot loops ask ``wants(channel)`` once and only build row dicts when it
+    returns True, so a sink without channels (``NULL_DEBUG_SINK``) costs a
+    set lookup and never allocates. ``put`` replaces a channel wholesale,
+    which lets retried stages publish only their final attempt.
+    """
+
+    __slots__ = ("channels", "_rows")
+
+    def __init__(self, channels: Iterable[str] = ()) -> None:
+        self.channels = frozenset(channels)
+        self._rows: Dict[str, List[Any]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.channels)
+
+    def wants(self, channel: str) -> bool:
+        """Return True if rows for *channel* should be built."""
+
+        return channel in self.channels
+
+    def add(self, channel: str, row: Any) -> None:
+        """Append one row to *channel* (ignored when not collected)."""
+
+        if channel in self.channels:
+            self._rows.setdefault(channel, []).append(row)
+
+    def put(self, channel: str, rows: Optional[List[Any]]) -> None:
+        """Replace the rows of *channel* (ignored when not collected)."""
+
+        if channel in self.channels:
+            self._rows[channel] = list(rows or [])
+
+    def rows(self, channel: str) -> Optional[List[Any]]:
+        """Return collected rows, or None when *channel* is not collected."""
+
+        if channel not in self.channels:
+            return None
+        return self._rows.setdefault(channel, [])
+
+
+NULL_DEBUG_SINK = DebugSink()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from bisect import bisect_right
 from dataclasses import dataclass
 from typing import Iterable, List
 
@@ -30,6 +31,73 @@ def _gap_penalty(gap: float, threshold: float, epsilon: float, penalty_gap: floa
     return 0.0
 
 
+class _MaxTree:
+    """按 t1 排序位置的区间最大值线段树，节点保存候选下标。
+
+    比较规则与原二重循环一致：得分高者优先，得分相同取下标较小者。
+    """
+
+    __slots__ = ("size", "nodes", "scores")
+
+    def __init__(self, count: int, scores: List[float]) -> None:
+        size = 1
+        while size < max(1, count):
+            size <<= 1
+        self.size = size
+        self.nodes: List[int] = [-1] * (2 * size)
+        self.scores = scores
+
+    def _better(self, left: int, right: int) -> int:
+        if left < 0:
+            return right
+        if right < 0:
+            return left
+        left_score = self.scores[left]
+        right_score = self.scores[right]
+        if right_score > left_score or (right_score == left_score and right < left):
+            return right
+        return left
+
+    def insert(self, pos: int, idx: int) -> None:
+        nodes = self.nodes
+        node = pos + self.size
+        nodes[node] = idx
+        node >>= 1
+        while node:
+            nodes[node] = self._better(nodes[2 * node], nodes[2 * node + 1])
+            node >>= 1
+
+    def query(self, lo: int, hi: int) -> int:
+        """返回位置区间 ``[lo, hi)`` 内的最佳候选下标，没有则为 -1。"""
+
+        best = -1
+        nodes = self.nodes
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                best = self._better(best, nodes[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = self._better(best, nodes[hi])
+            lo >>= 1
+            hi >>= 1
+        return best
+
+
+def _first_position(values: List[float], lo: int, hi: int, predicate) -> int:
+    """在 ``values[lo:hi]`` 上二分，返回第一个满足单调谓词的位置。"""
+
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if predicate(values[mid]):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
 def select_best_path(
     candidates: Iterable[RepeatCandidate],
     *,
@@ -39,6 +107,14 @@ def select_best_path(
     penalty_pre: float,
     penalty_gap: float,
 ) -> DPPathResult:
+    """按时间顺序选择总价值最高的候选链。
+
+    前驱按 t1 排序放入线段树：与当前候选相容（``t1 <= t0 + epsilon``）的前驱
+    构成 t1 有序表的前缀，按间隔罚分又可切成至多三个连续区间（间隔过大 /
+    正常 / 轻微重叠），每段一次区间最大值查询，总复杂度 ``O(n log n)``。
+    罚分与平局规则（价值相同取更早的候选）与逐对比较的写法一致。
+    """
+
     ordered = sorted(candidates, key=lambda c: (c.t0, c.t1, c.candidate_id))
     if not ordered:
         return DPPathResult(best_ids=[], path_rows=[])
@@ -50,6 +126,12 @@ def select_best_path(
     pre_penalties: List[float] = [0.0] * n
     epsilon = max(0.0, float(epsilon))
     threshold = max(0.0, float(gap_threshold))
+    by_end = sorted(range(n), key=lambda i: (ordered[i].t1, i))
+    end_values = [ordered[i].t1 for i in by_end]
+    end_position = [0] * n
+    for pos, idx in enumerate(by_end):
+        end_position[idx] = pos
+    tree = _MaxTree(n, scores)
     for idx, candidate in enumerate(ordered):
         base, late_bonus, pre_penalty, _ = _candidate_value(candidate, bonus_late, penalty_pre)
         late_values[idx] = late_bonus
@@ -57,17 +139,37 @@ def select_best_path(
         scores[idx] = base
         prev[idx] = -1
         gap_used[idx] = 0.0
-        for j in range(idx):
-            prev_candidate = ordered[j]
-            if prev_candidate.t1 > candidate.t0 + epsilon:
-                continue
-            gap = candidate.t0 - prev_candidate.t1
-            penalty = _gap_penalty(gap, threshold, epsilon, penalty_gap)
-            value = scores[j] + base + penalty
-            if value > scores[idx]:
-                scores[idx] = value
-                prev[idx] = j
-                gap_used[idx] = penalty
+        t0 = candidate.t0
+        limit = bisect_right(end_values, t0 + epsilon)
+        if limit:
+            # 间隔 gap = t0 - t1 随 t1 单调，罚分区间在 t1 有序表上是连续的
+            far_end = 0
+            if threshold > 0.0:
+                far_end = _first_position(end_values, 0, limit, lambda t1: not (t0 - t1 > threshold))
+            overlap_start = _first_position(end_values, far_end, limit, lambda t1: t0 - t1 < -epsilon)
+            best_value = base
+            best_j = -1
+            best_penalty = 0.0
+            for lo, hi, penalty in (
+                (0, far_end, penalty_gap),
+                (far_end, overlap_start, 0.0),
+                (overlap_start, limit, penalty_gap),
+            ):
+                if lo >= hi:
+                    continue
+                j = tree.query(lo, hi)
+                if j < 0:
+                    continue
+                value = scores[j] + base + penalty
+                if value > best_value or (best_j >= 0 and value == best_value and j < best_j):
+                    best_value = value
+                    best_j = j
+                    best_penalty = penalty
+            if best_j >= 0:
+                scores[idx] = best_value
+                prev[idx] = best_j
+                gap_used[idx] = best_penalty
+        tree.insert(end_position[idx], idx)
     best_idx = max(range(n), key=lambda i: (scores[i], ordered[i].t1))
     best_ids: list[int] = []
     path_rows: list[dict[str, object]] = []
@@ -12,6 +12,9 @@ from dataclasses import dataclass  # 构建结构化数据模型
 from pathlib import Path, PurePosixPath
 from typing import Iterable, Literal
 
+from .audio_analysis import audio_duration
+from .pcm_render import build_decode_command, needs_decode, read_wav_layout, render_pcm
+from .render_cache import RenderChunkCache
 from .edl import SegmentEDL as UnifiedSegmentEDL
 from .edl import load as load_segment_edl
 
@@ -24,9 +27,12 @@ __all__ = [
     "normalize_segments",
     "build_filter_complex",
     "build_filter_pipeline",
+    "RENDER_ENGINES",
     "render_audio",
 ]
 
+RENDER_ENGINES = ("filter", "pcm")
+
 
 @dataclass(slots=True)
 class EDLSegment:
@@ -322,7 +328,7 @@ def resolve_source_audio(
     return None
 
 
-def probe_duration(audio_path: Path) -> float:
+def _ffprobe_duration(audio_path: Path) -> float:
     """通过 ffprobe 获取音频总时长（秒）。"""
 
     cmd = [
@@ -362,6 +368,15 @@ def probe_duration(audio_path: Path) -> float:
     return duration
 
 
+def probe_duration(audio_path: Path) -> float:
+    """获取音频总时长（秒），优先复用 :mod:`onepass.audio_analysis` 的缓存结果。"""
+
+    duration = audio_duration(audio_path, _ffprobe_duration)  # ffprobe 的异常原样抛出
+    if duration is None:
+        raise RuntimeError("ffprobe 返回的时长非正值，可能是输入音频文件异常。")
+    return duration
+
+
 def normalize_segments(segments: list[EDLSegment], total: float) -> list[EDLSegment]:
     """整理片段定义，得到按时间升序的保留片段列表。"""
 
@@ -498,8 +513,20 @@ def render_audio(
     dry_run: bool = False,
     edl_doc: EDLDoc | None = None,
     source_audio_path: Path | None = None,
+    engine: str = "filter",
+    crossfade_ms: float = 0.0,
+    render_cache_dir: Path | None = None,
 ) -> Path:
-    """综合以上步骤执行音频裁剪与拼接，返回输出文件路径。"""
+    """综合以上步骤执行音频裁剪与拼接，返回输出文件路径。
+
+    ``engine="filter"`` 使用 ``atrim``/``concat`` 滤镜图；``engine="pcm"`` 改由
+    :mod:`onepass.pcm_render` 解码一次后按样本区间直拷，片段很多时更快，
+    ``crossfade_ms`` > 0 时在接缝处做短交叉淡化（仅 pcm 引擎支持）。
+    pcm 引擎下提供 ``render_cache_dir`` 时按片段缓存解码结果，增量重渲染只解码改动部分。
+    """
+
+    if engine not in RENDER_ENGINES:
+        raise ValueError(f"未知的渲染引擎: {engine}（可选 {', '.join(RENDER_ENGINES)}）")
 
     edl = edl_doc or load_edl(edl_path)  # 读取并校验 EDL
 
@@ -526,6 +553,22 @@ def render_audio(
     out_dir.mkdir(parents=True, exist_ok=True)  # 确保输出目录存在
     output_path = out_dir / f"{source_audio.stem}.clean.wav"  # 约定输出文件名
 
+    if engine == "pcm":
+        if dry_run:  # 仅打印需要的解码命令
+            if needs_decode(read_wav_layout(source_audio), target_samplerate, target_channels):
+                print(shlex.join(build_decode_command(source_audio, output_path, target_samplerate, target_channels)))
+            print(f"# pcm render: {len(keeps)} segments -> {output_path}")
+            return output_path
+        return render_pcm(
+            source_audio,
+            [(segment.start, segment.end) for segment in keeps],
+            output_path,
+            samplerate=target_samplerate,
+            channels=target_channels,
+            crossfade_ms=crossfade_ms,
+            chunk_cache=RenderChunkCache(render_cache_dir) if render_cache_dir is not None else None,
+        )
+
     filter_args, label = build_filter_complex(keeps, target_samplerate, target_channels)
 
     cmd: list[str] = [
@@ -1,17 +1,32 @@
 """Anchor-based matching helpers for keep-last alignment."""
 from __future__ import annotations
 
+from array import array
 from collections import Counter
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 import bisect
 import logging
 import math
+import multiprocessing
 import re
+import sys
+import threading
 import time
 import unicodedata
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
+try:  # NumPy is optional; without it every window is scored individually
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+
+from .asr_loader import WordArray
 from .canonicalize import CanonicalAliasMap, canonicalize
+from .norm_memo import memoize_normalizer
+from .text_index import CharBoundaryIndex, SuffixArrayIndex
+from .utils.deadline import Deadline
+from .utils.lev import best_substring_match, bounded_ratio
 from .words_loader import Token
 
 LOGGER = logging.getLogger(__name__)
@@ -52,11 +67,22 @@ _SPACE_RE = re.compile(r"\s+")
 
 @dataclass(slots=True)
 class TokenStream:
-    tokens: List[Token]
+    """Normalized token text plus per-token time columns.
+
+    ``tokens`` is either the original token dicts or a :class:`WordArray`;
+    matchers read times from the ``starts`` / ``ends`` columns only.
+    """
+
+    tokens: Sequence[Token] | WordArray
     canonical_text: str
     raw_text: str
     char_boundaries: List[int]
     alias_hits: int = 0
+    anchor_index: SuffixArrayIndex | None = None
+    gram_codes: tuple[Dict[str, int], object, int] | None = field(default=None, repr=False)
+    starts: Sequence[float] = field(default_factory=lambda: array("d"), repr=False)
+    ends: Sequence[float] = field(default_factory=lambda: array("d"), repr=False)
+    boundary_index: CharBoundaryIndex | None = field(default=None, repr=False)
 
 
 @dataclass(slots=True)
@@ -92,6 +118,7 @@ def _lookup_alias(token: str, alias: Dict[str, str] | CanonicalAliasMap | None)
     return replacement, replacement != token
 
 
+@memoize_normalizer("token")
 def _normalize_token_text(text: str, alias: Dict[str, str] | CanonicalAliasMap | None) -> tuple[str, bool]:
     raw = unicodedata.normalize("NFKC", text or "")
     raw = _SPACE_RE.sub(" ", raw)
@@ -101,6 +128,7 @@ def _normalize_token_text(text: str, alias: Dict[str, str] | CanonicalAliasMap |
     return normalized, hit
 
 
+@memoize_normalizer("query", maxsize=4096)
 def _normalize_query_text(line: str, alias: Dict[str, str] | CanonicalAliasMap | None) -> str:
     canonical = canonicalize(line, alias)
     canonical = canonical.lower()
@@ -108,61 +136,154 @@ def _normalize_query_text(line: str, alias: Dict[str, str] | CanonicalAliasMap |
     return canonical
 
 
-def build_token_stream(tokens: Sequence[Token], alias: Dict[str, str] | CanonicalAliasMap | None) -> TokenStream:
-    raw = "".join(token.get("text", "") or "" for token in tokens)
+def build_token_stream(
+    tokens: Sequence[Token] | WordArray,
+    alias: Dict[str, str] | CanonicalAliasMap | None,
+    *,
+    build_index: bool = False,
+) -> TokenStream:
+    """Normalize *tokens* into a stream; ``build_index`` adds a suffix array.
+
+    A :class:`WordArray` is kept as-is and shares its time columns with the
+    stream instead of being copied into per-token dicts.
+    """
+
+    if isinstance(tokens, WordArray):
+        texts = tokens.texts()
+        raw = tokens.buffer
+        kept: Sequence[Token] | WordArray = tokens
+        starts: Sequence[float] = tokens.starts
+        ends: Sequence[float] = tokens.ends
+    else:
+        kept = list(tokens)
+        texts = [token.get("text", "") or "" for token in kept]
+        raw = "".join(texts)
+        starts = [token.get("start", 0.0) for token in kept]
+        ends = [token.get("end", 0.0) for token in kept]
     normalized_tokens: list[str] = []
     alias_hits = 0
     boundaries: List[int] = [0]
     cursor = 0
-    for token in tokens:
-        normalized, hit = _normalize_token_text(token.get("text", "") or "", alias)
+    for text in texts:
+        normalized, hit = _normalize_token_text(text, alias)
         alias_hits += int(hit)
         normalized_tokens.append(normalized)
         cursor += len(normalized)
         boundaries.append(cursor)
     canonical = "".join(normalized_tokens)
     return TokenStream(
-        tokens=list(tokens),
+        tokens=kept,
         canonical_text=canonical,
         raw_text=raw,
         char_boundaries=boundaries,
         alias_hits=alias_hits,
+        anchor_index=SuffixArrayIndex(canonical) if build_index and canonical else None,
+        starts=starts,
+        ends=ends,
     )
 
 
-def _bounded_lev(left: str, right: str, max_ratio: float) -> float:
-    if not left and not right:
-        return 0.0
-    if not left or not right:
-        return 1.0
-    n, m = len(left), len(right)
-    limit = int(math.ceil(max(n, m) * max(0.0, max_ratio))) + 1
-    prev = list(range(m + 1))
-    for i in range(1, n + 1):
-        current = [i] + [0] * m
-        min_row = current[0]
-        li = left[i - 1]
-        for j in range(1, m + 1):
-            cost = 0 if li == right[j - 1] else 1
-            current[j] = min(prev[j] + 1, current[j - 1] + 1, prev[j - 1] + cost)
-            if current[j] < min_row:
-                min_row = current[j]
-        if limit > 0 and min_row > limit:
-            return max_ratio + 1.0
-        prev = current
-    distance = prev[m]
-    return distance / max(n, m)
-
-
-def _char_to_token(char_boundaries: Sequence[int], pos: int, *, right: bool = False) -> int:
-    if not char_boundaries:
-        return 0
-    if right:
-        idx = bisect.bisect_left(char_boundaries, pos)
+def _stream_boundaries(stream: TokenStream) -> CharBoundaryIndex:
+    """Return the char -> token index over ``stream.char_boundaries``, built once."""
+
+    if stream.boundary_index is None:
+        stream.boundary_index = CharBoundaryIndex(stream.char_boundaries)
+    return stream.boundary_index
+
+
+_QGRAM = 2
+
+
+def _stream_gram_codes(stream: TokenStream) -> tuple[Dict[str, int], object, int] | None:
+    """Return ``(alphabet, bigram_codes, base)`` for the stream, built once."""
+
+    if np is None or len(stream.canonical_text) < _QGRAM:
+        return None
+    if stream.gram_codes is None:
+        alphabet: Dict[str, int] = {}
+        text = stream.canonical_text
+        codes = np.fromiter(
+            (alphabet.setdefault(ch, len(alphabet)) for ch in text),
+            dtype=np.int64,
+            count=len(text),
+        )
+        base = len(alphabet) + 1
+        stream.gram_codes = (alphabet, codes[:-1] * base + codes[1:], base)
+    return stream.gram_codes
+
+
+def _qgram_survivors(
+    stream: TokenStream,
+    query: str,
+    windows: Sequence[tuple[int, int]],
+    max_ratio: float,
+) -> list[bool] | None:
+    """Batch q-gram filter over candidate windows (``None`` when unavailable).
+
+    By the q-gram lemma a window within edit distance ``d`` of *query* shares
+    at least ``max(m, w) - q + 1 - q * d`` bigrams with it. Counting window
+    bigrams that occur in the query at all is an upper bound on the shared
+    count, so windows below the threshold can never pass ``max_ratio`` and
+    are dropped without running the edit-distance kernel.
+    """
+
+    cached = _stream_gram_codes(stream)
+    if cached is None or len(query) < _QGRAM or not windows:
+        return None
+    alphabet, grams, base = cached
+    query_codes = sorted(
+        {
+            alphabet[left] * base + alphabet[right]
+            for left, right in zip(query, query[1:])
+            if left in alphabet and right in alphabet
+        }
+    )
+    starts = np.fromiter((left for left, _ in windows), dtype=np.int64, count=len(windows))
+    widths = np.fromiter((right - left for left, right in windows), dtype=np.int64, count=len(windows))
+    spans = np.clip(widths - _QGRAM + 1, 0, None)
+    offsets = np.cumsum(spans) - spans
+    total = int(spans.sum())
+    if total and query_codes:
+        positions = np.arange(total, dtype=np.int64) - np.repeat(offsets, spans) + np.repeat(starts, spans)
+        member = np.isin(grams[positions], np.asarray(query_codes, dtype=np.int64))
+        running = np.concatenate(([0], np.cumsum(member, dtype=np.int64)))
+        shared = running[offsets + spans] - running[offsets]
     else:
-        idx = bisect.bisect_right(char_boundaries, pos) - 1
-    idx = max(0, min(idx, len(char_boundaries) - 2))
-    return idx
+        shared = np.zeros(len(windows), dtype=np.int64)
+    longest = np.maximum(widths, len(query))
+    # One extra edit of slack keeps float rounding in ``ratio * length`` safe.
+    allowed = np.floor(longest * max(0.0, max_ratio)).astype(np.int64) + 1
+    required = longest - _QGRAM + 1 - _QGRAM * allowed
+    return (shared >= required).tolist()
+
+
+def _iter_anchor_hits(stream: TokenStream, anchor: str, prefer_latest: bool) -> Iterator[int]:
+    """Yield anchor offsets in the order the matcher consumes them."""
+
+    index = stream.anchor_index
+    if index is not None:
+        if prefer_latest:
+            yield from index.iter_latest(anchor)
+        else:
+            yield from index.occurrences(anchor)
+        return
+    text = stream.canonical_text
+    if prefer_latest:
+        search_from = len(text)
+        while True:
+            found = text.rfind(anchor, 0, search_from)
+            if found == -1:
+                return
+            yield found
+            search_from = found
+    else:
+        search_from = 0
+        while True:
+            found = text.find(anchor, search_from)
+            if found == -1:
+                return
+            yield found
+            search_from = found + 1
 
 
 def match_line_to_tokens(
@@ -186,9 +307,7 @@ def match_line_to_tokens(
         debug_details.clear()
     max_windows = max(1, int(max_windows))
     anchor_len = max(1, min(min_anchor_ngram, len(normalized_line)))
-    deadline = None
-    if match_timeout and match_timeout > 0:
-        deadline = time.time() + match_timeout
+    budget = Deadline.after(match_timeout)
     windows: list[tuple[int, int]] = []
     timed_out = False
     seen: set[tuple[int, int]] = set()
@@ -198,22 +317,10 @@ def match_line_to_tokens(
     start_idx = 0
     while start_idx + anchor_len <= len(normalized_line):
         anchor = normalized_line[start_idx : start_idx + anchor_len]
-        search_from = len(text) if prefer_latest else 0
-        found = -1
-        while True:
-            if deadline and time.time() > deadline:
+        for found in _iter_anchor_hits(stream, anchor, prefer_latest):
+            if not (anchor_hits & budget.mask) and budget.expired():
                 timed_out = True
                 break
-            if prefer_latest:
-                found = text.rfind(anchor, 0, search_from)
-                if found == -1:
-                    break
-                search_from = max(0, found)
-            else:
-                found = text.find(anchor, search_from)
-                if found == -1:
-                    break
-                search_from = found + 1
             anchor_hits += 1
             left = max(0, found - len(normalized_line))
             right = min(total_len, found + len(normalized_line))
@@ -223,12 +330,10 @@ def match_line_to_tokens(
                 windows.append(key)
             if len(windows) >= max_windows:
                 break
-            if not prefer_latest:
-                continue
-            search_from = found
-        if len(windows) >= max_windows or (deadline and time.time() > deadline):
-            if deadline and time.time() > deadline:
-                timed_out = True
+        if timed_out or (not (start_idx & budget.mask) and budget.expired()):
+            timed_out = True
+            break
+        if len(windows) >= max_windows:
             break
         start_idx += 1
     if prefer_latest:
@@ -236,13 +341,14 @@ def match_line_to_tokens(
     else:
         windows.sort()
     best: MatchResult | None = None
+    pruned_windows = 0
 
     def _update(tok_lo: int, tok_hi: int, score: float, method: str) -> None:
         nonlocal best
         tok_lo = max(0, min(tok_lo, len(stream.tokens) - 1))
         tok_hi = max(tok_lo + 1, min(tok_hi, len(stream.tokens)))
-        t_start = stream.tokens[tok_lo]["start"]
-        t_end = stream.tokens[tok_hi - 1]["end"]
+        t_start = stream.starts[tok_lo]
+        t_end = stream.ends[tok_hi - 1]
         candidate = MatchResult(
             tok_start=tok_lo,
             tok_end=tok_hi,
@@ -261,43 +367,50 @@ def match_line_to_tokens(
         if abs(score - best.score) <= 1e-6 and prefer_latest and t_end > best.time_end:
             best = candidate
 
-    for left, right in windows:
-        if deadline and time.time() > deadline:
+    survivors = _qgram_survivors(stream, normalized_line, windows, max_distance_ratio)
+    boundaries = _stream_boundaries(stream)
+    budget.check_now()
+    for window_idx, (left, right) in enumerate(windows):
+        if not (window_idx & budget.mask) and budget.expired():
             timed_out = True
             break
         if right <= left:
             continue
-        tok_lo = _char_to_token(stream.char_boundaries, left)
-        tok_hi = _char_to_token(stream.char_boundaries, right, right=True)
+        if survivors is not None and not survivors[window_idx]:
+            pruned_windows += 1
+            continue
+        tok_lo = boundaries.token_at(left)
+        tok_hi = boundaries.token_at(right, right=True)
         if tok_hi <= tok_lo:
             tok_hi = tok_lo + 1
         candidate_text = text[left:right]
-        ratio = _bounded_lev(normalized_line, candidate_text, max_distance_ratio)
+        ratio = bounded_ratio(normalized_line, candidate_text, max_distance_ratio)
         if ratio <= max_distance_ratio:
             _update(tok_lo, tok_hi, ratio, "anchor+lev")
             continue
     failure_reason = ""
     if best is None:
         window = max(len(normalized_line), anchor_len * 2)
-        cursor = total_len
-        while cursor > 0:
-            if deadline and time.time() > deadline:
+        step = max(1, window // 2)
+        back_windows = [(max(0, cursor - window), cursor) for cursor in range(total_len, 0, -step)]
+        back_survivors = _qgram_survivors(stream, normalized_line, back_windows, max_distance_ratio)
+        budget.check_now()
+        for window_idx, (left, cursor) in enumerate(back_windows):
+            if not (window_idx & budget.mask) and budget.expired():
                 timed_out = True
                 break
-            left = max(0, cursor - window)
-            if cursor - left <= 0:
-                cursor -= max(1, window // 2)
+            if back_survivors is not None and not back_survivors[window_idx]:
+                pruned_windows += 1
                 continue
-            tok_lo = _char_to_token(stream.char_boundaries, left)
-            tok_hi = _char_to_token(stream.char_boundaries, cursor, right=True)
+            tok_lo = boundaries.token_at(left)
+            tok_hi = boundaries.token_at(cursor, right=True)
             if tok_hi <= tok_lo:
                 tok_hi = tok_lo + 1
             candidate_text = text[left:cursor]
-            ratio = _bounded_lev(normalized_line, candidate_text, max_distance_ratio)
+            ratio = bounded_ratio(normalized_line, candidate_text, max_distance_ratio)
             if ratio <= max_distance_ratio:
                 _update(tok_lo, tok_hi, ratio, "greedy-back")
                 break
-            cursor -= max(1, window // 2)
         if best is None:
             if timed_out:
                 failure_reason = "time-window"
@@ -311,6 +424,7 @@ def match_line_to_tokens(
                 "failure_reason": failure_reason,
                 "timed_out": timed_out,
                 "window_count": len(windows),
+                "pruned_windows": pruned_windows,
                 "anchor_hits": anchor_hits,
                 "max_distance_ratio": max_distance_ratio,
             }
@@ -321,6 +435,401 @@ def match_line_to_tokens(
     return best
 
 
+@dataclass(slots=True)
+class LineAlignment:
+    """Outcome of :func:`align_lines_global` for one script line.
+
+    ``matches`` is sorted by time; the last entry is the preferred (latest)
+    reading and earlier entries are retake candidates for the repeat stage.
+    """
+
+    matches: list[MatchResult]
+    anchor_hits: int = 0
+    failure_reason: str = ""
+
+
+def _char_span_to_tokens(stream: TokenStream, start: int, end: int) -> tuple[int, int]:
+    count = len(stream.tokens)
+    boundaries = _stream_boundaries(stream)
+    tok_lo = boundaries.token_at(start)
+    tok_hi = boundaries.token_end(end)
+    tok_lo = max(0, min(tok_lo, count - 1))
+    tok_hi = max(tok_lo + 1, min(tok_hi, count))
+    return tok_lo, tok_hi
+
+
+def _region_match(
+    query: str,
+    stream: TokenStream,
+    lo: int,
+    hi: int,
+    ratio: float,
+    anchor_hits: int,
+    method: str,
+) -> MatchResult | None:
+    text = stream.canonical_text
+    lo = max(0, lo)
+    hi = min(len(text), hi)
+    if hi <= lo:
+        return None
+    length = len(query)
+    # d <= ratio * max(len) and the matched span is at most ``length + d`` long.
+    limit = length if ratio >= 1.0 else int(math.ceil(length * max(0.0, ratio) / (1.0 - max(0.0, ratio))))
+    found = best_substring_match(query, text[lo:hi], limit)
+    if found is None:
+        return None
+    start, end, distance = found
+    score = distance / max(length, end - start)
+    if score > ratio:
+        return None
+    tok_lo, tok_hi = _char_span_to_tokens(stream, lo + start, lo + end)
+    return MatchResult(
+        tok_start=tok_lo,
+        tok_end=tok_hi,
+        time_start=stream.starts[tok_lo],
+        time_end=stream.ends[tok_hi - 1],
+        score=score,
+        anchor_hits=anchor_hits,
+        method=method,
+    )
+
+
+def match_line_exact(
+    line: str,
+    stream: TokenStream,
+    alias: Dict[str, str] | CanonicalAliasMap | None,
+    *,
+    max_occurrences: int = 1,
+) -> list[MatchResult]:
+    """Return verbatim readings of *line* in time order (latest last).
+
+    This is the cheap pass of the anytime scheduler: only exact hits of the
+    normalized line count, so each reading costs one anchor lookup. At most
+    ``max_occurrences`` non-overlapping readings are kept, counted from the
+    end of the transcript.
+    """
+
+    if not stream.tokens or not stream.canonical_text:
+        return []
+    normalized_line = _normalize_query_text(line, alias)
+    if not normalized_line:
+        return []
+    found: list[int] = []
+    for pos in _iter_anchor_hits(stream, normalized_line, True):
+        found.append(pos)
+        if len(found) >= max(1, max_occurrences):
+            break
+    matches: list[MatchResult] = []
+    for pos in reversed(found):
+        tok_lo, tok_hi = _char_span_to_tokens(stream, pos, pos + len(normalized_line))
+        matches.append(
+            MatchResult(
+                tok_start=tok_lo,
+                tok_end=tok_hi,
+                time_start=stream.starts[tok_lo],
+                time_end=stream.ends[tok_hi - 1],
+                score=0.0,
+                anchor_hits=len(found),
+                method="exact",
+            )
+        )
+    return matches
+
+
+def _chain_anchor_points(groups: Sequence[Sequence[int]], positions: Sequence[int]) -> list[int]:
+    """Longest chain increasing in both script and transcript order.
+
+    ``groups`` lists point ids per anchor in script order. The chain is
+    built back to front (Hunt–Szymanski style), keeping the latest
+    transcript position for every chain length so retakes resolve to the
+    last reading.
+    """
+
+    tails: list[int] = []
+    tail_ids: list[int] = []
+    prev = [-1] * len(positions)
+    for group in reversed(groups):
+        for pid in group:
+            key = -positions[pid]
+            slot = bisect.bisect_left(tails, key)
+            prev[pid] = tail_ids[slot - 1] if slot else -1
+            if slot == len(tails):
+                tails.append(key)
+                tail_ids.append(pid)
+            else:
+                tails[slot] = key
+                tail_ids[slot] = pid
+    chain: list[int] = []
+    cursor = tail_ids[-1] if tail_ids else -1
+    while cursor != -1:
+        chain.append(cursor)
+        cursor = prev[cursor]
+    return chain
+
+
+def align_lines_global(
+    lines: Sequence[str],
+    stream: TokenStream,
+    alias: Dict[str, str] | CanonicalAliasMap | None,
+    *,
+    min_anchor_ngram: int = 6,
+    max_distance_ratio: float | Sequence[float] = 0.35,
+    max_anchor_occurrences: int = 8,
+    max_occurrences: int = 4,
+    deadline: float | None = None,
+) -> list[LineAlignment]:
+    """Align all *lines* against *stream* in a single monotonic pass.
+
+    Anchor n-grams that are unique in the script and occur at most
+    ``max_anchor_occurrences`` times in the transcript are chained in script
+    and transcript order. Each line is then located by approximate substring
+    search inside the region its chained anchors, or its chained neighbours,
+    delimit. Earlier hits of the same anchors are verified as additional
+    retake occurrences (at most ``max_occurrences`` per line).
+    ``deadline`` is a ``time.monotonic`` timestamp; lines left when it
+    passes fail with ``time-window``.
+    """
+
+    count = len(lines)
+    results = [LineAlignment(matches=[]) for _ in range(count)]
+    text = stream.canonical_text
+    if not stream.tokens or not text:
+        for result in results:
+            result.failure_reason = "no-anchor"
+        return results
+    if isinstance(max_distance_ratio, (int, float)):
+        ratios = [float(max_distance_ratio)] * count
+    else:
+        ratios = [float(value) for value in max_distance_ratio]
+    index = stream.anchor_index if stream.anchor_index is not None else SuffixArrayIndex(text)
+    occurrence_cap = max(1, int(max_anchor_occurrences))
+    queries = [_normalize_query_text(line, alias) for line in lines]
+    budget = Deadline(deadline)
+
+    line_grams: list[list[tuple[int, str]]] = []
+    gram_counts: Counter[str] = Counter()
+    for query in queries:
+        width = max(1, min(int(min_anchor_ngram), len(query)))
+        step = max(1, width // 2)
+        offsets = list(range(0, len(query) - width + 1, step)) if query else []
+        if offsets and offsets[-1] != len(query) - width:
+            offsets.append(len(query) - width)
+        grams = [(offset, query[offset : offset + width]) for offset in offsets]
+        line_grams.append(grams)
+        gram_counts.update(gram for _, gram in grams)
+
+    point_line: list[int] = []
+    point_start: list[int] = []
+    positions: list[int] = []
+    groups: list[list[int]] = []
+    for line_idx, grams in enumerate(line_grams):
+        if not (line_idx & budget.mask) and budget.expired():
+            break
+        for offset, gram in grams:
+            if gram_counts[gram] > 1:
+                continue
+            hits = index.count(gram)
+            if hits == 0 or hits > occurrence_cap:
+                continue
+            results[line_idx].anchor_hits += hits
+            group: list[int] = []
+            for pos in index.occurrences(gram):
+                group.append(len(positions))
+                point_line.append(line_idx)
+                point_start.append(pos - offset)
+                positions.append(pos)
+            groups.append(group)
+
+    chained: list[list[int]] = [[] for _ in range(count)]
+    for pid in _chain_anchor_points(groups, positions):
+        chained[point_line[pid]].append(point_start[pid])
+    regions: list[tuple[int, int] | None] = [None] * count
+    for line_idx, starts in enumerate(chained):
+        if not starts:
+            continue
+        starts.sort()
+        median = starts[len(starts) // 2]
+        slack = int(math.ceil(len(queries[line_idx]) * ratios[line_idx])) + 1
+        regions[line_idx] = (median - slack, median + len(queries[line_idx]) + slack)
+
+    prev_end = [0] * count
+    next_start = [len(text)] * count
+    cursor = 0
+    for line_idx in range(count):
+        prev_end[line_idx] = cursor
+        if regions[line_idx] is not None:
+            cursor = max(cursor, regions[line_idx][1])
+    cursor = len(text)
+    for line_idx in range(count - 1, -1, -1):
+        next_start[line_idx] = cursor
+        if regions[line_idx] is not None:
+            cursor = min(cursor, regions[line_idx][0])
+
+    occurrence_limit = max(1, int(max_occurrences))
+    budget.check_now()
+    for line_idx, query in enumerate(queries):
+        result = results[line_idx]
+        if not query:
+            result.failure_reason = "no-anchor"
+            continue
+        if not (line_idx & budget.mask) and budget.expired():
+            for pending in results[line_idx:]:
+                if not pending.matches:
+                    pending.failure_reason = "time-window"
+            break
+        ratio = ratios[line_idx]
+        slack = int(math.ceil(len(query) * ratio)) + 1
+        primary: MatchResult | None = None
+        primary_start = len(text)
+        if regions[line_idx] is not None:
+            lo, hi = regions[line_idx]
+            primary = _region_match(query, stream, lo, hi, ratio, result.anchor_hits, "global-chain")
+        if primary is None:
+            lo = prev_end[line_idx] - slack
+            hi = next_start[line_idx] + slack
+            primary = _region_match(query, stream, lo, hi, ratio, result.anchor_hits, "global-gap")
+        if primary is None:
+            result.failure_reason = "distance" if result.anchor_hits else "no-anchor"
+            continue
+        primary_start = stream.char_boundaries[primary.tok_start]
+        found = [primary]
+        earlier: list[int] = []
+        for offset, gram in line_grams[line_idx]:
+            if gram_counts[gram] > 1 or index.count(gram) > occurrence_cap:
+                continue
+            earlier.extend(
+                pos - offset
+                for pos in index.occurrences(gram)
+                if pos - offset + len(query) // 2 < primary_start
+            )
+        earlier.sort(reverse=True)
+        bound = primary_start
+        last_probe: int | None = None
+        for start in earlier:
+            if len(found) >= occurrence_limit:
+                break
+            if last_probe is not None and start > last_probe - max(1, len(query) // 2):
+                continue
+            last_probe = start
+            retake = _region_match(
+                query,
+                stream,
+                start - slack,
+                min(bound, start + len(query) + slack),
+                ratio,
+                result.anchor_hits,
+                "global-retake",
+            )
+            if retake is not None and retake.tok_end <= primary.tok_start:
+                found.append(retake)
+                bound = stream.char_boundaries[retake.tok_start]
+        found.reverse()
+        result.matches = found
+    return results
+
+
+_LineShared = Tuple[TokenStream, Optional[Union[Dict[str, str], CanonicalAliasMap]]]
+
+# Looked up by forked workers during initialization; each call owns its own token.
+_FORK_SHARED: dict[int, _LineShared] = {}
+_FORK_LOCK = threading.Lock()
+_FORK_SEQ = 0
+# Set by the pool initializer inside worker processes only.
+_WORKER_SHARED: _LineShared | None = None
+
+
+def _init_line_pool(token: int, shared: _LineShared | None) -> None:
+    global _WORKER_SHARED
+    _WORKER_SHARED = shared if shared is not None else _FORK_SHARED[token]
+
+
+def _match_line_batch(
+    batch: Sequence[tuple[int, str, dict]],
+    deadline: float | None,
+    shared: _LineShared | None = None,
+) -> list[tuple[int, MatchResult | None, dict]]:
+    if shared is None:
+        shared = _WORKER_SHARED
+    assert shared is not None
+    stream, alias = shared
+    results: list[tuple[int, MatchResult | None, dict]] = []
+    for idx, line, options in batch:
+        details: dict = {}
+        options = dict(options)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                results.append((idx, None, {"failure_reason": "time-window", "timed_out": True}))
+                continue
+            timeout = options.get("match_timeout")
+            options["match_timeout"] = remaining if not timeout or timeout <= 0 else min(timeout, remaining)
+        result = match_line_to_tokens(line, stream, alias, debug_details=details, **options)
+        results.append((idx, result, details))
+    return results
+
+
+def match_lines_parallel(
+    lines: Sequence[tuple[int, str, dict]],
+    stream: TokenStream,
+    alias: Dict[str, str] | CanonicalAliasMap | None,
+    *,
+    workers: int,
+    deadline: float | None = None,
+) -> dict[int, tuple[MatchResult | None, dict]]:
+    """Run :func:`match_line_to_tokens` for ``(idx, line, options)`` items on a pool.
+
+    On Linux forked workers inherit the read-only *stream*; elsewhere (macOS
+    defaults to spawn because fork is unsafe there) it is pickled once per
+    worker through the pool initializer. Concurrent calls do not share
+    state. Results are keyed by ``idx`` so callers merge them in line order
+    regardless of completion order. ``deadline`` is a ``time.monotonic``
+    timestamp that also caps each line's ``match_timeout``. If the pool
+    cannot start, the lines are matched in-process instead.
+    """
+
+    global _FORK_SEQ
+    items = list(lines)
+    if not items:
+        return {}
+    workers = max(1, min(int(workers), len(items)))
+    chunk = max(1, math.ceil(len(items) / (workers * 4)))
+    batches = [items[pos : pos + chunk] for pos in range(0, len(items), chunk)]
+    shared: _LineShared = (stream, alias)
+    merged: dict[int, tuple[MatchResult | None, dict]] = {}
+    if workers > 1:
+        use_fork = sys.platform.startswith("linux") and "fork" in multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if use_fork else "spawn")
+        token = -1
+        if use_fork:
+            with _FORK_LOCK:
+                _FORK_SEQ += 1
+                token = _FORK_SEQ
+                _FORK_SHARED[token] = shared
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_init_line_pool,
+                initargs=(token, None if use_fork else shared),
+            ) as executor:
+                futures = [executor.submit(_match_line_batch, batch, deadline) for batch in batches]
+                for future in futures:
+                    for idx, result, details in future.result():
+                        merged[idx] = (result, details)
+            return merged
+        except (OSError, RuntimeError) as exc:
+            LOGGER.warning("[match] line pool unavailable (%s), matching in-process", exc)
+            merged.clear()
+        finally:
+            if use_fork:
+                with _FORK_LOCK:
+                    _FORK_SHARED.pop(token, None)
+    for batch in batches:
+        for idx, result, details in _match_line_batch(batch, deadline, shared):
+            merged[idx] = (result, details)
+    return merged
+
+
 def align_text(
     lines: Sequence[str],
     tokens: Sequence[Token],
@@ -387,9 +896,13 @@ def align_text(
 
 
 __all__ = [
+    "LineAlignment",
     "MatchResult",
     "TokenStream",
+    "align_lines_global",
     "align_text",
     "build_token_stream",
+    "match_line_exact",
     "match_line_to_tokens",
+    "match_lines_parallel",
 ]
@@ -0,0 +1,172 @@
+"""Bounded memoization for the text normalizers used during alignment."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import update_wrapper
+import threading
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+__all__ = [
+    "NORMALIZER_VERSION",
+    "NormalizationMemo",
+    "memo_snapshot",
+    "memo_stats",
+    "memoize_normalizer",
+]
+
+NORMALIZER_VERSION = 2
+"""Bump when normalize_for_align, alias handling or token normalization change.
+
+It keys both the in-process memo and the on-disk ASR cache
+(:mod:`onepass.asr_cache`), so stale results are never reused.
+"""
+
+T = TypeVar("T")
+
+_ALIAS_LIMIT = 16
+
+_REGISTRY: Dict[str, "NormalizationMemo"] = {}
+
+
+class NormalizationMemo(Generic[T]):
+    """Thread-safe LRU cache for a pure ``func(text[, alias])`` with hit/miss counters.
+
+    Entries are keyed on ``(NORMALIZER_VERSION, alias identity, text)``. Alias
+    maps are compared by identity and size. References to the most recent
+    ``_ALIAS_LIMIT`` maps are kept so an id cannot be recycled while its
+    entries live; evicting a map also drops its entries. Texts longer than
+    ``max_text_len`` bypass the cache; they are rarely repeated and would pin
+    a lot of memory.
+    """
+
+    __slots__ = (
+        "name",
+        "func",
+        "maxsize",
+        "max_text_len",
+        "hits",
+        "misses",
+        "_entries",
+        "_aliases",
+        "_lock",
+        "__dict__",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., T],
+        *,
+        maxsize: int = 8192,
+        max_text_len: int = 512,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.maxsize = max(0, int(maxsize))
+        self.max_text_len = max_text_len
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, Hashable, str], T]" = OrderedDict()
+        self._aliases: "OrderedDict[int, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        update_wrapper(self, func)
+
+    def _alias_key(self, alias: object) -> Hashable:
+        """Return the key part for *alias*; the caller holds ``_lock``."""
+
+        if not alias:
+            return None
+        ident = id(alias)
+        aliases = self._aliases
+        if ident in aliases:
+            aliases.move_to_end(ident)
+        else:
+            aliases[ident] = alias
+            if len(aliases) > _ALIAS_LIMIT:
+                self._drop_alias(aliases.popitem(last=False)[0])
+        try:
+            return (ident, len(alias))  # type: ignore[arg-type]
+        except TypeError:
+            return (ident, -1)
+
+    def _drop_alias(self, ident: int) -> None:
+        stale = [key for key in self._entries if key[1] is not None and key[1][0] == ident]  # type: ignore[index]
+        for key in stale:
+            del self._entries[key]
+
+    def __call__(self, text: str, *alias: object) -> T:
+        if not self.maxsize or len(text) > self.max_text_len:
+            return self.func(text, *alias)
+        entries = self._entries
+        with self._lock:
+            key = (NORMALIZER_VERSION, self._alias_key(alias[0] if alias else None), text)
+            try:
+                value = entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                entries.move_to_end(key)
+                return value
+        value = self.func(text, *alias)
+        with self._lock:
+            if key[1] is not None and key[1][0] not in self._aliases:  # type: ignore[index]
+                return value  # alias map was evicted meanwhile; its id may be recycled
+            entries[key] = value
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def memoize_normalizer(
+    name: str,
+    *,
+    maxsize: int = 8192,
+    max_text_len: int = 512,
+) -> Callable[[Callable[..., T]], NormalizationMemo[T]]:
+    """Decorator registering *func* under *name* so its counters show up in run stats."""
+
+    def _wrap(func: Callable[..., T]) -> NormalizationMemo[T]:
+        memo = NormalizationMemo(name, func, maxsize=maxsize, max_text_len=max_text_len)
+        _REGISTRY[name] = memo
+        return memo
+
+    return _wrap
+
+
+def memo_snapshot() -> Dict[str, Tuple[int, int]]:
+    """Return ``name -> (hits, misses)`` for every registered memo."""
+
+    return {name: (memo.hits, memo.misses) for name, memo in _REGISTRY.items()}
+
+
+def memo_stats(since: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict[str, Dict[str, float]]:
+    """Hit/miss counters per memo, relative to an earlier :func:`memo_snapshot`.
+
+    Counters are per process; line workers in a process pool keep their own.
+    """
+
+    since = since or {}
+    report: Dict[str, Dict[str, float]] = {}
+    for name, memo in _REGISTRY.items():
+        base_hits, base_misses = since.get(name, (0, 0))
+        hits = memo.hits - base_hits
+        misses = memo.misses - base_misses
+        total = hits + misses
+        report[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "size": len(memo),
+        }
+    return report
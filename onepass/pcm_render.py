@@ -0,0 +1,515 @@
+"""PCM 直拷渲染引擎：源音频只解码一次，按样本区间拼接保留片段。
+
+``build_filter_pipeline`` 为每个保留片段生成一条 ``atrim`` 链，片段上千时
+``filter_complex`` 与滤镜图都会急剧膨胀。本引擎改为：
+
+1. 源文件已是 16-bit PCM WAV 且采样率/声道满足要求时直接使用，否则调用一次
+   ffmpeg 解码为临时 WAV；
+2. 用 ``mmap`` 映射 WAV 数据段，按样本帧切出 ``memoryview`` 片段顺序写入输出，
+   不经过任何滤镜，也不把整段音频读入内存；
+3. 可选在拼接处做短交叉淡化（与 ``acrossfade`` 相同，重叠区线性混合，
+   每个接缝缩短 ``crossfade_ms``）；
+4. 传入 :class:`~onepass.render_cache.RenderChunkCache` 时按片段缓存解码结果，
+   编辑少量区域后再次渲染只解码改动的片段。
+"""
+from __future__ import annotations
+
+import contextlib
+import logging
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import wave
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+from .audio_analysis import audio_duration, lookup_analysis
+from .render_cache import RenderChunkCache, source_fingerprint
+from .utils.subproc import run_cmd
+
+try:  # NumPy 可选：仅用于加速交叉淡化的混合计算
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+
+__all__ = ["WavLayout", "build_decode_command", "needs_decode", "read_wav_layout", "render_pcm"]
+
+LOGGER = logging.getLogger(__name__)
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+_CHUNK = struct.Struct("<4sI")
+_RANGE_DECODE_LIMIT = 16  # 缺失片段超过该数量时改为整段解码一次
+_WRITE_STEP = 1 << 20  # 按块复制为 bytes 写出，writer 不持有映射切片
+
+
+@dataclass(slots=True)
+class WavLayout:
+    """PCM WAV 的格式参数与数据段位置。"""
+
+    sample_rate: int
+    channels: int
+    sample_width: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def block_align(self) -> int:
+        return self.channels * self.sample_width
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // self.block_align
+
+
+def read_wav_layout(path: Path) -> WavLayout | None:
+    """解析 RIFF 头；非整型 PCM WAV 或文件损坏时返回 ``None``。"""
+
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as handle:
+            riff = handle.read(12)
+            if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+                return None
+            fmt: tuple[int, int, int, int] | None = None
+            while True:
+                header = handle.read(_CHUNK.size)
+                if len(header) < _CHUNK.size:
+                    return None
+                chunk_id, size = _CHUNK.unpack(header)
+                if chunk_id == b"fmt ":
+                    body = handle.read(size)
+                    if len(body) < 16:
+                        return None
+                    tag, channels, rate, _, _, bits = struct.unpack_from("<HHIIHH", body)
+                    if tag == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                        tag = struct.unpack_from("<H", body, 24)[0]
+                    fmt = (tag, channels, rate, bits)
+                    handle.seek(size % 2, os.SEEK_CUR)
+                    continue
+                if chunk_id == b"data":
+                    if fmt is None:
+                        return None
+                    tag, channels, rate, bits = fmt
+                    if tag != _WAVE_FORMAT_PCM or channels <= 0 or rate <= 0 or bits % 8:
+                        return None
+                    offset = handle.tell()
+                    # 管道写出的 WAV 可能带占位长度，以实际文件大小为准
+                    data_size = min(size, file_size - offset)
+                    layout = WavLayout(rate, channels, bits // 8, offset, 0)
+                    layout.data_size = data_size - data_size % layout.block_align
+                    return layout
+                handle.seek(size + size % 2, os.SEEK_CUR)
+    except (OSError, struct.error):
+        return None
+
+
+def build_decode_command(
+    source: Path,
+    target: Path,
+    samplerate: int | None,
+    channels: int | None,
+    *,
+    ffmpeg: str = "ffmpeg",
+) -> list[str]:
+    """返回把 *source* 解码为 16-bit PCM WAV 的 ffmpeg 命令。"""
+
+    cmd = [ffmpeg, "-hide_banner", "-nostats", "-loglevel", "error", "-y", "-i", str(source), "-vn"]
+    cmd.extend(["-map_metadata", "-1", "-acodec", "pcm_s16le"])
+    if samplerate:
+        cmd.extend(["-ar", str(samplerate)])
+    if channels:
+        cmd.extend(["-ac", str(channels)])
+    cmd.extend(["-f", "wav", str(target)])
+    return cmd
+
+
+def needs_decode(layout: WavLayout | None, samplerate: int | None, channels: int | None) -> bool:
+    """源文件无法直接映射（非 16-bit PCM 或采样率/声道不符）时返回 ``True``。"""
+
+    if layout is None or layout.sample_width != 2:
+        return True
+    if samplerate and samplerate != layout.sample_rate:
+        return True
+    return bool(channels and channels != layout.channels)
+
+
+def _frame_ranges(keeps: Sequence[tuple[float, float]], rate: int, total: int) -> list[tuple[int, int]]:
+    """把秒级区间换算为样本帧区间，并合并首尾相接的片段。"""
+
+    ranges: list[tuple[int, int]] = []
+    for start, end in keeps:
+        first = max(0, min(total, int(round(start * rate))))
+        last = max(0, min(total, int(round(end * rate))))
+        if last <= first:
+            continue
+        if ranges and first <= ranges[-1][1]:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], last))
+        else:
+            ranges.append((first, last))
+    return ranges
+
+
+def _mix(tail, head, channels: int) -> bytes:
+    """线性交叉淡化两段等长的 16-bit 交错采样。"""
+
+    if np is not None:
+        out_part = np.frombuffer(tail, dtype="<i2").reshape(-1, channels).astype(np.float32)
+        in_part = np.frombuffer(head, dtype="<i2").reshape(-1, channels).astype(np.float32)
+        frames = len(out_part)
+        gain = ((np.arange(frames, dtype=np.float32) + 0.5) / frames)[:, None]
+        mixed = out_part * (1.0 - gain) + in_part * gain
+        return np.clip(np.rint(mixed), -32768, 32767).astype("<i2").tobytes()
+    out_part = array("h", bytes(tail))
+    in_part = array("h", bytes(head))
+    frames = len(out_part) // channels
+    mixed = array("h", bytes(len(out_part) * 2))
+    for idx in range(len(out_part)):
+        gain = (idx // channels + 0.5) / frames
+        value = int(round(out_part[idx] * (1.0 - gain) + in_part[idx] * gain))
+        mixed[idx] = max(-32768, min(32767, value))
+    return mixed.tobytes()
+
+
+def _write_range(writer: wave.Wave_write, data, lo: int, hi: int) -> None:
+    """分块写出 ``data[lo:hi]``。
+
+    写入失败时 traceback 会保留 writer 的参数；只交给它 ``bytes``，映射就不会
+    残留导出指针，上层关闭 mmap 时不会以 ``BufferError`` 掩盖原始异常。
+    """
+
+    for pos in range(lo, hi, _WRITE_STEP):
+        writer.writeframesraw(bytes(data[pos : min(hi, pos + _WRITE_STEP)]))
+
+
+def _write_segments(
+    writer: wave.Wave_write,
+    segments: Iterable,
+    block: int,
+    channels: int,
+    fade_frames: int,
+) -> int:
+    """逐个写出片段，返回写出的帧数。
+
+    接缝处把上一段尾部复制为 ``bytes`` 暂存，等待与下一段开头混合；片段可以
+    是逐个产出的迭代器，调用方无需同时持有全部片段。
+    """
+
+    written = 0
+    pending: bytes | None = None
+    for segment in segments:
+        start, size = 0, len(segment)
+        if pending is not None:
+            written += len(pending) // block
+            overlap = min(len(pending), (size // block // 2) * block)
+            if overlap < len(pending):
+                writer.writeframesraw(pending[: len(pending) - overlap])
+            if overlap:
+                writer.writeframesraw(_mix(pending[len(pending) - overlap :], bytes(segment[:overlap]), channels))
+                start = overlap
+            pending = None
+        reserve = min(fade_frames, (size - start) // block // 2) * block if fade_frames else 0
+        _write_range(writer, segment, start, size - reserve)
+        if reserve:
+            pending = bytes(segment[size - reserve : size])
+        written += (size - start - reserve) // block
+    if pending is not None:
+        writer.writeframesraw(pending)
+        written += len(pending) // block
+    return written
+
+
+def _write_wav(
+    output_path: Path,
+    segments: Iterable,
+    sample_rate: int,
+    channels: int,
+    crossfade_ms: float,
+) -> int:
+    """把 16-bit 片段写成 WAV（先写临时文件再原子替换），返回帧数。"""
+
+    fade_frames = max(0, int(round(crossfade_ms / 1000.0 * sample_rate)))
+    tmp_output = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+    try:
+        with wave.open(str(tmp_output), "wb") as writer:
+            writer.setnchannels(channels)
+            writer.setsampwidth(2)
+            writer.setframerate(sample_rate)
+            frames = _write_segments(writer, segments, channels * 2, channels, fade_frames)
+        os.replace(tmp_output, output_path)
+    finally:
+        tmp_output.unlink(missing_ok=True)
+    return frames
+
+
+def _decode_to_wav(
+    source: Path,
+    target: Path,
+    samplerate: int | None,
+    channels: int | None,
+    ffmpeg: str,
+) -> WavLayout:
+    cmd = build_decode_command(source, target, samplerate, channels, ffmpeg=ffmpeg)
+    LOGGER.info("[render-pcm] decode source=%s", source)
+    try:
+        cp = run_cmd(cmd)
+    except FileNotFoundError as exc:
+        raise RuntimeError("未找到 ffmpeg，请安装后再试或将其加入 PATH。") from exc
+    if cp.returncode != 0:
+        target.unlink(missing_ok=True)
+        snippet = ((cp.stderr or "").strip() or (cp.stdout or "").strip()).splitlines()[:5]
+        raise RuntimeError(f"ffmpeg 解码失败（退出码 {cp.returncode}）。stderr=" + " | ".join(snippet))
+    layout = read_wav_layout(target)
+    if layout is None:
+        target.unlink(missing_ok=True)
+        raise RuntimeError("ffmpeg 解码结果不是有效的 PCM WAV。")
+    return layout
+
+
+def _decode_range(
+    source: Path,
+    first: int,
+    last: int,
+    sample_rate: int,
+    channels: int,
+    ffmpeg: str,
+) -> bytes:
+    """只解码 ``[first, last)`` 帧，返回恰好等长的 16-bit 交错 PCM。"""
+
+    cmd = [
+        ffmpeg,
+        "-hide_banner",
+        "-nostats",
+        "-loglevel",
+        "error",
+        "-nostdin",
+        "-ss",
+        f"{first / sample_rate:.6f}",
+        "-to",
+        f"{last / sample_rate:.6f}",
+        "-i",
+        str(source),
+        "-vn",
+        "-ac",
+        str(channels),
+        "-ar",
+        str(sample_rate),
+        "-acodec",
+        "pcm_s16le",
+        "-f",
+        "s16le",
+        "-",
+    ]
+    try:
+        completed = subprocess.run(cmd, capture_output=True, check=False)
+    except FileNotFoundError as exc:
+        raise RuntimeError("未找到 ffmpeg，请安装后再试或将其加入 PATH。") from exc
+    if completed.returncode != 0:
+        snippet = (completed.stderr or b"").decode("utf-8", "ignore").strip().splitlines()[:5]
+        raise RuntimeError(
+            f"ffmpeg 解码片段失败（退出码 {completed.returncode}）。stderr=" + " | ".join(snippet)
+        )
+    return _fit(completed.stdout or b"", (last - first) * channels * 2)
+
+
+def _fit(data, size: int) -> bytes:
+    """截断或补零到 *size* 字节，保证块长度与样本区间严格一致。"""
+
+    if len(data) >= size:
+        return bytes(data[:size])
+    return bytes(data) + b"\0" * (size - len(data))
+
+
+def _probe_stream(source: Path) -> tuple[int, int] | None:
+    """返回首条音轨的 (采样率, 声道数)：WAV 头 → 分析缓存 → ffprobe。"""
+
+    layout = read_wav_layout(source)
+    if layout is not None:
+        return layout.sample_rate, layout.channels
+    record = lookup_analysis(source)
+    if record is not None and record.sample_rate and record.channels:
+        return record.sample_rate, record.channels
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-select_streams",
+        "a:0",
+        "-show_entries",
+        "stream=sample_rate,channels",
+        "-of",
+        "default=noprint_wrappers=1",
+        str(source),
+    ]
+    try:
+        cp = run_cmd(cmd)
+    except FileNotFoundError:
+        return None
+    values = dict(line.split("=", 1) for line in (cp.stdout or "").splitlines() if "=" in line)
+    try:
+        return int(values["sample_rate"]), int(values["channels"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _iter_chunks(paths: Sequence[Path]) -> Iterator[memoryview]:
+    """逐个映射缓存块；同一时刻只占用一个块的文件句柄与映射。"""
+
+    for path in paths:
+        with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+def _render_cached(
+    source: Path,
+    keeps: Sequence[tuple[float, float]],
+    output_path: Path,
+    *,
+    samplerate: int | None,
+    channels: int | None,
+    crossfade_ms: float,
+    ffmpeg: str,
+    cache: RenderChunkCache,
+) -> Path | None:
+    """经片段缓存渲染；无法确定采样参数或源指纹时返回 ``None`` 交给常规路径。"""
+
+    fingerprint = source_fingerprint(source)
+    if fingerprint is None:
+        return None
+    if not samplerate or not channels:
+        probed = _probe_stream(source)
+        if probed is None:
+            return None
+        samplerate = samplerate or probed[0]
+        channels = channels or probed[1]
+    block = channels * 2
+    duration = audio_duration(source)
+    total = int(round(duration * samplerate)) if duration else sys.maxsize
+    ranges = _frame_ranges(keeps, samplerate, total)
+    if not ranges:
+        raise RuntimeError("有效保留片段时长为 0，无法生成输出。")
+    keys = [cache.key(fingerprint, first, last, samplerate, channels) for first, last in ranges]
+    hits_before = cache.hits
+    paths = [cache.get(key) for key in keys]
+    missing = [idx for idx, path in enumerate(paths) if path is None]
+    if missing:
+        missing_frames = sum(ranges[idx][1] - ranges[idx][0] for idx in missing)
+        if len(missing) > _RANGE_DECODE_LIMIT or (
+            total != sys.maxsize and missing_frames * 4 > total
+        ):
+            # 改动面较大（含首次渲染）：整段解码一次再切块，比逐段启动 ffmpeg 快
+            decoded = output_path.with_name(f".{output_path.stem}.{os.getpid()}.decode.wav")
+            try:
+                layout = _decode_to_wav(source, decoded, samplerate, channels, ffmpeg)
+                with open(decoded, "rb") as handle, mmap.mmap(
+                    handle.fileno(), 0, access=mmap.ACCESS_READ
+                ) as mapped:
+                    base = layout.data_offset
+                    end = base + layout.data_size
+                    for idx in missing:
+                        first, last = ranges[idx]
+                        lo = min(end, base + first * block)
+                        hi = min(end, base + last * block)
+                        paths[idx] = cache.put(keys[idx], _fit(mapped[lo:hi], (last - first) * block))
+            finally:
+                decoded.unlink(missing_ok=True)
+        else:
+            for idx in missing:
+                first, last = ranges[idx]
+                data = _decode_range(source, first, last, samplerate, channels, ffmpeg)
+                paths[idx] = cache.put(keys[idx], data)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with contextlib.closing(_iter_chunks(paths)) as chunks:
+        frames = _write_wav(output_path, chunks, samplerate, channels, crossfade_ms)
+    cache.prune()
+    LOGGER.info(
+        "[render-pcm] output=%s segments=%s frames=%s reused=%s decoded=%s crossfade_ms=%.1f",
+        output_path,
+        len(ranges),
+        frames,
+        cache.hits - hits_before,
+        len(missing),
+        crossfade_ms,
+    )
+    return output_path
+
+
+def render_pcm(
+    source: Path,
+    keeps: Sequence[tuple[float, float]],
+    output_path: Path,
+    *,
+    samplerate: int | None = None,
+    channels: int | None = None,
+    crossfade_ms: float = 0.0,
+    ffmpeg: str = "ffmpeg",
+    chunk_cache: RenderChunkCache | None = None,
+) -> Path:
+    """把 *source* 中的保留区间（秒）写成 16-bit PCM WAV，返回输出路径。
+
+    提供 ``chunk_cache`` 且源文件需要解码时，按片段缓存解码结果，再次渲染只解码
+    新增或改动的片段；可直接映射的 WAV 本身就无需解码，不经过缓存。
+    """
+
+    if not keeps:
+        raise ValueError("缺少保留片段，无法渲染。")
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    layout = read_wav_layout(source)
+    if chunk_cache is not None and needs_decode(layout, samplerate, channels):
+        rendered = _render_cached(
+            Path(source),
+            keeps,
+            output_path,
+            samplerate=samplerate,
+            channels=channels,
+            crossfade_ms=crossfade_ms,
+            ffmpeg=ffmpeg,
+            cache=chunk_cache,
+        )
+        if rendered is not None:
+            return rendered
+    decoded: Path | None = None
+    if needs_decode(layout, samplerate, channels):
+        decoded = output_path.with_name(f".{output_path.stem}.{os.getpid()}.decode.wav")
+        layout = _decode_to_wav(source, decoded, samplerate, channels, ffmpeg)
+    if layout is None:
+        raise RuntimeError("源音频不是可直接映射的 PCM WAV。")
+    pcm_path = decoded or Path(source)
+    try:
+        ranges = _frame_ranges(keeps, layout.sample_rate, layout.frames)
+        if not ranges:
+            raise RuntimeError("有效保留片段时长为 0，无法生成输出。")
+        block = layout.block_align
+        with open(pcm_path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            data = view[layout.data_offset : layout.data_offset + layout.data_size]
+            segments: list[memoryview] = []
+            try:
+                segments.extend(data[first * block : last * block] for first, last in ranges)
+                frames = _write_wav(output_path, segments, layout.sample_rate, layout.channels, crossfade_ms)
+            finally:
+                # 先释放全部切片，否则 mmap 关闭时抛出 BufferError 掩盖原始异常
+                for segment in segments:
+                    segment.release()
+                data.release()
+                view.release()
+    finally:
+        if decoded is not None:
+            decoded.unlink(missing_ok=True)
+    LOGGER.info(
+        "[render-pcm] output=%s segments=%s frames=%s crossfade_ms=%.1f",
+        output_path,
+        len(ranges),
+        frames,
+        crossfade_ms,
+    )
+    return output_path
@@ -0,0 +1,102 @@
+"""PCM 渲染的分段缓存：按保留片段缓存已解码的样本，增量重渲染时复用。
+
+每个保留片段解码后的 16-bit 交错 PCM 写成一个无头 ``.pcm`` 文件，键为
+(源文件指纹, 起止样本帧, 采样率, 声道数)。源文件指纹取绝对路径、大小与修改
+时间，文件变化后旧块自然失效。Web 控制台中修改一个区域再渲染时，未变的片段
+直接从缓存读取，只需解码新增或改动的片段。
+
+缓存总量超过 ``max_bytes`` 时按最近使用时间淘汰（命中会刷新文件 mtime）。
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+
+__all__ = ["RenderChunkCache", "source_fingerprint"]
+
+LOGGER = logging.getLogger(__name__)
+
+_DEFAULT_MAX_BYTES = 4 << 30
+
+
+def source_fingerprint(path: Path) -> str | None:
+    """返回源文件指纹；文件不可访问时返回 ``None``。"""
+
+    try:
+        resolved = Path(path).expanduser().resolve()
+        stat = resolved.stat()
+    except OSError:
+        return None
+    raw = f"{resolved}\0{stat.st_size}\0{stat.st_mtime_ns}"
+    return hashlib.sha1(raw.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class RenderChunkCache:
+    """磁盘上的片段 PCM 缓存，``hits`` / ``misses`` 统计本实例的查询结果。"""
+
+    def __init__(self, root: Path, *, max_bytes: int = _DEFAULT_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(fingerprint: str, first: int, last: int, sample_rate: int, channels: int) -> str:
+        raw = f"{fingerprint}:{first}:{last}:{sample_rate}:{channels}"
+        return hashlib.sha1(raw.encode("ascii")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pcm"
+
+    def get(self, key: str) -> Path | None:
+        """命中时返回块文件路径并刷新其使用时间。"""
+
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key: str, data) -> Path:
+        """原子写入一个块，返回其路径。"""
+
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+    def prune(self) -> int:
+        """超过容量上限时删除最久未用的块，返回释放的字节数。"""
+
+        if not self.max_bytes or not self.root.exists():
+            return 0
+        entries = []
+        total = 0
+        for path in self.root.glob("*/*.pcm"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+        freed = 0
+        if total <= self.max_bytes:
+            return 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            freed += size
+        LOGGER.info("[render-cache] pruned bytes=%s root=%s", freed, self.root)
+        return freed
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import logging
+import math
 import re
 import unicodedata
+from collections import Counter
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Iterable, Mapping, Sequence
 
 from ._legacy_text_norm import apply_alias_map, normalize_for_align
+from .utils.lev import levenshtein_within
 
 try:  # pragma: no cover - optional dependency
     from pypinyin import Style, lazy_pinyin
@@ -19,6 +23,7 @@ except Exception:  # pragma: no cover - fallback when pypinyin missing
 LOGGER = logging.getLogger(__name__)
 
 _CJK_CHAR = re.compile(r"[\u3400-\u9fff]")
+_KEY_QGRAM = 2
 
 
 @dataclass(slots=True)
@@ -54,41 +59,110 @@ def _normalize_line(text: str, alias_map: Mapping[str, Sequence[str]] | None) ->
     return normalized
 
 
+@lru_cache(maxsize=None)
+def _pinyin_initial(char: str) -> str:
+    """单字拼音首字母（非汉字取 NFKC 小写首字符），按字符缓存。"""
+
+    if _CJK_CHAR.match(char):
+        try:
+            letters = lazy_pinyin(char, style=Style.FIRST_LETTER if Style else None, strict=False)
+        except Exception:  # pragma: no cover - third party errors
+            letters = []
+        if letters and letters[0]:
+            return letters[0][0]
+    normalized = unicodedata.normalize("NFKC", char).lower()
+    return normalized[:1]
+
+
 def _pinyin_key(text: str) -> str:
     if not text:
         return ""
-    tokens: list[str] = []
-    for char in text:
-        if _CJK_CHAR.match(char):
-            try:
-                letters = lazy_pinyin(char, style=Style.FIRST_LETTER if Style else None, strict=False)
-            except Exception:  # pragma: no cover - third party errors
-                letters = []
-            if letters and letters[0]:
-                tokens.append(letters[0][0])
+    return "".join(_pinyin_initial(char) for char in text)
+
+
+def _max_edits(longest: int, dist_max: float) -> int:
+    """返回满足 ``d / longest <= dist_max`` 的最大编辑距离 ``d``。"""
+
+    edits = int(math.floor(longest * dist_max))
+    while (edits + 1) / longest <= dist_max:
+        edits += 1
+    while edits >= 0 and edits / longest > dist_max:
+        edits -= 1
+    return edits
+
+
+def _qgram_counts(text: str) -> Counter[str]:
+    return Counter(text[idx : idx + _KEY_QGRAM] for idx in range(len(text) - _KEY_QGRAM + 1))
+
+
+class _LineKeyIndex:
+    """已有行键的索引，按登记顺序返回第一个等价的键。
+
+    查找顺序：同一文本的结果缓存 → 精确键哈希 → 长度分桶与 q-gram 计数过滤
+    （``d`` 次编辑至多破坏 ``q * d`` 个 q-gram）→ 超过 ``dist_max`` 即停止的
+    有界编辑距离。结果与逐个键比较归一化编辑距离的写法一致。
+    """
+
+    __slots__ = ("dist_max", "keys", "positions", "by_length", "postings", "resolved")
+
+    def __init__(self, dist_max: float) -> None:
+        self.dist_max = dist_max
+        self.keys: list[str] = []
+        self.positions: dict[str, int] = {}
+        self.by_length: dict[int, list[int]] = {}
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        self.resolved: dict[str, str] = {}
+
+    def _add(self, key: str) -> None:
+        pos = len(self.keys)
+        self.keys.append(key)
+        self.positions[key] = pos
+        self.by_length.setdefault(len(key), []).append(pos)
+        for gram, count in _qgram_counts(key).items():
+            self.postings.setdefault(gram, []).append((pos, count))
+
+    def _candidates(self, base: str, limit: int) -> list[int]:
+        length = len(base)
+        shared: dict[int, int] | None = None
+        candidates: list[int] = []
+        for key_length, bucket in self.by_length.items():
+            longest = max(length, key_length)
+            edits = _max_edits(longest, self.dist_max)
+            if abs(length - key_length) > edits:
                 continue
-        normalized = unicodedata.normalize("NFKC", char).lower()
-        if normalized:
-            tokens.append(normalized[0])
-    return "".join(tokens)
-
-
-def _normalized_distance(left: str, right: str) -> float:
-    if left == right:
-        return 0.0
-    if not left or not right:
-        return 1.0
-    n, m = len(left), len(right)
-    prev = list(range(m + 1))
-    for i in range(1, n + 1):
-        current = [i] + [0] * m
-        li = left[i - 1]
-        for j in range(1, m + 1):
-            cost = 0 if li == right[j - 1] else 1
-            current[j] = min(prev[j] + 1, current[j - 1] + 1, prev[j - 1] + cost)
-        prev = current
-    distance = prev[m]
-    return distance / max(n, m, 1)
+            need = longest - _KEY_QGRAM + 1 - _KEY_QGRAM * edits
+            if need <= 0:
+                candidates.extend(pos for pos in bucket if pos < limit)
+                continue
+            if shared is None:
+                shared = {}
+                for gram, count in _qgram_counts(base).items():
+                    for pos, key_count in self.postings.get(gram, ()):
+                        shared[pos] = shared.get(pos, 0) + min(count, key_count)
+            candidates.extend(pos for pos in bucket if pos < limit and shared.get(pos, 0) >= need)
+        candidates.sort()
+        return candidates
+
+    def assign(self, base: str) -> str:
+        cached = self.resolved.get(base)
+        if cached is not None:
+            return cached
+        exact = self.positions.get(base)
+        limit = len(self.keys) if exact is None else exact
+        result = None
+        for pos in self._candidates(base, limit):
+            reference = self.keys[pos]
+            longest = max(len(base), len(reference))
+            edits = _max_edits(longest, self.dist_max)
+            if levenshtein_within(base, reference, edits) <= edits:
+                result = reference
+                break
+        if result is None:
+            if exact is None:
+                self._add(base)
+            result = base
+        self.resolved[base] = result
+        return result
 
 
 def _assign_line_key(
@@ -96,21 +170,14 @@ def _assign_line_key(
     *,
     alias_map: Mapping[str, Sequence[str]] | None,
     eq_mode: str,
-    existing: list[tuple[str, str]],
-    dist_max: float,
+    existing: _LineKeyIndex,
 ) -> str:
     base = normalized_text
     if eq_mode == "pinyin":
         base = _pinyin_key(base) or base
     if not base:
         base = "_"
-    for key, reference in existing:
-        if base == key:
-            return key
-        if _normalized_distance(base, reference) <= dist_max:
-            return key
-    existing.append((base, base))
-    return base
+    return existing.assign(base)
 
 
 def cluster_candidates(
@@ -126,12 +193,12 @@ def cluster_candidates(
         eq_value = "char"
     dist_gate = max(0.0, float(dist_max))
     window = max(0.0, float(dedupe_window))
-    key_refs: list[tuple[str, str]] = []
+    key_index = _LineKeyIndex(dist_gate)
     grouped: dict[str, list[RepeatCandidate]] = {}
     for match in matches:
         line_text = str(match.get("line_text", "") or "")
         normalized = _normalize_line(line_text, alias_map)
-        key = _assign_line_key(normalized, alias_map=alias_map, eq_mode=eq_value, existing=key_refs, dist_max=dist_gate)
+        key = _assign_line_key(normalized, alias_map=alias_map, eq_mode=eq_value, existing=key_index)
         candidate = RepeatCandidate(
             candidate_id=int(match.get("candidate_id", -1)),
             line_idx=int(match.get("line_idx", 0)),
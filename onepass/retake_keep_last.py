@@ -8,13 +8,16 @@ import re
 import time
 import itertools
 import unicodedata
-from collections import Counter, defaultdict
+from array import array
+from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Mapping, Sequence
 
 
-from .asr_loader import Word
+from .asr_loader import Word, WordArray
+from .asr_cache import NormalizedASR
+from .audio_analysis import audio_duration
 from .edl_writer import EDLWriteResult, write_edl
 from .markers_writer import write_audition_csv
 from .sent_align import (
@@ -27,11 +30,24 @@ from .sent_align import (
     KeepSpan as SentenceKeepSpan,
     align_sentences_from_text,
 )
-from .boundary import snap_segment
-from .match_core import MatchResult, TokenStream, build_token_stream, match_line_to_tokens
+from .boundary import snap_segments
+from .silence_probe import SilenceIndex
+from .match_core import (
+    LineAlignment,
+    MatchResult,
+    TokenStream,
+    align_lines_global,
+    build_token_stream,
+    match_line_exact,
+    match_line_to_tokens,
+    match_lines_parallel,
+)
+from .text_index import CharBoundaryIndex, QGramIndex, SuffixArrayIndex
+from .utils.deadline import Deadline
 from .retake_seq import enforce_monotonic
 from .repeat_detect import cluster_candidates, supports_pinyin
 from .dp_path import select_best_path
+from .norm_memo import memo_snapshot, memo_stats, memoize_normalizer
 from ._legacy_text_norm import (
     apply_alias_map,
     build_char_index_map,
@@ -40,7 +56,7 @@ from ._legacy_text_norm import (
     normalize_text,
 )
 from .utils.subproc import run_cmd
-from .debug_utils import is_debug_logging_enabled, log_debug, make_log_limit
+from .debug_utils import NULL_DEBUG_SINK, DebugSink, is_debug_logging_enabled, log_debug, make_log_limit
 
 LOGGER = logging.getLogger(__name__)
 
@@ -304,7 +320,7 @@ class RetakeResult:
     dp_path_rows: list[dict[str, object]] | None = None
 
 
-def infer_pause_boundaries(words: list[Word], gap: float = PAUSE_GAP_SEC) -> list[tuple[float, float]]:
+def infer_pause_boundaries(words: Sequence[Word], gap: float = PAUSE_GAP_SEC) -> list[tuple[float, float]]:
     """基于词级时间戳推断停顿区间。"""
 
     if not words:  # 无词直接返回空列表
@@ -313,13 +329,14 @@ def infer_pause_boundaries(words: list[Word], gap: float = PAUSE_GAP_SEC) -> lis
     pauses: list[tuple[float, float]] = []
     if gap <= 0.0:  # 阈值为 0 表示不识别停顿
         return pauses
-    for prev, current in zip(words, words[1:]):  # 遍历相邻词
-        distance = current.start - prev.end  # 计算词间空隙
-        if distance >= gap:  # 达到阈值视为停顿区
-            left = prev.end
-            right = current.start
-            if right > left:  # 仅记录有效区间
-                pauses.append((left, right))
+    columns = WordArray.from_words(words)
+    ends = columns.ends
+    starts = columns.starts
+    for idx in range(1, len(starts)):  # 遍历相邻词（直接读时间列）
+        left = ends[idx - 1]
+        right = starts[idx]
+        if right - left >= gap and right > left:  # 达到阈值视为停顿区，仅记录有效区间
+            pauses.append((left, right))
     return pauses
 
 
@@ -339,24 +356,24 @@ def _merge_ranges(intervals: Iterable[tuple[float, float]]) -> list[tuple[float,
     return merged
 
 
-def _snap_value(value: float, candidates: Sequence[float], limit: float) -> float:
-    """将时间点吸附到最近的候选边界。"""
+def _snap_value(value: float, candidates: SilenceIndex | Sequence[float], limit: float) -> float:
+    """将时间点吸附到最近的候选边界（传入 SilenceIndex 时走二分查找）。"""
 
     if not candidates:
         return value
     limit = max(0.0, limit)
+    if isinstance(candidates, SilenceIndex):
+        best = candidates.nearest(value, limit)
+        return value if best is None else best
     best = min(candidates, key=lambda item: abs(item - value))
     if abs(best - value) <= limit:
         return best
     return value
 
 
-def _resolve_audio_duration(words: Sequence[Word], audio_path: Path | None) -> float:
-    """优先通过 ffprobe 获取音频时长，失败时回退到词序列终点。"""
+def _ffprobe_duration(audio_path: Path) -> float | None:
+    """调用 ffprobe 读取容器时长，任何失败都返回 ``None``。"""
 
-    fallback = words[-1].end if words else 0.0  # 词序列末尾作为兜底
-    if audio_path is None:
-        return fallback
     cmd = [
         "ffprobe",
         "-v",
@@ -370,19 +387,67 @@ def _resolve_audio_duration(words: Sequence[Word], audio_path: Path | None) -> f
     try:
         cp = run_cmd(cmd)
     except FileNotFoundError:
-        return fallback
+        return None
     if cp.returncode != 0:
-        return fallback
+        return None
     output = (cp.stdout or "").strip() or (cp.stderr or "").strip()
     try:
         value = float(output)
     except ValueError:
-        return fallback
+        return None
     if not math.isfinite(value) or value <= 0:
-        return fallback
+        return None
     return value
 
 
+def _resolve_audio_duration(
+    words: Sequence[Word],
+    audio_path: Path | None,
+    known: float | None = None,
+) -> float:
+    """优先使用已知时长，其次查分析缓存 / ffprobe，失败时回退到词序列终点。"""
+
+    if known is not None and math.isfinite(known) and known > 0:
+        return float(known)
+    fallback = words[-1].end if words else 0.0  # 词序列末尾作为兜底
+    if audio_path is None:
+        return fallback
+    value = audio_duration(audio_path, _ffprobe_duration)
+    return value if value else fallback
+
+
+class _ShortMergeState:
+    """碎片合并阶段的流式状态。
+
+    ``out_*`` 为已确认片段的并行数组；``carry_*`` 记录开头连续过短、需要并入
+    下一片段的暂存片段（只可能出现在尚无已确认片段时）。``head`` 为片段索引
+    序列的首个下标，即 ``merged_into`` 的取值来源。
+    """
+
+    __slots__ = (
+        "out_start",
+        "out_end",
+        "out_head",
+        "out_members",
+        "carry_start",
+        "carry_tail",
+        "carry_members",
+        "carry_steps",
+        "carry_joins",
+    )
+
+    def __init__(self) -> None:
+        self.out_start = array("d")
+        self.out_end = array("d")
+        self.out_head = array("l")
+        self.out_members: list[list[int]] = []
+        self.carry_start = 0.0
+        self.carry_tail = -1
+        self.carry_members: list[int] | None = None
+        self.carry_steps = 0
+        self.carry_joins: list[tuple[int, list[int]]] = []
+
+
 def _refine_segments(
     keep_items: Sequence[object],
     *,
@@ -395,45 +460,47 @@ def _refine_segments(
     min_segment_sec: float,
     pause_align: bool,
     debug_label: str | None,
-) -> tuple[set[int], list[tuple[float, float]], dict[str, object], list[dict]]:
-    """对保留片段应用停顿吸附、补偿、合并及碎片剔除。"""
+    debug_sink: DebugSink = NULL_DEBUG_SINK,
+) -> tuple[set[int], list[tuple[float, float]], dict[str, object]]:
+    """对保留片段应用停顿吸附、补偿、合并及碎片剔除。
+
+    片段按起点排序后单次流式处理：间隔合并与碎片合并在同一遍扫描中完成，
+    状态保存在按下标索引的紧凑数组里。逐片段调试行仅在 ``debug_sink`` 收集
+    ``"segments"`` 通道时生成。
+    """
 
     # 预处理参数，确保均为非负
     pad_before = max(0.0, pad_before)
     pad_after = max(0.0, pad_after)
     merge_gap_sec = max(0.0, merge_gap_sec)
     min_segment_sec = max(0.0, min_segment_sec)
-    pause_candidates: list[float] = []
-    for start, end in pause_intervals:
-        pause_candidates.extend([start, end])
-    pause_candidates = sorted(set(pause_candidates))
+    pause_candidates = SilenceIndex.from_ranges(pause_intervals)
     pause_used = pause_align and bool(pause_candidates)
-    debug_rows: dict[int, dict] = {}
-    segments: list[dict] = []
+    collect_debug = debug_sink.wants("segments")
+    count = len(keep_items)
+    pad_starts = array("d", bytes(8 * count))
+    pad_ends = array("d", bytes(8 * count))
+    # 调试用逐项状态，仅在需要时分配
+    source_notes: list[str] = [""] * count if collect_debug else []
+    orig_values: list[tuple[object, object]] = [(None, None)] * count if collect_debug else []
+    snap_values: list[tuple[object, object, bool, bool]] = [(None, None, False, False)] * count if collect_debug else []
+    merged_into = array("l", [-1]) * count if collect_debug else array("l")
+    gap_merged = bytearray(count) if collect_debug else bytearray()
+    prev_merged = bytearray(count) if collect_debug else bytearray()
+    next_merges = array("l", [0]) * count if collect_debug else array("l")
+    dropped_after = bytearray(count) if collect_debug else bytearray()
+    valid: list[int] = []
     pause_snaps = 0
     too_short_dropped = 0
     for index, item in enumerate(keep_items):
         orig_start = getattr(item, "start", 0.0)
         orig_end = getattr(item, "end", 0.0)
+        if collect_debug:
+            orig_values[index] = (orig_start, orig_end)
         if orig_end <= orig_start:
-            row = {
-                "item": debug_label or "",
-                "index": index,
-                "orig_start": orig_start,
-                "orig_end": orig_end,
-                "snap_start": orig_start,
-                "snap_end": orig_end,
-                "pad_start": orig_start,
-                "pad_end": orig_end,
-                "final_start": None,
-                "final_end": None,
-                "snap_start_used": False,
-                "snap_end_used": False,
-                "merged_into": "",
-                "dropped": True,
-                "notes": "invalid_source",
-            }
-            debug_rows[index] = row
+            if collect_debug:
+                source_notes[index] = "invalid_source"
+                snap_values[index] = (orig_start, orig_end, False, False)
             continue
         snapped_start = orig_start
         snapped_end = orig_end
@@ -452,165 +519,150 @@ def _refine_segments(
                 pause_snaps += 1
         padded_start = max(0.0, snapped_start - pad_before)
         padded_end = min(audio_duration, snapped_end + pad_after)
+        pad_starts[index] = padded_start
+        pad_ends[index] = padded_end
+        if collect_debug:
+            snap_values[index] = (snapped_start, snapped_end, snap_start_used, snap_end_used)
         if padded_end - padded_start <= 1e-6:
-            row = {
-                "item": debug_label or "",
-                "index": index,
-                "orig_start": orig_start,
-                "orig_end": orig_end,
-                "snap_start": snapped_start,
-                "snap_end": snapped_end,
-                "pad_start": padded_start,
-                "pad_end": padded_end,
-                "final_start": None,
-                "final_end": None,
-                "snap_start_used": snap_start_used,
-                "snap_end_used": snap_end_used,
-                "merged_into": "",
-                "dropped": True,
-                "notes": "clamped_to_zero",
-            }
-            debug_rows[index] = row
+            if collect_debug:
+                source_notes[index] = "clamped_to_zero"
             too_short_dropped += 1
             continue
-        row = {
-            "item": debug_label or "",
-            "index": index,
-            "orig_start": orig_start,
-            "orig_end": orig_end,
-            "snap_start": snapped_start,
-            "snap_end": snapped_end,
-            "pad_start": padded_start,
-            "pad_end": padded_end,
-            "final_start": None,
-            "final_end": None,
-            "snap_start_used": snap_start_used,
-            "snap_end_used": snap_end_used,
-            "merged_into": "",
-            "dropped": False,
-            "notes": "",
-        }
-        debug_rows[index] = row
-        segments.append(
-            {
-                "start": padded_start,
-                "end": padded_end,
-                "indices": [index],
-            }
-        )
-    segments.sort(key=lambda item: item["start"])
+        valid.append(index)
+    valid.sort(key=pad_starts.__getitem__)
+
     auto_merged = 0
-    merged_segments: list[dict] = []
-    for segment in segments:
-        if not merged_segments:
-            merged_segments.append(segment)
-            continue
-        prev = merged_segments[-1]
-        gap = segment["start"] - prev["end"]
-        if gap <= merge_gap_sec:
-            prev["end"] = max(prev["end"], segment["end"])
-            prev_indices = prev["indices"]
-            for idx in segment["indices"]:
-                if idx not in prev_indices:
-                    prev_indices.append(idx)
-                debug_rows[idx]["merged_into"] = prev_indices[0]
-                note = debug_rows[idx]["notes"]
-                debug_rows[idx]["notes"] = ";".join(filter(None, [note, "merge_gap"]))
+    state = _ShortMergeState()
+
+    def _push(start: float, end: float, members: list[int], more: bool) -> None:
+        """把一个间隔合并后的片段交给碎片合并阶段（``more`` 表示其后仍有片段）。"""
+
+        nonlocal auto_merged
+        head = members[0]
+        tail = members[-1]
+        if state.carry_members is not None:
+            # 暂存片段并入本片段：起点取较小值，索引序列为暂存序列倒序 + 本片段
+            start = min(start, state.carry_start)
+            head = state.carry_tail
+            if collect_debug:
+                state.carry_joins.append((state.carry_steps, members))
+            carried = state.carry_members
+            carried.extend(members)
+            members = carried
+            state.carry_members = None
+        if end - start >= min_segment_sec or (not state.out_members and not more):
+            state.out_start.append(start)
+            state.out_end.append(end)
+            state.out_head.append(head)
+            state.out_members.append(members)
+            if collect_debug and state.carry_joins:
+                steps = state.carry_steps
+                for joined, group in state.carry_joins:
+                    for idx in group:
+                        next_merges[idx] = steps - joined
+                state.carry_joins = []
+            return
+        auto_merged += 1
+        if state.out_members:
+            last = len(state.out_members) - 1
+            if end > state.out_end[last]:
+                state.out_end[last] = end
+            state.out_members[last].extend(members)
+            if collect_debug:
+                target = state.out_head[last]
+                for idx in members:
+                    merged_into[idx] = target
+                    prev_merged[idx] = 1
+            return
+        state.carry_start = start
+        state.carry_tail = tail
+        state.carry_members = members
+        state.carry_steps += 1
+        if collect_debug and not state.carry_joins:
+            state.carry_joins.append((0, members[:]))
+
+    group_start = group_end = 0.0
+    group_members: list[int] | None = None
+    for index in valid:
+        start = pad_starts[index]
+        end = pad_ends[index]
+        if group_members is not None and start - group_end <= merge_gap_sec:
+            if end > group_end:
+                group_end = end
+            group_members.append(index)
+            if collect_debug:
+                merged_into[index] = group_members[0]
+                gap_merged[index] = 1
             auto_merged += 1
-        else:
-            merged_segments.append(segment)
-
-    refined_segments = merged_segments
-    i = 0
-    while i < len(refined_segments):
-        segment = refined_segments[i]
-        duration = segment["end"] - segment["start"]
-        if duration >= min_segment_sec or len(refined_segments) == 1:
-            i += 1
-            continue
-        if i > 0:
-            prev = refined_segments[i - 1]
-            prev["end"] = max(prev["end"], segment["end"])
-            for idx in segment["indices"]:
-                if idx not in prev["indices"]:
-                    prev["indices"].append(idx)
-                debug_rows[idx]["merged_into"] = prev["indices"][0]
-                note = debug_rows[idx]["notes"]
-                debug_rows[idx]["notes"] = ";".join(filter(None, [note, "merge_short_prev"]))
-            auto_merged += 1
-            refined_segments.pop(i)
-            continue
-        if i + 1 < len(refined_segments):
-            nxt = refined_segments[i + 1]
-            nxt["start"] = min(nxt["start"], segment["start"])
-            nxt_indices = nxt["indices"]
-            for idx in segment["indices"]:
-                if idx not in nxt_indices:
-                    nxt_indices.insert(0, idx)
-                debug_rows[idx]["merged_into"] = nxt_indices[0]
-                note = debug_rows[idx]["notes"]
-                debug_rows[idx]["notes"] = ";".join(filter(None, [note, "merge_short_next"]))
-            auto_merged += 1
-            refined_segments.pop(i)
             continue
-        for idx in segment["indices"]:
-            debug_rows[idx]["dropped"] = True
-            note = debug_rows[idx]["notes"]
-            debug_rows[idx]["notes"] = ";".join(filter(None, [note, "dropped_short"]))
-        too_short_dropped += len(segment["indices"])
-        refined_segments.pop(i)
+        if group_members is not None:
+            _push(group_start, group_end, group_members, True)
+        group_start, group_end, group_members = start, end, [index]
+    if group_members is not None:
+        _push(group_start, group_end, group_members, False)
+
     active_indices: set[int] = set()
     final_segments: list[tuple[float, float]] = []
-    for segment in refined_segments:
-        start = max(0.0, min(audio_duration, segment["start"]))
-        end = max(0.0, min(audio_duration, segment["end"]))
+    final_bounds: dict[int, tuple[float, float]] = {}
+    for pos, members in enumerate(state.out_members):
+        start = max(0.0, min(audio_duration, state.out_start[pos]))
+        end = max(0.0, min(audio_duration, state.out_end[pos]))
         if end - start <= 1e-6:
-            for idx in segment["indices"]:
-                debug_rows[idx]["dropped"] = True
-                note = debug_rows[idx]["notes"]
-                debug_rows[idx]["notes"] = ";".join(filter(None, [note, "dropped_after_merge"]))
-            too_short_dropped += len(segment["indices"])
+            if collect_debug:
+                for idx in members:
+                    dropped_after[idx] = 1
+            too_short_dropped += len(members)
             continue
         final_segments.append((start, end))
-        unique_indices = []
-        seen: set[int] = set()
-        for idx in segment["indices"]:
-            if idx in seen:
-                continue
-            seen.add(idx)
-            unique_indices.append(idx)
-        segment["indices"] = unique_indices
-        for idx in unique_indices:
+        for idx in members:
             active_indices.add(idx)
-            debug_rows[idx]["final_start"] = start
-            debug_rows[idx]["final_end"] = end
+            if collect_debug:
+                final_bounds[idx] = (start, end)
             item_obj = keep_items[idx]
             if hasattr(item_obj, "start") and hasattr(item_obj, "end"):
                 setattr(item_obj, "start", start)
                 setattr(item_obj, "end", end)
-    debug_list = []
-    for idx in range(len(keep_items)):
-        row = debug_rows.get(
-            idx,
-            {
-                "item": debug_label or "",
-                "index": idx,
-                "orig_start": None,
-                "orig_end": None,
-                "snap_start": None,
-                "snap_end": None,
-                "pad_start": None,
-                "pad_end": None,
-                "final_start": None,
-                "final_end": None,
-                "snap_start_used": False,
-                "snap_end_used": False,
-                "merged_into": "",
-                "dropped": True,
-                "notes": "missing",
-            },
-        )
-        debug_list.append(row)
+    if collect_debug:
+        debug_list: list[dict] = []
+        for idx in range(count):
+            source_note = source_notes[idx]
+            notes = [source_note] if source_note else []
+            if gap_merged[idx]:
+                notes.append("merge_gap")
+            if next_merges[idx]:
+                notes.extend(["merge_short_next"] * next_merges[idx])
+                merged_into[idx] = idx
+            elif prev_merged[idx]:
+                notes.append("merge_short_prev")
+            if dropped_after[idx]:
+                notes.append("dropped_after_merge")
+            orig_start, orig_end = orig_values[idx]
+            snapped_start, snapped_end, snap_start_used, snap_end_used = snap_values[idx]
+            final_start, final_end = final_bounds.get(idx, (None, None))
+            if source_note == "invalid_source":
+                pad_start, pad_end = orig_start, orig_end
+            else:
+                pad_start, pad_end = pad_starts[idx], pad_ends[idx]
+            debug_list.append(
+                {
+                    "item": debug_label or "",
+                    "index": idx,
+                    "orig_start": orig_start,
+                    "orig_end": orig_end,
+                    "snap_start": snapped_start,
+                    "snap_end": snapped_end,
+                    "pad_start": pad_start,
+                    "pad_end": pad_end,
+                    "final_start": final_start,
+                    "final_end": final_end,
+                    "snap_start_used": snap_start_used,
+                    "snap_end_used": snap_end_used,
+                    "merged_into": merged_into[idx] if merged_into[idx] >= 0 else "",
+                    "dropped": bool(source_note) or bool(dropped_after[idx]),
+                    "notes": ";".join(notes),
+                }
+            )
+        debug_sink.put("segments", debug_list)
     stats = {
         "pause_used": bool(pause_used),
         "pause_snaps": int(pause_snaps),
@@ -621,7 +673,7 @@ def _refine_segments(
             "after": int(round(pad_after * 1000)),
         },
     }
-    return active_indices, final_segments, stats, debug_list
+    return active_indices, final_segments, stats
 
 
 def _apply_silence_snap(
@@ -633,10 +685,17 @@ def _apply_silence_snap(
     min_duration: float,
     monotonic_mode: str,
     monotonic_epsilon: float,
+    silence_index: SilenceIndex | None = None,
+    debug_sink: DebugSink = NULL_DEBUG_SINK,
 ) -> tuple[list[KeepSpan], list[dict[str, object]], dict[str, object]]:
-    """对片段执行静音吸附，返回候选行与统计。"""
+    """对片段执行静音吸附，返回候选行与统计。
 
-    silence = list(silence_ranges or [])
+    ``silence_index`` 为按文件预建的边界索引；未提供时由 ``silence_ranges`` 构建。
+    全部片段的端点在一次批量查询中完成吸附。被丢弃片段的时间线行只在
+    ``debug_sink`` 收集 ``"timeline"`` 时生成，保留行供后续单调约束使用。
+    """
+
+    silence = silence_index if silence_index is not None else SilenceIndex.from_ranges(silence_ranges)
     radius = max(0.0, float(snap_radius))
     min_duration = max(0.0, float(min_duration))
     timeline_rows: list[dict[str, object]] = []
@@ -645,58 +704,57 @@ def _apply_silence_snap(
     total = len(keep_spans)
     too_short = 0
     invalid = 0
+    snap_results: list[tuple[float, float, str, bool]] = []
+    if snap_enabled and silence:
+        valid_spans: list[tuple[float, float]] = []
+        for keep in keep_spans:
+            span_start = float(getattr(keep, "start", 0.0) or 0.0)
+            span_end = float(getattr(keep, "end", 0.0) or 0.0)
+            if span_end > span_start:
+                valid_spans.append((span_start, span_end))
+        snap_results = snap_segments(valid_spans, silence, radius, min_duration)
+    trace_dropped = debug_sink.wants("timeline")
+    snap_cursor = 0
     for keep in keep_spans:
         match_start = float(getattr(keep, "start", 0.0) or 0.0)
         match_end = float(getattr(keep, "end", 0.0) or 0.0)
+        snap_start = match_start
+        snap_end = match_end
+        snapped_label = "no-snap"
+        drop_reason = "-"
+        if match_end <= match_start:
+            drop_reason = "invalid"
+            invalid += 1
+        elif snap_enabled and silence:
+            snap_start, snap_end, snapped_label, too_small = snap_results[snap_cursor]
+            snap_cursor += 1
+            if snapped_label != "no-snap":
+                snap_hits += 1
+            if too_small:
+                drop_reason = "too_short"
+                too_short += 1
+        elif (match_end - match_start) < min_duration:
+            drop_reason = "too_short"
+            too_short += 1
+        if drop_reason != "-" and not trace_dropped:
+            continue
         row = {
             "idx": keep.line_no,
             "text": keep.text,
             "match_t0": match_start,
             "match_t1": match_end,
-            "snap_t0": match_start,
-            "snap_t1": match_end,
-            "snapped": "no-snap",
-            "kept": 1,
-            "drop_reason": "-",
+            "snap_t0": snap_start,
+            "snap_t1": snap_end,
+            "snapped": snapped_label,
+            "kept": 1 if drop_reason == "-" else 0,
+            "drop_reason": drop_reason,
             "mono_mode": monotonic_mode,
             "candidate_id": getattr(keep, "candidate_id", -1),
             "score": getattr(keep, "score", 1.0),
         }
-        if match_end <= match_start:
-            row["drop_reason"] = "invalid"
-            row["kept"] = 0
-            timeline_rows.append(row)
-            invalid += 1
-            continue
-        snapped_label = "no-snap"
-        if snap_enabled and silence:
-            snap_start, snap_end, snapped_label, too_small = snap_segment(
-                match_start,
-                match_end,
-                silence,
-                radius,
-                min_duration,
-            )
-            row["snap_t0"] = snap_start
-            row["snap_t1"] = snap_end
-            row["snapped"] = snapped_label
-            if snapped_label != "no-snap":
-                snap_hits += 1
-            if too_small:
-                row["drop_reason"] = "too_short"
-                row["kept"] = 0
-                timeline_rows.append(row)
-                too_short += 1
-                continue
-        else:
-            if (match_end - match_start) < min_duration:
-                row["drop_reason"] = "too_short"
-                row["kept"] = 0
-                timeline_rows.append(row)
-                too_short += 1
-                continue
         timeline_rows.append(row)
-        candidate_rows.append(row)
+        if drop_reason == "-":
+            candidate_rows.append(row)
 
     filtered_keeps: list[KeepSpan] = []
     for row in candidate_rows:
@@ -734,12 +792,13 @@ def _apply_silence_snap(
 
 
 def _normalize_words(
-    words: list[Word],
+    words: Sequence[Word],
     alias_map: Mapping[str, Sequence[str]] | None = None,
 ) -> tuple[list[str], str, list[tuple[int, int]]]:
     """返回规范化后的词文本、拼接字符串与字符索引映射。"""
 
-    normalized_words = [normalize_for_align(word.text) for word in words]
+    texts = words.texts() if isinstance(words, WordArray) else [word.text for word in words]
+    normalized_words = [normalize_for_align(text) for text in texts]
     if alias_map:
         normalized_words = [apply_alias_map(token, alias_map) for token in normalized_words]
     asr_norm_str = cjk_or_latin_seq(normalized_words)
@@ -749,6 +808,7 @@ def _normalize_words(
     return normalized_words, asr_norm_str, char_map
 
 
+@memoize_normalizer("units", maxsize=4096)
 def _line_to_units(line: str) -> str:
     """将原文行转换成匹配用的字符序列。"""
 
@@ -797,65 +857,6 @@ def _longest_common_substring(a: str, b: str) -> tuple[int, int, int]:
     return best_len, best_a_end, best_b_end  # 返回长度及结束位置
 
 
-_HASH_BASE = 257
-_HASH_MASK = (1 << 64) - 1
-
-
-def _rolling_hash_power(base: int, exp: int) -> int:
-    """计算 base**exp 在 2**64 空间内的值。"""
-
-    if exp <= 0:
-        return 1
-    return pow(base, exp, 1 << 64)
-
-
-def _fast_candidates(words_chars: str, line_chars: str, k: int, limit: int) -> list[int]:
-    """通过 Rabin–Karp 滚动哈希快速筛选可能的窗口起点。"""
-
-    if not words_chars or not line_chars or limit <= 0:
-        return []
-    limit = max(1, limit)
-    max_k = min(max(k, 3), len(words_chars), len(line_chars))
-    best_hits: Counter[int] = Counter()
-    for current_k in range(max_k, 2, -1):
-        if len(line_chars) < current_k or len(words_chars) < current_k:
-            continue
-        high = _rolling_hash_power(_HASH_BASE, current_k - 1)
-        index: dict[int, list[int]] = defaultdict(list)
-        hash_value = 0
-        for idx, ch in enumerate(words_chars):
-            hash_value = ((hash_value * _HASH_BASE) + ord(ch)) & _HASH_MASK
-            if idx + 1 >= current_k:
-                start = idx + 1 - current_k
-                index[hash_value].append(start)
-                leading = ord(words_chars[start])
-                hash_value = (hash_value - (leading * high)) & _HASH_MASK
-        if not index:
-            continue
-        line_hash = 0
-        for idx, ch in enumerate(line_chars):
-            line_hash = ((line_hash * _HASH_BASE) + ord(ch)) & _HASH_MASK
-            if idx + 1 >= current_k:
-                candidate_positions = index.get(line_hash)
-                if candidate_positions:
-                    segment = line_chars[idx + 1 - current_k : idx + 1]
-                    for pos in candidate_positions:
-                        if words_chars[pos : pos + current_k] == segment:
-                            best_hits[pos] += 1
-                leading = ord(line_chars[idx + 1 - current_k])
-                line_hash = (line_hash - (leading * high)) & _HASH_MASK
-        if best_hits:
-            break
-    if not best_hits:
-        snippet_len = min(max_k, len(line_chars))
-        snippet = line_chars[:snippet_len]
-        pos = words_chars.find(snippet)
-        if pos >= 0:
-            best_hits[pos] = 1
-    ordered = sorted(best_hits.items(), key=lambda item: (-item[1], item[0]))
-    return [pos for pos, _ in ordered[:limit]]
-
-
 def _preview_text(text: str, limit: int = 120) -> str:
     """裁剪文本用于日志打印。"""
 
@@ -904,30 +905,12 @@ def _ascii_ratio(text: str) -> float:
     return ascii_count / len(cleaned)
 
 
-def _char_range_to_word_range(char_range: tuple[int, int], char_map: list[tuple[int, int]]) -> tuple[int, int] | None:
-    """将字符区间映射为词索引区间。"""
-
-    start_char, end_char = char_range  # 提取字符区间边界
-    if start_char == end_char:  # 空区间无需映射
-        return None
-    start_idx = None  # 初始化起始词索引
-    end_idx = None  # 初始化结束词索引
-    for idx, (w_start, w_end) in enumerate(char_map):  # 遍历词字符区间
-        if start_idx is None and start_char < w_end:  # 首个覆盖起始字符的词
-            start_idx = idx
-        if w_start < end_char:  # 只要词与结束字符有交集就更新
-            end_idx = idx
-        if w_end >= end_char and start_idx is not None:  # 已覆盖整个区间可提前结束
-            break
-    if start_idx is None or end_idx is None:  # 映射失败返回 None
-        return None
-    return start_idx, end_idx  # 返回词索引区间
-
-
-def _word_range_to_time(word_range: tuple[int, int], words: list[Word]) -> tuple[float, float]:
+def _word_range_to_time(word_range: tuple[int, int], words: Sequence[Word]) -> tuple[float, float]:
     """根据词索引区间得到时间区间。"""
 
     start_idx, end_idx = word_range  # 拆解索引区间
+    if isinstance(words, WordArray):  # 列式存储直接按下标读时间列
+        return words.starts[start_idx], words.ends[end_idx]
     start_time = words[start_idx].start  # 获取起始词的开始时间
     end_time = words[end_idx].end  # 获取结束词的结束时间
     return start_time, end_time  # 返回时间范围
@@ -954,29 +937,38 @@ def _fallback_align_greedy(
     words: Sequence[Word],
     lines: Sequence[str],
     words_chars: str,
-    char_map: Sequence[tuple[int, int]],
+    char_map: Sequence[tuple[int, int]] | CharBoundaryIndex,
     *,
     min_anchor_ngram: int,
     max_windows: int,
     expand_window: bool = False,
+    qgram_index: QGramIndex | None = None,
 ) -> list[KeepSpan]:
-    """贪心对齐兜底：使用锚点快速吸附文本行。"""
+    """贪心对齐兜底：使用锚点快速吸附文本行。
+
+    ``qgram_index`` 应为同一 ``words_chars`` 上的共享索引；缺省时临时构建一个。
+    字符区间经 :class:`CharBoundaryIndex` 二分映射回词索引。
+    """
 
     if not words_chars:
         return []
+    if qgram_index is None or qgram_index.text != words_chars:
+        qgram_index = QGramIndex(words_chars)
+    if not isinstance(char_map, CharBoundaryIndex):
+        char_map = CharBoundaryIndex.from_char_map(char_map)
     keeps: list[KeepSpan] = []
     cursor = 0
     min_k = max(3, min_anchor_ngram)
-    word_list = list(words)
+    word_list = WordArray.from_words(words)
     for line_no, line in enumerate(lines, start=1):
         norm_line = normalize_for_align(line)
         units = _line_to_units(norm_line)
         if not units:
             continue
         anchor_len = min(len(units), min_k)
-        candidates = _fast_candidates(words_chars, units, anchor_len, max_windows)
+        candidates = qgram_index.candidates(units, anchor_len, max_windows)
         if not candidates and anchor_len > 3:
-            candidates = _fast_candidates(words_chars, units, 3, max_windows)
+            candidates = qgram_index.candidates(units, 3, max_windows)
         if not candidates:
             continue
         best_pos = min(
@@ -987,15 +979,15 @@ def _fallback_align_greedy(
         window_end = min(len(words_chars), best_pos + max(len(units), anchor_len + min_anchor_ngram))
         if window_end <= window_start:
             continue
-        word_range = _char_range_to_word_range((window_start, window_end), char_map)
+        word_range = char_map.word_range(window_start, window_end)
         if word_range is None:
             continue
         if expand_window:
             expand = max(1, min_anchor_ngram)
             start_idx = max(0, word_range[0] - expand)
             end_idx = min(len(word_list) - 1, word_range[1] + expand)
-            start_time = word_list[start_idx].start
-            end_time = word_list[end_idx].end
+            start_time = word_list.starts[start_idx]
+            end_time = word_list.ends[end_idx]
         else:
             start_time, end_time = _word_range_to_time(word_range, word_list)
         if keeps and start_time < keeps[-1].end:
@@ -1048,7 +1040,7 @@ def keep_last_segments(
 
 
 def compute_retake_keep_last(
-    words: list[Word],
+    words: Sequence[Word],
     original_txt: Path,
     *,
     min_sent_chars: int = MIN_SENT_CHARS,
@@ -1063,6 +1055,7 @@ def compute_retake_keep_last(
     merge_gap_sec: float = MERGE_GAP_SEC,
     silence_ranges: Sequence[tuple[float, float]] | None = None,
     audio_path: Path | None = None,
+    audio_duration: float | None = None,
     alias_map: Mapping[str, Sequence[str]] | None = None,
     match_alias_map: Mapping[str, str] | None = None,
     debug_label: str | None = None,
@@ -1076,6 +1069,7 @@ def compute_retake_keep_last(
     no_collapse_align: bool = True,
     drop_ascii_parens: bool = False,
     collect_match_debug: bool = False,
+    collect_debug_rows: bool = True,
     snap_silence: bool = True,
     snap_radius: float = 0.35,
     snap_min_duration: float = 0.22,
@@ -1089,14 +1083,41 @@ def compute_retake_keep_last(
     dp_penalty_pre: float = -0.8,
     dp_penalty_gap: float = -0.2,
     dp_epsilon: float = 0.02,
+    align_engine: str = "line",
+    line_workers: int = 1,
+    match_schedule: str = "stages",
+    normalized_asr: NormalizedASR | None = None,
+    debug_sink: DebugSink | None = None,
 ) -> RetakeResult:
-    """根据原文 TXT 匹配词序列，仅保留最后一次出现的行。"""
-
+    """根据原文 TXT 匹配词序列，仅保留最后一次出现的行。
+
+    ``align_engine="global"`` 时改为整篇一次性锚点链对齐，同时保留较早的重录
+    命中交给重复聚类与 DP 阶段处理。``line_workers`` > 1 时逐行引擎把同一文档
+    的行分片到进程池并按行号合并结果。``match_schedule="anytime"`` 时先对全部
+    行做精确定位，再按预估代价把剩余全局预算分给难行，超时返回当前最好结果。
+    ``normalized_asr`` 为 :mod:`onepass.asr_cache` 预先规范化（或缓存载入）的结果，
+    提供时跳过逐词规范化与 token 流构建。调试行统一经 ``debug_sink`` 收集；
+    未提供时按 ``collect_match_debug`` / ``collect_debug_rows`` / 调试日志开关
+    构建，未收集的通道在热路径上不分配任何行字典。``audio_duration`` 已知时
+    （例如来自 :mod:`onepass.silence_detect` 的解码结果）不再调用 ffprobe。
+    """
+
+    memo_before = memo_snapshot()
+    if debug_sink is None:
+        debug_channels: list[str] = []
+        if collect_match_debug:
+            debug_channels.extend(["match", "timeline", "repeat", "dp_path"])
+        if collect_debug_rows:
+            debug_channels.append("segments")
+        if is_debug_logging_enabled():
+            debug_channels.append("probe")
+        debug_sink = DebugSink(debug_channels)
     drop_ascii_parens = bool(drop_ascii_parens)
     alias_map_size = len(alias_map or {})
     dedupe_label, dedupe_effective_policy = _resolve_dedupe_policy(dedupe_policy)
     if not words:  # 无词序列时无法继续
         raise ValueError("词序列为空，无法执行保留最后一遍逻辑。请先导入有效的 ASR JSON。")
+    words = WordArray.from_words(words)  # 统一为列式存储，时间查询直接读列
     try:
         raw_text = original_txt.read_text(encoding="utf-8-sig")  # 读取原文文本
     except FileNotFoundError as exc:  # 文件不存在
@@ -1126,20 +1147,38 @@ def compute_retake_keep_last(
     if fallback_policy not in {"safe", "keep-all", "align-greedy", "align-greedy-expand"}:
         LOGGER.warning("未知 fallback_policy=%s，已回退为 align-greedy", fallback_policy)
         fallback_policy = "align-greedy"
-    _, asr_norm_str, char_map = _normalize_words(words, alias_map)  # 获取规范化词串与索引
-    char_map = list(char_map)
+    align_engine = str(align_engine or "line").strip().lower()
+    if align_engine not in {"line", "global"}:
+        LOGGER.warning("未知 align_engine=%s，已回退为 line", align_engine)
+        align_engine = "line"
+    match_schedule = str(match_schedule or "stages").strip().lower()
+    if match_schedule not in {"stages", "anytime"}:
+        LOGGER.warning("未知 match_schedule=%s，已回退为 stages", match_schedule)
+        match_schedule = "stages"
+    if normalized_asr is not None and len(normalized_asr.words) != len(words):
+        LOGGER.warning("normalized_asr 与词序列长度不一致，已忽略缓存结果")
+        normalized_asr = None
+    if normalized_asr is not None:
+        asr_norm_str = normalized_asr.asr_norm_str
+        char_map = list(normalized_asr.char_map)
+    else:
+        _, asr_norm_str, char_map = _normalize_words(words, alias_map)  # 获取规范化词串与索引
+        char_map = list(char_map)
     if not asr_norm_str:  # 如果规范化后为空
         raise ValueError("规范化后的词序列为空，可能所有词都是标点或空白。请检查 JSON 输出。")
+    # 每个文档只建一次 q-gram 索引（按 k 惰性生成），各阶段与回退共用
+    qgram_index = QGramIndex(asr_norm_str)
 
     token_stream: TokenStream | None = None
-    try:
-        token_payload = [
-            {"text": word.text, "start": word.start, "end": word.end}
-            for word in words
-        ]
-        token_stream = build_token_stream(token_payload, match_alias_map)
-    except Exception:
-        token_stream = None
+    if normalized_asr is not None:
+        token_stream = normalized_asr.token_stream
+        if fast_match and token_stream.anchor_index is None and token_stream.canonical_text:
+            token_stream.anchor_index = SuffixArrayIndex(token_stream.canonical_text)
+    else:
+        try:
+            token_stream = build_token_stream(words, match_alias_map, build_index=bool(fast_match))
+        except Exception:
+            token_stream = None
     LOGGER.info(
         "[match] stem=%s lines=%s tokens=%s alias=%s",
         debug_label or "-",
@@ -1162,6 +1201,9 @@ def compute_retake_keep_last(
         "alias_map": bool(alias_map),
         "match_alias_map": bool(match_alias_map),
         "no_collapse_align": bool(no_collapse_align),
+        "align_engine": align_engine,
+        "line_workers": max(1, int(line_workers or 1)),
+        "match_schedule": match_schedule,
     }
     LOGGER.info("参数快照: %s", json.dumps(params_snapshot, ensure_ascii=False, sort_keys=True))
 
@@ -1177,7 +1219,7 @@ def compute_retake_keep_last(
     fast_window_limit = max(1, int(max_windows))
     slow_window_limit = max(fast_window_limit, len(words) or 1)
 
-    audio_duration = _resolve_audio_duration(words, audio_path)
+    audio_duration = _resolve_audio_duration(words, audio_path, audio_duration)
     pause_intervals_base: list[tuple[float, float]] = []
     silence_count = 0
     if pause_align:
@@ -1194,6 +1236,8 @@ def compute_retake_keep_last(
             silence_count = len(clamped_silence)
             pause_intervals_base.extend(clamped_silence)
         pause_intervals_base = _merge_ranges(pause_intervals_base)
+    # 每个文件只构建一次静音边界索引，供静音吸附复用
+    silence_index = SilenceIndex.from_ranges(silence_ranges)
 
     active_deadline = compute_deadline
 
@@ -1210,6 +1254,12 @@ def compute_retake_keep_last(
         "removed_count": 0,
     }
     simple_removed_ids: list[int] = []
+    # 跨阶段逐行缓存：已命中的行在后续降级阶段直接复用，只重匹配失败/超时行
+    resolved_lines: dict[int, tuple[list[MatchResult], dict[str, object], str]] = {}
+    current_stage_label = "base"
+    # anytime 调度完成后冻结匹配：未解析行直接记为失败，不再调用匹配器
+    match_frozen = False
+    anytime_failures: dict[int, str] = {}
 
     def _align_once(min_sent_cutoff: int, dup_gap: float) -> dict[str, object]:
         local_keeps: list[KeepSpan] = []
@@ -1226,10 +1276,88 @@ def compute_retake_keep_last(
         pruned_candidates = 0
         search_elapsed = 0.0
         ascii_relaxed = 0
-        match_rows: list[dict[str, object]] | None = [] if collect_match_debug else None
-        line_probe: list[dict[str, object]] = []
+        match_rows: list[dict[str, object]] | None = [] if debug_sink.wants("match") else None
+        line_probe: list[dict[str, object]] | None = [] if debug_sink.wants("probe") else None
+        global_lines: dict[int, LineAlignment] | None = None
+        if (
+            align_engine == "global"
+            and not match_frozen
+            and token_stream is not None
+            and token_stream.canonical_text
+        ):
+            # 整篇一次对齐：锚点链定位各行区域，逐行结果在下方循环中消费
+            global_targets = [
+                index for index in range(1, len(lines) + 1) if index not in resolved_lines
+            ]
+            global_ratios = [
+                max(current_distance_ratio, 0.5)
+                if drop_ascii_parens and _ascii_ratio(lines[index - 1]) > 0.6
+                else current_distance_ratio
+                for index in global_targets
+            ]
+            match_start = time.monotonic()
+            global_results = align_lines_global(
+                [normalize_for_align(lines[index - 1]) for index in global_targets],
+                token_stream,
+                match_alias_map,
+                min_anchor_ngram=current_anchor_ngram,
+                max_distance_ratio=global_ratios,
+                deadline=active_deadline,
+            )
+            global_lines = dict(zip(global_targets, global_results))
+            search_elapsed += time.monotonic() - match_start
+        parallel_results: dict[int, tuple[MatchResult | None, dict]] | None = None
+        if (
+            global_lines is None
+            and not match_frozen
+            and line_workers
+            and line_workers > 1
+            and token_stream is not None
+            and token_stream.canonical_text
+        ):
+            # 行级并行：结果按行号回填，下方循环顺序消费，输出与串行一致
+            window_limit = fast_window_limit if fast_match else slow_window_limit
+            pending: list[tuple[int, str, dict]] = []
+            for index, line in enumerate(lines, start=1):
+                if index in resolved_lines:
+                    continue
+                norm_line = normalize_for_align(line)
+                if not _line_to_units(norm_line):
+                    continue
+                line_ratio = current_distance_ratio
+                if drop_ascii_parens and _ascii_ratio(line) > 0.6:
+                    line_ratio = max(line_ratio, 0.5)
+                pending.append(
+                    (
+                        index,
+                        norm_line,
+                        {
+                            "min_anchor_ngram": current_anchor_ngram,
+                            "max_windows": window_limit,
+                            "max_distance_ratio": line_ratio,
+                            "match_timeout": per_line_timeout,
+                            "prefer_latest": True,
+                        },
+                    )
+                )
+            match_start = time.monotonic()
+            parallel_results = match_lines_parallel(
+                pending,
+                token_stream,
+                match_alias_map,
+                workers=int(line_workers),
+                deadline=active_deadline,
+            )
+            search_elapsed += time.monotonic() - match_start
+        align_budget = Deadline(active_deadline)
         for index, line in enumerate(lines, start=1):
-            if active_deadline and time.monotonic() > active_deadline:
+            if (
+                align_budget
+                and not match_frozen
+                and index not in resolved_lines
+                and not (index & align_budget.mask)
+                and align_budget.expired()
+            ):
                 raise TimeoutError("match deadline")
             norm_line = normalize_for_align(line)
             units = _line_to_units(norm_line)
@@ -1252,22 +1380,39 @@ def compute_retake_keep_last(
                     match_rows.append(row_record)
                 continue
             spans: list[tuple[float, float]] = []
+            span_scores: dict[tuple[float, float], float] = {}
             match_result: MatchResult | None = None
+            line_matches: list[MatchResult] = []
             match_meta: dict[str, object] = {}
-            effective_timeout = per_line_timeout
-            local_deadline = active_deadline
-            if local_deadline is not None:
-                remaining = max(0.0, local_deadline - time.monotonic())
-                if effective_timeout is None:
-                    effective_timeout = remaining
-                else:
-                    effective_timeout = min(effective_timeout, remaining)
             line_ratio = current_distance_ratio
             if drop_ascii_parens and _ascii_ratio(line) > 0.6:
                 line_ratio = max(line_ratio, 0.5)
                 ascii_relaxed += 1
             window_limit = fast_window_limit if fast_match else slow_window_limit
-            if token_stream is not None and token_stream.canonical_text:
+            cached_line = resolved_lines.get(index)
+            if cached_line is not None:
+                line_matches = list(cached_line[0])
+                match_result = line_matches[-1]
+                match_meta = dict(cached_line[1])
+            elif match_frozen:
+                match_meta = {"failure_reason": anytime_failures.get(index, "time-window")}
+            elif global_lines is not None:
+                line_alignment = global_lines[index]
+                line_matches = list(line_alignment.matches)
+                match_result = line_matches[-1] if line_matches else None
+                match_meta = {
+                    "failure_reason": line_alignment.failure_reason,
+                    "anchor_hits": line_alignment.anchor_hits,
+                }
+            elif parallel_results is not None:
+                match_result, match_meta = parallel_results.get(index, (None, {}))
+            elif token_stream is not None and token_stream.canonical_text:
+                effective_timeout = per_line_timeout
+                remaining = align_budget.remaining()
+                if remaining is not None:
+                    if remaining <= 0:
+                        raise TimeoutError("match deadline")
+                    effective_timeout = remaining if effective_timeout is None else min(effective_timeout, remaining)
                 match_start = time.monotonic()
                 match_result = match_line_to_tokens(
                     norm_line,
@@ -1281,14 +1426,22 @@ def compute_retake_keep_last(
                     debug_details=match_meta,
                 )
                 search_elapsed += time.monotonic() - match_start
-            line_debug = {
-                "idx": index,
-                "distance_ratio": float(line_ratio),
-                "ngram": current_anchor_ngram,
-            }
+            line_debug: dict[str, object] | None = None
+            if line_probe is not None:
+                line_debug = {
+                    "idx": index,
+                    "distance_ratio": float(line_ratio),
+                    "ngram": current_anchor_ngram,
+                }
+            if match_result and cached_line is None:
+                resolved_lines[index] = (line_matches or [match_result], dict(match_meta), current_stage_label)
             if match_result:
-                spans.append((match_result.time_start, match_result.time_end))
-                if match_result.method == "anchor+lev":
+                resolved_stage = resolved_lines[index][2]
+                for candidate in line_matches or [match_result]:
+                    span = (candidate.time_start, candidate.time_end)
+                    spans.append(span)
+                    span_scores[span] = float(candidate.score or 1.0)
+                if match_result.method in {"anchor+lev", "global-chain", "exact"}:
                     strict_count += 1
                 else:
                     fuzzy_count += 1
@@ -1296,16 +1449,19 @@ def compute_retake_keep_last(
                 coarse_total += hits
                 coarse_passed += hits
                 fine_evaluated += 1
-                line_debug.update(
-                    {
-                        "status": "matched",
-                        "score": float(match_result.score or 0.0),
-                        "anchor_hits": int(match_result.anchor_hits or 0),
-                    }
-                )
+                if line_debug is not None:
+                    line_debug.update(
+                        {
+                            "status": "matched",
+                            "score": float(match_result.score or 0.0),
+                            "anchor_hits": int(match_result.anchor_hits or 0),
+                            "stage": resolved_stage,
+                        }
+                    )
                 if row_record is not None:
                     row_record.update(
                         {
+                            "stage": resolved_stage,
                             "score": match_result.score,
                             "method": match_result.method,
                             "anchor_hits": match_result.anchor_hits,
@@ -1340,12 +1496,13 @@ def compute_retake_keep_last(
                 failure_key = str(match_meta.get("failure_reason") or "")
                 if not failure_key:
                     failure_key = "no-anchor" if not token_stream or not token_stream.canonical_text else "distance"
-                line_debug.update(
-                    {
-                        "status": "unmatched",
-                        "reason": failure_key,
-                    }
-                )
+                if line_debug is not None:
+                    line_debug.update(
+                        {
+                            "status": "unmatched",
+                            "reason": failure_key,
+                        }
+                    )
                 reason_label = _MATCH_FAILURE_LABELS.get(failure_key, failure_key)
                 log_debug(
                     "[match.unmatched] idx=%s reason=%s ratio=%.2f ngram=%s text=%s",
@@ -1362,9 +1519,11 @@ def compute_retake_keep_last(
                 )
                 if match_rows is not None and row_record is not None:
                     match_rows.append(row_record)
-                line_probe.append(line_debug)
+                if line_probe is not None:
+                    line_probe.append(line_debug)
                 continue
-            line_probe.append(line_debug)
+            if line_probe is not None:
+                line_probe.append(line_debug)
             spans.sort(key=lambda item: item[0])
             sentence_length = len(units)
             if sentence_length < max(0, min_sent_cutoff):
@@ -1380,12 +1539,18 @@ def compute_retake_keep_last(
                         text=line,
                         start=span_start,
                         end=span_end,
-                        score=float(getattr(match_result, "score", 1.0) or 1.0),
+                        score=span_scores.get(
+                            (span_start, span_end),
+                            float(getattr(match_result, "score", 1.0) or 1.0),
+                        ),
                         candidate_id=next(candidate_counter),
                     )
                 )
             if match_rows is not None and row_record is not None:
                 match_rows.append(row_record)
+        # 只发布成功完成的一轮，超时中断的阶段不覆盖上一轮调试行
+        debug_sink.put("match", match_rows)
+        debug_sink.put("probe", line_probe)
         return {
             "keeps": local_keeps,
             "strict_matches": strict_count,
@@ -1401,8 +1566,6 @@ def compute_retake_keep_last(
             "pruned_candidates": pruned_candidates,
             "search_elapsed_sec": search_elapsed,
             "ascii_relaxed_lines": ascii_relaxed,
-            "match_debug_rows": match_rows,
-            "match_probe": line_probe,
         }
 
     keeps: list[KeepSpan] = []
@@ -1420,14 +1583,13 @@ def compute_retake_keep_last(
     unmatched_examples: list[dict[str, object]] = []
     window_splits = 0
     timed_out = False
-    match_engine = "anchor-ngram"
+    match_engine = "anchor-chain" if align_engine == "global" else "anchor-ngram"
     match_debug_rows_final: list[dict[str, object]] | None = None
     timeline_rows_final: list[dict[str, object]] | None = None
     repeat_debug_rows_final: list[dict[str, object]] | None = None
     dp_path_rows_final: list[dict[str, object]] | None = None
     dp_stats: dict[str, object] = {}
     monotonic_stats: dict[str, object] = {}
-    latest_match_probe: list[dict[str, object]] | None = None
 
     current_min_sent = int(min_sent_chars)
     current_dup_gap = float(max_dup_gap_sec)
@@ -1443,15 +1605,159 @@ def compute_retake_keep_last(
     degrade_reason: str | None = None
     degrade_history: list[dict[str, object]] = []
     stage_plan = _build_match_stages(current_anchor_ngram, current_distance_ratio)
+
+    phase_timings: dict[str, float] = {}
+    anytime_stats: dict[str, object] | None = None
+    if match_schedule == "anytime" and token_stream is not None and token_stream.canonical_text:
+        # 阶段一：精确定位，所有行以极低代价先过一遍
+        phase_started = time.monotonic()
+        exact_limit = 4 if align_engine == "global" else 1
+        hard_lines: list[tuple[int, str, bool]] = []
+        for index, line in enumerate(lines, start=1):
+            norm_line = normalize_for_align(line)
+            if not _line_to_units(norm_line):
+                continue
+            exact_matches = match_line_exact(
+                norm_line,
+                token_stream,
+                match_alias_map,
+                max_occurrences=exact_limit,
+            )
+            if exact_matches:
+                exact_meta = {"failure_reason": "", "anchor_hits": exact_matches[-1].anchor_hits}
+                resolved_lines[index] = (exact_matches, exact_meta, "exact")
+                continue
+            hard_lines.append((index, norm_line, bool(drop_ascii_parens and _ascii_ratio(line) > 0.6)))
+        phase_timings["exact_sec"] = time.monotonic() - phase_started
+        exact_resolved = len(resolved_lines)
+
+        # 阶段二：按预估代价（行长）由低到高细化，每行只分得剩余预算的公平份额，
+        # 单个病态行无法吞掉全局预算；超时行用结余时间重试，失败行沿降级阶梯放宽
+        phase_started = time.monotonic()
+        window_limit = fast_window_limit if fast_match else slow_window_limit
+        queue = sorted(hard_lines, key=lambda item: (len(item[1]), item[0]))
+        refine_rounds = 0
+        refine_attempts = 0
+        budget_exhausted = False
+        while queue:
+            stage = stage_plan[min(refine_rounds, len(stage_plan) - 1)]
+            refine_rounds += 1
+            has_next_stage = refine_rounds < len(stage_plan)
+            stage_anchor = int(stage["anchor"])
+            stage_ratio = float(stage["ratio"])
+            line_ratios = [max(stage_ratio, 0.5) if relaxed else stage_ratio for _, _, relaxed in queue]
+            outcomes: list[tuple[list[MatchResult], dict[str, object], float | None]] = []
+            if compute_deadline is not None and compute_deadline - time.monotonic() <= 0:
+                budget_exhausted = True
+                break
+            if align_engine == "global":
+                global_results = align_lines_global(
+                    [norm_line for _, norm_line, _ in queue],
+                    token_stream,
+                    match_alias_map,
+                    min_anchor_ngram=stage_anchor,
+                    max_distance_ratio=line_ratios,
+                    deadline=compute_deadline,
+                )
+                for line_alignment in global_results:
+                    line_meta: dict[str, object] = {
+                        "failure_reason": line_alignment.failure_reason,
+                        "anchor_hits": line_alignment.anchor_hits,
+                        "timed_out": line_alignment.failure_reason == "time-window",
+                    }
+                    outcomes.append((list(line_alignment.matches), line_meta, None))
+            elif line_workers and line_workers > 1:
+                round_timeout = per_line_timeout
+                if compute_deadline is not None:
+                    share = (compute_deadline - time.monotonic()) * int(line_workers) / len(queue)
+                    round_timeout = share if round_timeout is None else min(round_timeout, share)
+                round_results = match_lines_parallel(
+                    [
+                        (
+                            index,
+                            norm_line,
+                            {
+                                "min_anchor_ngram": stage_anchor,
+                                "max_windows": window_limit,
+                                "max_distance_ratio": line_ratio,
+                                "match_timeout": round_timeout,
+                                "prefer_latest": True,
+                            },
+                        )
+                        for (index, norm_line, _), line_ratio in zip(queue, line_ratios)
+                    ],
+                    token_stream,
+                    match_alias_map,
+                    workers=int(line_workers),
+                    deadline=compute_deadline,
+                )
+                for index, _, _ in queue:
+                    result, meta = round_results.get(index, (None, {}))
+                    outcomes.append(([result] if result is not None else [], dict(meta), round_timeout))
+            else:
+                for position, ((index, norm_line, _), line_ratio) in enumerate(zip(queue, line_ratios)):
+                    line_timeout = per_line_timeout
+                    if compute_deadline is not None:
+                        remaining = compute_deadline - time.monotonic()
+                        if remaining <= 0:
+                            budget_exhausted = True
+                            break
+                        share = remaining / (len(queue) - position)
+                        line_timeout = share if line_timeout is None else min(line_timeout, share)
+                    refine_meta: dict[str, object] = {}
+                    result = match_line_to_tokens(
+                        norm_line,
+                        token_stream,
+                        match_alias_map,
+                        min_anchor_ngram=stage_anchor,
+                        max_windows=window_limit,
+                        max_distance_ratio=line_ratio,
+                        match_timeout=line_timeout,
+                        prefer_latest=True,
+                        debug_details=refine_meta,
+                    )
+                    outcomes.append(([result] if result is not None else [], refine_meta, line_timeout))
+            refine_attempts += len(outcomes)
+            retry: list[tuple[int, str, bool]] = []
+            for item, (line_matches, line_meta, line_timeout) in zip(queue, outcomes):
+                if line_matches:
+                    resolved_lines[item[0]] = (line_matches, line_meta, str(stage["label"]))
+                    continue
+                anytime_failures[item[0]] = str(line_meta.get("failure_reason") or "distance")
+                slice_grows = compute_deadline is not None and (
+                    per_line_timeout is None or (line_timeout or 0.0) < per_line_timeout
+                )
+                if has_next_stage or (line_meta.get("timed_out") and slice_grows):
+                    retry.append(item)
+            # 本轮未尝试的行（预算耗尽）保持排队，但不再继续
+            if budget_exhausted:
+                break
+            if not has_next_stage and len(retry) == len(queue):
+                break
+            queue = retry
+        phase_timings["refine_sec"] = time.monotonic() - phase_started
+        anytime_stats = {
+            "exact_resolved": exact_resolved,
+            "refine_resolved": len(resolved_lines) - exact_resolved,
+            "refine_attempts": refine_attempts,
+            "refine_rounds": refine_rounds,
+            "unresolved": len(hard_lines) - (len(resolved_lines) - exact_resolved),
+            "budget_exhausted": budget_exhausted,
+        }
+        # 预算已分配完毕：后续装配不再受截止时间约束，直接输出当前最好结果
+        match_frozen = True
+        compute_deadline = None
+        active_deadline = None
+    assemble_started = time.monotonic()
     stage_index = 0
 
     while stage_index < len(stage_plan):
         stage = stage_plan[stage_index]
+        current_stage_label = str(stage["label"])
         current_anchor_ngram = int(stage["anchor"])
         current_distance_ratio = float(stage["ratio"])
         try:
             alignment = _align_once(current_min_sent, current_dup_gap)
-            latest_match_probe = alignment.pop("match_probe", None)
         except TimeoutError:
             timed_out = True
             degrade_reason = degrade_reason or "timeout"
@@ -1543,8 +1849,7 @@ def compute_retake_keep_last(
                 fallback_policy,
             )
             break
-        if collect_match_debug:
-            match_debug_rows_final = list(alignment.get("match_debug_rows") or [])
+        match_debug_rows_final = debug_sink.rows("match")
         raw_keeps = list(alignment.get("keeps", []))
         strict_matches = int(alignment.get("strict_matches", 0))
         fallback_matches = int(alignment.get("fallback_matches", 0))
@@ -1568,6 +1873,8 @@ def compute_retake_keep_last(
             min_duration=float(snap_min_duration),
             monotonic_mode=monotonic_mode,
             monotonic_epsilon=float(monotonic_epsilon),
+            silence_index=silence_index,
+            debug_sink=debug_sink,
         )
         snapped_keeps, simple_dedupe_stats, simple_removed_ids = _apply_keep_last_dedupe(
             snapped_keeps,
@@ -1590,13 +1897,17 @@ def compute_retake_keep_last(
                     if cid < 0 or cid not in removed_set:
                         filtered_rows.append(row)
                 timeline_rows = filtered_rows
-        timeline_rows_final = timeline_rows
+        trace_timeline = debug_sink.wants("timeline")
+        if trace_timeline:
+            debug_sink.put("timeline", timeline_rows)
+            timeline_rows_final = debug_sink.rows("timeline")
 
         timeline_map: dict[int, dict[str, object]] = {}
         for row in timeline_rows:
             cand_id = int(row.get("candidate_id", -1) or -1)
-            row["dp_in_best"] = 0
-            row["dp_drop_reason"] = row.get("drop_reason", "-") or "-"
+            if trace_timeline:
+                row["dp_in_best"] = 0
+                row["dp_drop_reason"] = row.get("drop_reason", "-") or "-"
             if cand_id >= 0:
                 timeline_map[cand_id] = row
 
@@ -1651,6 +1962,8 @@ def compute_retake_keep_last(
         dp_path_rows: list[dict[str, object]] = []
 
         def _build_manual_path_rows(policy_label: str, selected_ids: list[int]) -> list[dict[str, object]]:
+            if not debug_sink.wants("dp_path"):
+                return []
             ordered = [candidate_lookup[cid] for cid in selected_ids if cid in candidate_lookup]
             ordered.sort(key=lambda c: (c.t0, c.t1, c.candidate_id))
             rows: list[dict[str, object]] = []
@@ -1688,7 +2001,8 @@ def compute_retake_keep_last(
                     penalty_gap=float(dp_penalty_gap),
                 )
                 best_ids = list(dp_result.best_ids)
-                dp_path_rows = list(dp_result.path_rows)
+                if debug_sink.wants("dp_path"):
+                    dp_path_rows = list(dp_result.path_rows)
                 if not best_ids and total_candidates:
                     raise RuntimeError("dp-empty")
             except Exception:
@@ -1704,25 +2018,27 @@ def compute_retake_keep_last(
             dp_path_rows = _build_manual_path_rows("off", best_ids)
 
         best_set = set(best_ids)
-        repeat_debug_rows: list[dict[str, object]] = []
-        for cluster in clusters:
-            for candidate in cluster.candidates:
-                drop_reason = "-"
-                if candidate.candidate_id not in best_set and effective_policy != "off":
-                    drop_reason = "pre_take"
-                repeat_debug_rows.append(
-                    {
-                        "line_idx": candidate.line_idx,
-                        "line_key": cluster.line_key,
-                        "cand_rank": candidate.rank,
-                        "t0": candidate.t0,
-                        "t1": candidate.t1,
-                        "score": candidate.score,
-                        "is_last": candidate.is_last,
-                        "in_best": candidate.candidate_id in best_set,
-                        "drop_reason": drop_reason,
-                    }
-                )
+        if debug_sink.wants("repeat"):
+            repeat_debug_rows: list[dict[str, object]] = []
+            for cluster in clusters:
+                for candidate in cluster.candidates:
+                    drop_reason = "-"
+                    if candidate.candidate_id not in best_set and effective_policy != "off":
+                        drop_reason = "pre_take"
+                    repeat_debug_rows.append(
+                        {
+                            "line_idx": candidate.line_idx,
+                            "line_key": cluster.line_key,
+                            "cand_rank": candidate.rank,
+                            "t0": candidate.t0,
+                            "t1": candidate.t1,
+                            "score": candidate.score,
+                            "is_last": candidate.is_last,
+                            "in_best": candidate.candidate_id in best_set,
+                            "drop_reason": drop_reason,
+                        }
+                    )
+            debug_sink.put("repeat", repeat_debug_rows)
 
         LOGGER.info(
             "[repeat] clusters=%s candidates=%s policy=%s",
@@ -1745,21 +2061,21 @@ def compute_retake_keep_last(
                 total_candidates,
             )
 
-        for cid in best_set:
-            row = timeline_map.get(cid)
-            if row is None:
-                continue
-            row["dp_in_best"] = 1
-            row["dp_drop_reason"] = "-"
-        for cid, row in timeline_map.items():
-            if cid in best_set:
-                continue
-            row["dp_drop_reason"] = row.get("dp_drop_reason", "pre_take") or "pre_take"
-
         untagged_rows = [row for row in timeline_rows if int(row.get("candidate_id", -1) or -1) < 0 and row.get("kept")]
-        for row in untagged_rows:
-            row["dp_in_best"] = 1
-            row["dp_drop_reason"] = "-"
+        if trace_timeline:
+            for cid in best_set:
+                row = timeline_map.get(cid)
+                if row is None:
+                    continue
+                row["dp_in_best"] = 1
+                row["dp_drop_reason"] = "-"
+            for cid, row in timeline_map.items():
+                if cid in best_set:
+                    continue
+                row["dp_drop_reason"] = row.get("dp_drop_reason", "pre_take") or "pre_take"
+            for row in untagged_rows:
+                row["dp_in_best"] = 1
+                row["dp_drop_reason"] = "-"
 
         def _row_key(entry: dict[str, object]) -> tuple[float, float]:
             start_val = float(entry.get("snap_t0", entry.get("match_t0", 0.0)) or 0.0)
@@ -1840,11 +2156,12 @@ def compute_retake_keep_last(
             "monotonic_dropped": len(dropped_rows),
         }
 
-        repeat_debug_rows_final = repeat_debug_rows
-        dp_path_rows_final = dp_path_rows
+        repeat_debug_rows_final = debug_sink.rows("repeat")
+        debug_sink.put("dp_path", dp_path_rows)
+        dp_path_rows_final = debug_sink.rows("dp_path")
 
         pause_intervals = list(pause_intervals_base)
-        active_indices, final_segments, refine_stats, debug_rows = _refine_segments(
+        active_indices, final_segments, refine_stats = _refine_segments(
             final_keeps,
             audio_duration=audio_duration,
             pause_intervals=pause_intervals,
@@ -1855,7 +2172,9 @@ def compute_retake_keep_last(
             min_segment_sec=min_segment_sec,
             pause_align=pause_align,
             debug_label=debug_label,
+            debug_sink=debug_sink,
         )
+        debug_rows = debug_sink.rows("segments") or []
         keeps = [final_keeps[idx] for idx in range(len(final_keeps)) if idx in active_indices]
         keeps.sort(key=lambda item: item.start)
         edl_keep_segments = final_segments
@@ -2012,7 +2331,7 @@ def compute_retake_keep_last(
             continue
         break
 
-    _log_match_samples(latest_match_probe)
+    _log_match_samples(debug_sink.rows("probe"))
 
     if stats is None:
         stats = {
@@ -2084,6 +2403,7 @@ def compute_retake_keep_last(
                 min_anchor_ngram=min_anchor_ngram,
                 max_windows=max_windows,
                 expand_window=fallback_policy == "align-greedy-expand",
+                qgram_index=qgram_index,
             )
             if fallback_keeps:
                 fallback_engine = "fallback-align-greedy"
@@ -2098,7 +2418,7 @@ def compute_retake_keep_last(
             fallback_note = "NO_MATCH_FALLBACK_KEEP_ALL"
 
         pause_intervals = list(pause_intervals_base)
-        active_indices, final_segments, refine_stats, debug_rows = _refine_segments(
+        active_indices, final_segments, refine_stats = _refine_segments(
             fallback_keeps,
             audio_duration=audio_duration,
             pause_intervals=pause_intervals,
@@ -2109,7 +2429,9 @@ def compute_retake_keep_last(
             min_segment_sec=min_segment_sec,
             pause_align=pause_align,
             debug_label=debug_label,
+            debug_sink=debug_sink,
         )
+        debug_rows = debug_sink.rows("segments") or []
         keeps = [fallback_keeps[idx] for idx in range(len(fallback_keeps)) if idx in active_indices]
         keeps.sort(key=lambda item: item.start)
         edl_keep_segments = final_segments or [(0.0, 0.0)]
@@ -2204,6 +2526,13 @@ def compute_retake_keep_last(
     stats["params_snapshot"] = params_snapshot
     if degrade_history:
         stats["degrade_history"] = degrade_history
+    stats["line_stage"] = {str(index): entry[2] for index, entry in sorted(resolved_lines.items())}
+    stats["stage_resolved"] = dict(Counter(entry[2] for entry in resolved_lines.values()))
+    phase_timings["assemble_sec"] = time.monotonic() - assemble_started
+    stats["phase_timings"] = {key: round(value, 4) for key, value in phase_timings.items()}
+    stats["norm_memo"] = memo_stats(memo_before)  # 本次运行的规范化缓存命中情况（仅主进程）
+    if anytime_stats is not None:
+        stats["anytime"] = anytime_stats
     total_elapsed = time.monotonic() - start_ts
     stats["latency_ms"] = int(total_elapsed * 1000)
     stats["elapsed_sec"] = total_elapsed
@@ -2269,12 +2598,16 @@ def compute_sentence_review(
     segment_merge_gap_sec: float = MERGE_GAP_SEC,
     silence_ranges: Sequence[tuple[float, float]] | None = None,
     audio_path: Path | None = None,
+    audio_duration: float | None = None,
     alias_map: Mapping[str, Sequence[str]] | None = None,
     debug_label: str | None = None,
     no_collapse_align: bool = True,
+    collect_debug_rows: bool = True,
 ) -> SentenceReviewResult:
     """执行句子级审阅模式的匹配与统计。"""
 
+    memo_before = memo_snapshot()
+    debug_sink = DebugSink(["segments"] if collect_debug_rows else ())
     if not words:
         raise ValueError("词序列为空，无法执行句子级审阅逻辑。")
     try:
@@ -2299,7 +2632,7 @@ def compute_sentence_review(
         low_conf=low_conf,
     )
     keep_spans = list(align_result.keep_spans)
-    audio_duration = _resolve_audio_duration(words, audio_path)
+    audio_duration = _resolve_audio_duration(words, audio_path, audio_duration)
     pause_intervals: list[tuple[float, float]] = []
     silence_count = 0
     if pause_align:
@@ -2316,7 +2649,7 @@ def compute_sentence_review(
             silence_count = len(clamped_silence)
             pause_intervals.extend(clamped_silence)
         pause_intervals = _merge_ranges(pause_intervals)
-    active_indices, final_segments, refine_stats, debug_rows = _refine_segments(
+    active_indices, final_segments, refine_stats = _refine_segments(
         keep_spans,
         audio_duration=audio_duration,
         pause_intervals=pause_intervals,
@@ -2327,7 +2660,9 @@ def compute_sentence_review(
         min_segment_sec=min_segment_sec,
         pause_align=pause_align,
         debug_label=debug_label,
+        debug_sink=debug_sink,
     )
+    debug_rows = debug_sink.rows("segments") or []
     keep_spans = [keep_spans[idx] for idx in range(len(keep_spans)) if idx in active_indices]
     keep_segments = final_segments
     span_by_sent: dict[int, tuple[float, float]] = {}
@@ -2359,6 +2694,7 @@ def compute_sentence_review(
         stats["cut_ratio"] = max(0.0, min(1.0, (audio_duration - stats["keep_duration"]) / audio_duration))
     else:
         stats["cut_ratio"] = 0.0
+    stats["norm_memo"] = memo_stats(memo_before)
     hits_sorted = sorted(align_result.hits, key=lambda item: (item.start_time, item.end_time))
     return SentenceReviewResult(
         hits=hits_sorted,
@@ -14,6 +14,7 @@ except Exception:  # 未安装或加载失败时自动回退到内置 LCS
     _HAS_RAPIDFUZZ = False
 
 from .asr_loader import Word
+from .text_index import CharBoundaryIndex
 from ._legacy_text_norm import (
     build_char_index_map,
     cjk_or_latin_seq,
@@ -187,28 +188,6 @@ def build_asr_index(words: Sequence[Word]) -> tuple[list[str], str, list[tuple[i
     return normalized_words, asr_norm, char_map
 
 
-def _char_range_to_word_range(
-    char_range: tuple[int, int], word_char_map: Sequence[tuple[int, int]]
-) -> tuple[int, int] | None:
-    """将字符区间映射到词索引区间。"""
-
-    start_char, end_char = char_range
-    if start_char >= end_char:  # 空区间直接忽略
-        return None
-    start_idx: int | None = None
-    end_idx: int | None = None
-    for idx, (w_start, w_end) in enumerate(word_char_map):  # 顺序遍历所有词区间
-        if start_idx is None and start_char < w_end:  # 找到覆盖起点的词
-            start_idx = idx
-        if w_start < end_char:  # 记录所有覆盖终点的词
-            end_idx = idx
-        if w_end >= end_char and start_idx is not None:  # 已覆盖整段即可结束
-            break
-    if start_idx is None or end_idx is None:
-        return None
-    return start_idx, end_idx
-
-
 def _word_range_to_time(word_range: tuple[int, int], words: Sequence[Word]) -> tuple[float, float]:
     """根据词索引区间换算出时间区间。"""
 
@@ -246,26 +225,33 @@ def _longest_common_substring(a: str, b: str) -> tuple[int, int, int]:
 def find_hits_for_sentence(
     sent_norm: str,
     asr_norm: str,
-    word_char_map: Sequence[tuple[int, int]],
+    word_char_map: Sequence[tuple[int, int]] | CharBoundaryIndex,
     words: Sequence[Word],
 ) -> list[MatchHit]:
-    """在规范化字符串中寻找句子的所有候选命中。"""
+    """在规范化字符串中寻找句子的所有候选命中。
+
+    ``word_char_map`` 可直接传入预建的 :class:`CharBoundaryIndex`，
+    多个句子共用同一索引时避免重复构建。
+    """
 
     hits: list[MatchHit] = []
     if not sent_norm or not asr_norm:
         return hits
+    if not isinstance(word_char_map, CharBoundaryIndex):
+        word_char_map = CharBoundaryIndex.from_char_map(word_char_map)
 
+    char_ranges: list[tuple[int, int]] = []
     start = 0
     while True:  # 严格子串匹配，可能出现多次
         idx = asr_norm.find(sent_norm, start)
         if idx == -1:
             break
-        char_range = (idx, idx + len(sent_norm))
-        word_range = _char_range_to_word_range(char_range, word_char_map)
+        char_ranges.append((idx, idx + len(sent_norm)))
+        start = idx + 1  # 继续查找后续命中
+    for word_range in word_char_map.word_ranges(char_ranges):  # 批量映射全部命中
         if word_range is not None:
             span_start, span_end = _word_range_to_time(word_range, words)
             hits.append(MatchHit(score=1.0, start_time=span_start, end_time=span_end))
-        start = idx + 1  # 继续查找后续命中
 
     if hits:  # 已经找到严格命中则直接返回
         return hits
@@ -288,7 +274,7 @@ def find_hits_for_sentence(
     if best_range is None:
         return hits
 
-    word_range = _char_range_to_word_range(best_range, word_char_map)
+    word_range = word_char_map.word_range(*best_range)
     if word_range is None:
         return hits
 
@@ -459,6 +445,7 @@ def align_sentences_from_text(
     _, asr_norm, char_map = build_asr_index(word_list)
     if not asr_norm:
         raise ValueError("规范化后的词串为空，可能全部为标点或空白。")
+    boundary_index = CharBoundaryIndex.from_char_map(char_map)  # 全部句子共用一份二分索引
 
     all_hits: list[MatchHit] = []
     best_hits: dict[int, MatchHit | None] = {}
@@ -473,7 +460,7 @@ def align_sentences_from_text(
             best_hits[sent_idx] = None
             unmatched_count += 1
             continue
-        hits = find_hits_for_sentence(sent_norm, asr_norm, char_map, word_list)
+        hits = find_hits_for_sentence(sent_norm, asr_norm, boundary_index, word_list)
         for hit in hits:
             hit.sent_idx = sent_idx
             hit.sent_text = sent_text
@@ -0,0 +1,272 @@
+"""进程内静音检测：一次解码为 PCM，按帧统计包络后可反复按阈值检测。
+
+与 :func:`onepass.silence_probe.probe_silence_ffmpeg` 的 ``silencedetect`` 判定一致：
+某段内全部声道、全部采样的幅度都低于 ``noise_db`` 且持续不短于 ``min_d`` 即为静音。
+区别在于只解码一次并保存逐帧峰值/RMS 包络（默认 10 ms 一帧，每小时约 2.8 MB），
+之后调整阈值或一次扫描多组阈值都无需重新解码。区间边界按帧对齐，
+与 ffmpeg 的结果相差不超过一帧。
+
+WAV 文件优先用标准库 :mod:`wave` 读取，其余格式通过单个 ffmpeg 管道解码为
+16-bit PCM WAV 流。未安装 NumPy 或解码失败时返回 ``None``，调用方应回退到
+ffmpeg ``silencedetect``。
+"""
+from __future__ import annotations
+
+import logging
+import math
+import subprocess
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:  # NumPy 可选：缺失时由调用方回退到 ffmpeg silencedetect
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+
+from .silence_probe import _merge_ranges
+
+__all__ = ["SilenceEnvelope", "analyze_audio", "detect_silence", "envelope_from_samples"]
+
+LOGGER = logging.getLogger("onepass.silence_detect")
+
+_CHUNK_FRAMES = 4096  # 每次读取的帧数（10 ms 帧约 41 秒音频）
+_MEASURES = ("peak", "rms")
+
+
+@dataclass(slots=True)
+class SilenceEnvelope:
+    """逐帧幅度包络（线性幅度，满量程为 1.0）。"""
+
+    frame_sec: float
+    duration: float
+    peak: object  # np.ndarray[float32]
+    rms: object  # np.ndarray[float32]
+    sample_rate: int = 0
+    channels: int = 0
+
+    def __len__(self) -> int:
+        return len(self.peak)
+
+    def detect(
+        self,
+        noise_db: float = -35.0,
+        min_d: float = 0.18,
+        *,
+        measure: str = "peak",
+    ) -> List[Tuple[float, float]]:
+        """返回静音区间列表（已合并、按时间排序）。
+
+        ``measure="peak"`` 与 ``silencedetect`` 的逐采样判定一致；``"rms"``
+        按帧能量判定，对底噪中的零星毛刺更宽容。
+        """
+
+        return self.detect_many([(noise_db, min_d)], measure=measure)[(noise_db, min_d)]
+
+    def detect_many(
+        self,
+        params: Iterable[Tuple[float, float]],
+        *,
+        measure: str = "peak",
+    ) -> Dict[Tuple[float, float], List[Tuple[float, float]]]:
+        """一次性按多组 ``(noise_db, min_d)`` 检测，便于扫描阈值。"""
+
+        if measure not in _MEASURES:
+            raise ValueError(f"未知的静音判定方式: {measure}（可选 {', '.join(_MEASURES)}）")
+        levels = self.peak if measure == "peak" else self.rms
+        pairs = list(dict.fromkeys((float(n), float(d)) for n, d in params))
+        results: Dict[Tuple[float, float], List[Tuple[float, float]]] = {}
+        if not pairs:
+            return results
+        thresholds = np.asarray([10.0 ** (n / 20.0) for n, _ in pairs], dtype=np.float32)
+        masks = levels[None, :] < thresholds[:, None]
+        for (noise_db, min_d), mask in zip(pairs, masks):
+            results[(noise_db, min_d)] = self._runs(mask, min_d)
+        return results
+
+    def _runs(self, mask, min_d: float) -> List[Tuple[float, float]]:
+        if not len(mask):
+            return []
+        edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        min_frames = max(1, int(math.ceil(max(0.0, min_d) / self.frame_sec - 1e-9)))
+        keep = (ends - starts) >= min_frames
+        frame_sec = self.frame_sec
+        ranges = [
+            (round(start * frame_sec, 6), round(min(end * frame_sec, self.duration), 6))
+            for start, end in zip(starts[keep].tolist(), ends[keep].tolist())
+        ]
+        return _merge_ranges([(start, end) for start, end in ranges if end > start])
+
+
+class _EnvelopeBuilder:
+    """把任意长度的交错 PCM 数据块累积成逐帧包络。"""
+
+    def __init__(self, sample_rate: int, channels: int, frame_sec: float) -> None:
+        self.sample_rate = sample_rate
+        self.channels = max(1, channels)
+        self.frame_len = max(1, int(round(sample_rate * frame_sec)))
+        self.frame_sec = self.frame_len / sample_rate
+        self.samples = 0
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._peaks: List[object] = []
+        self._rms: List[object] = []
+
+    def feed(self, samples) -> None:
+        """追加已缩放到 [-1, 1] 的交错采样。"""
+
+        data = np.concatenate((self._carry, samples)) if len(self._carry) else samples
+        step = self.frame_len * self.channels
+        whole = (len(data) // step) * step
+        if whole:
+            self._push(data[:whole].reshape(-1, step))
+        self._carry = data[whole:].astype(np.float32, copy=True)
+        self.samples += len(samples) // self.channels
+
+    def _push(self, frames) -> None:
+        self._peaks.append(np.abs(frames).max(axis=1).astype(np.float32))
+        self._rms.append(np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1)).astype(np.float32))
+
+    def finish(self) -> SilenceEnvelope:
+        if len(self._carry):
+            usable = (len(self._carry) // self.channels) * self.channels
+            if usable:
+                self._push(self._carry[:usable].reshape(1, -1))
+        empty = np.zeros(0, dtype=np.float32)
+        peak = np.concatenate(self._peaks) if self._peaks else empty
+        rms = np.concatenate(self._rms) if self._rms else empty
+        return SilenceEnvelope(
+            frame_sec=self.frame_sec,
+            duration=self.samples / self.sample_rate,
+            peak=peak,
+            rms=rms,
+            sample_rate=self.sample_rate,
+            channels=self.channels,
+        )
+
+
+def _pcm_to_float(raw: bytes, sample_width: int):
+    """把小端整型 PCM 字节转换为 [-1, 1] 浮点采样。"""
+
+    if sample_width == 1:  # 8-bit WAV 为无符号
+        return (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    if sample_width == 2:
+        return np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    if sample_width == 3:
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = packed[:, 0] | (packed[:, 1] << 8) | (packed[:, 2] << 16)
+        values = np.where(values & 0x800000, values - 0x1000000, values)
+        return values.astype(np.float32) / 8388608.0
+    if sample_width == 4:
+        return (np.frombuffer(raw, dtype="<i4").astype(np.float64) / 2147483648.0).astype(np.float32)
+    raise ValueError(f"不支持的采样位宽: {sample_width * 8} bit")
+
+
+def _envelope_from_wave(handle: BinaryIO | str, frame_sec: float) -> SilenceEnvelope:
+    with wave.open(handle, "rb") as reader:
+        channels = reader.getnchannels()
+        width = reader.getsampwidth()
+        builder = _EnvelopeBuilder(reader.getframerate(), channels, frame_sec)
+        block = builder.frame_len * _CHUNK_FRAMES
+        while True:
+            raw = reader.readframes(block)
+            if not raw:
+                break
+            usable = len(raw) - len(raw) % (width * channels)
+            builder.feed(_pcm_to_float(raw[:usable], width))
+    return builder.finish()
+
+
+def _envelope_via_ffmpeg(audio: Path, frame_sec: float, ffmpeg: str) -> Optional[SilenceEnvelope]:
+    cmd = [
+        ffmpeg,
+        "-hide_banner",
+        "-nostats",
+        "-loglevel",
+        "error",
+        "-nostdin",
+        "-i",
+        str(audio),
+        "-map_metadata",
+        "-1",
+        "-vn",
+        "-acodec",
+        "pcm_s16le",
+        "-f",
+        "wav",
+        "-",
+    ]
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except (FileNotFoundError, OSError) as exc:
+        LOGGER.warning("无法启动 ffmpeg 解码静音包络: %s", exc)
+        return None
+    try:
+        envelope = _envelope_from_wave(proc.stdout, frame_sec)  # type: ignore[arg-type]
+    except (wave.Error, EOFError, ValueError) as exc:
+        LOGGER.warning("解析 ffmpeg PCM 输出失败，回退到 silencedetect: %s", exc)
+        envelope = None
+    finally:
+        # 提前关闭管道会让 ffmpeg 因 EPIPE 退出，不会残留子进程
+        if proc.stdout:
+            proc.stdout.close()
+        stderr = proc.stderr.read() if proc.stderr else b""
+        returncode = proc.wait()
+    if returncode != 0:
+        LOGGER.warning(
+            "ffmpeg 解码返回码 %s: %s",
+            returncode,
+            stderr.decode("utf-8", "ignore").strip().splitlines()[-1:] or "",
+        )
+        return None
+    return envelope
+
+
+def analyze_audio(
+    audio: Path,
+    *,
+    frame_sec: float = 0.01,
+    ffmpeg: str = "ffmpeg",
+) -> Optional[SilenceEnvelope]:
+    """解码一次并返回逐帧包络；无 NumPy 或解码失败时返回 ``None``。"""
+
+    if np is None:
+        return None
+    audio = Path(audio)
+    if audio.suffix.lower() == ".wav":
+        try:
+            return _envelope_from_wave(str(audio), frame_sec)
+        except (wave.Error, EOFError, ValueError, OSError) as exc:
+            LOGGER.debug("wave 无法直接读取 %s（%s），改用 ffmpeg 解码。", audio, exc)
+    return _envelope_via_ffmpeg(audio, frame_sec, ffmpeg)
+
+
+def detect_silence(
+    audio: Path,
+    noise_db: float = -35.0,
+    min_d: float = 0.18,
+) -> Optional[List[Tuple[float, float]]]:
+    """进程内版本的 ``probe_silence_ffmpeg``；不可用时返回 ``None``。"""
+
+    envelope = analyze_audio(audio)
+    if envelope is None:
+        return None
+    return envelope.detect(noise_db, min_d)
+
+
+def envelope_from_samples(
+    samples: Sequence[float],
+    sample_rate: int,
+    *,
+    channels: int = 1,
+    frame_sec: float = 0.01,
+) -> SilenceEnvelope:
+    """由内存中的交错浮点采样构建包络（测试与已解码音频使用）。"""
+
+    if np is None:
+        raise RuntimeError("envelope_from_samples 需要 NumPy。")
+    builder = _EnvelopeBuilder(sample_rate, channels, frame_sec)
+    builder.feed(np.asarray(samples, dtype=np.float32))
+    return builder.finish()
@@ -1,13 +1,19 @@
 """静音区间探测工具。"""
 from __future__ import annotations
 
+import bisect
 import logging
 import re
 import subprocess
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterable, List, Optional, Sequence, Tuple
 
-__all__ = ["probe_silence_ffmpeg", "nearest_silence_boundary"]
+try:  # NumPy 可选：批量查询时使用 searchsorted
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+
+__all__ = ["SilenceIndex", "probe_silence_ffmpeg", "nearest_silence_boundary"]
 
 
 LOGGER = logging.getLogger("onepass.silence_probe")
@@ -126,3 +132,76 @@ def nearest_silence_boundary(
                 best = boundary
                 best_dist = distance
     return best
+
+
+class SilenceIndex:
+    """静音边界的有序索引，每个文件构建一次，按二分查找最近边界。
+
+    与 :func:`nearest_silence_boundary` 结果一致：取距离最近且不超过
+    ``radius`` 的边界，距离相同时取较小的边界（即有序区间的扫描顺序）。
+    """
+
+    __slots__ = ("boundaries", "_array")
+
+    def __init__(self, boundaries: Iterable[float]) -> None:
+        self.boundaries: List[float] = sorted(set(boundaries))
+        self._array = None
+
+    @classmethod
+    def from_ranges(cls, ranges: Iterable[Tuple[float, float]] | None) -> "SilenceIndex":
+        """由静音区间 ``(start, end)`` 列表构建索引。"""
+
+        values: List[float] = []
+        for start, end in ranges or []:
+            values.append(start)
+            values.append(end)
+        return cls(values)
+
+    def __len__(self) -> int:
+        return len(self.boundaries)
+
+    def __bool__(self) -> bool:
+        return bool(self.boundaries)
+
+    def nearest(self, t: float, radius: float) -> Optional[float]:
+        """返回距离 ``t`` 最近且在 ``radius`` 内的边界。"""
+
+        bounds = self.boundaries
+        if not bounds:
+            return None
+        pos = bisect.bisect_left(bounds, t)
+        best: Optional[float] = None
+        best_dist = 0.0
+        if pos > 0:
+            best = bounds[pos - 1]
+            best_dist = abs(best - t)
+        if pos < len(bounds):
+            right_dist = abs(bounds[pos] - t)
+            if best is None or right_dist < best_dist:
+                best = bounds[pos]
+                best_dist = right_dist
+        if best is None or best_dist > radius:
+            return None
+        return best
+
+    def nearest_many(self, values: Sequence[float], radius: float) -> List[Optional[float]]:
+        """批量查询最近边界；可用 NumPy 时一次 ``searchsorted`` 完成。"""
+
+        bounds = self.boundaries
+        if not bounds or not values:
+            return [None] * len(values)
+        if np is None:
+            return [self.nearest(value, radius) for value in values]
+        if self._array is None:
+            self._array = np.asarray(bounds, dtype=np.float64)
+        array = self._array
+        queries = np.asarray(values, dtype=np.float64)
+        pos = np.searchsorted(array, queries, side="left")
+        left = np.clip(pos - 1, 0, len(bounds) - 1)
+        right = np.clip(pos, 0, len(bounds) - 1)
+        left_dist = np.where(pos > 0, np.abs(array[left] - queries), np.inf)
+        right_dist = np.where(pos < len(bounds), np.abs(array[right] - queries), np.inf)
+        use_right = right_dist < left_dist
+        chosen = np.where(use_right, right, left)
+        within = np.where(use_right, right_dist, left_dist) <= radius
+        return [bounds[idx] if ok else None for idx, ok in zip(chosen.tolist(), within.tolist())]
@@ -0,0 +1,315 @@
+"""Reusable text index structures for anchor lookup during alignment."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:  # NumPy is optional; batch range mapping falls back to bisect
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+
+__all__ = ["CharBoundaryIndex", "QGramIndex", "SuffixArrayIndex", "build_suffix_array"]
+
+
+def build_suffix_array(text: str) -> array:
+    """Return the suffix array of *text* using prefix doubling.
+
+    Ranks are packed into a single integer sort key per round, which keeps
+    the pure-Python build at ``O(n log^2 n)`` and finishes early once every
+    suffix has a unique rank (typical transcripts need only a few rounds).
+    """
+
+    n = len(text)
+    if n == 0:
+        return array("l")
+    alphabet = {ch: code for code, ch in enumerate(sorted(set(text)))}
+    rank = [alphabet[ch] for ch in text]
+    order = sorted(range(n), key=rank.__getitem__)
+    width = 1
+    while True:
+        base = n + 1
+        keys = [
+            rank[idx] * base + (rank[idx + width] + 1 if idx + width < n else 0)
+            for idx in range(n)
+        ]
+        order.sort(key=keys.__getitem__)
+        new_rank = [0] * n
+        current = 0
+        prev_key = keys[order[0]]
+        for idx in order:
+            key = keys[idx]
+            if key != prev_key:
+                current += 1
+                prev_key = key
+            new_rank[idx] = current
+        rank = new_rank
+        if current == n - 1:
+            break
+        width <<= 1
+        if width >= n:
+            break
+    return array("l", order)
+
+
+class SuffixArrayIndex:
+    """Suffix array over a fixed text for exact substring enumeration.
+
+    Built once per text, it answers ``occurrences(pattern)`` in
+    ``O(len(pattern) * log n + hits)`` instead of repeated ``str.find`` scans.
+    """
+
+    __slots__ = ("text", "suffixes")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.suffixes = build_suffix_array(text)
+
+    @classmethod
+    def from_suffixes(cls, text: str, suffixes: Sequence[int]) -> "SuffixArrayIndex":
+        """Wrap a previously built suffix array (e.g. an ``mmap`` view)."""
+
+        index = cls.__new__(cls)
+        index.text = text
+        index.suffixes = suffixes
+        return index
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def _bounds(self, pattern: str) -> tuple[int, int]:
+        text = self.text
+        suffixes = self.suffixes
+        length = len(pattern)
+        lo, hi = 0, len(suffixes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = suffixes[mid]
+            if text[start : start + length] < pattern:
+                lo = mid + 1
+            else:
+                hi = mid
+        first = lo
+        hi = len(suffixes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = suffixes[mid]
+            if text[start : start + length] <= pattern:
+                lo = mid + 1
+            else:
+                hi = mid
+        return first, lo
+
+    def count(self, pattern: str) -> int:
+        """Return how many times *pattern* occurs (overlaps included)."""
+
+        if not pattern:
+            return 0
+        lo, hi = self._bounds(pattern)
+        return hi - lo
+
+    def occurrences(self, pattern: str) -> List[int]:
+        """Return every start offset of *pattern*, sorted ascending."""
+
+        if not pattern:
+            return []
+        lo, hi = self._bounds(pattern)
+        return sorted(self.suffixes[lo:hi])
+
+    def iter_latest(self, pattern: str) -> Iterator[int]:
+        """Yield non-overlapping occurrences from the end of the text.
+
+        The order reproduces repeated ``str.rfind`` calls whose upper bound
+        is moved to the previous hit, which is how the matcher walks anchors
+        when ``prefer_latest`` is set.
+        """
+
+        bound = len(self.text)
+        length = len(pattern)
+        for pos in reversed(self.occurrences(pattern)):
+            if pos + length <= bound:
+                yield pos
+                bound = pos
+
+
+class QGramIndex:
+    """Exact k-gram inverted index over a fixed text, one table per ``k``.
+
+    Tables are built on first use and kept, so every caller probing the same
+    document (stage retries, greedy fallback, legacy matcher) hashes the
+    text at most once per ``k``.
+    """
+
+    __slots__ = ("text", "_tables")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._tables: Dict[int, Dict[str, List[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def table(self, k: int) -> Dict[str, List[int]]:
+        """Return the ``gram -> ascending start offsets`` table for *k*."""
+
+        table = self._tables.get(k)
+        if table is None:
+            table = {}
+            text = self.text
+            for start in range(len(text) - k + 1):
+                gram = text[start : start + k]
+                bucket = table.get(gram)
+                if bucket is None:
+                    table[gram] = [start]
+                else:
+                    bucket.append(start)
+            self._tables[k] = table
+        return table
+
+    def count(self, pattern: str) -> int:
+        """Return how many times *pattern* occurs (overlaps included)."""
+
+        return len(self.occurrences(pattern))
+
+    def occurrences(self, pattern: str) -> List[int]:
+        """Return every start offset of *pattern*, sorted ascending."""
+
+        if not pattern or len(pattern) > len(self.text):
+            return []
+        return list(self.table(len(pattern)).get(pattern, ()))
+
+    def iter_latest(self, pattern: str) -> Iterator[int]:
+        """Yield non-overlapping occurrences from the end of the text."""
+
+        bound = len(self.text)
+        length = len(pattern)
+        for pos in reversed(self.occurrences(pattern)):
+            if pos + length <= bound:
+                yield pos
+                bound = pos
+
+    def candidates(self, query: str, k: int, limit: int) -> List[int]:
+        """Rank window starts by how many k-grams of *query* hit them.
+
+        ``k`` is tried from ``max(k, 3)`` down to 3 and the first length with
+        any hit wins. Without hits the leading snippet of *query* is located
+        with ``str.find`` as a last resort. At most ``limit`` starts are
+        returned, best first and then by position.
+        """
+
+        text = self.text
+        if not text or not query or limit <= 0:
+            return []
+        max_k = min(max(k, 3), len(text), len(query))
+        hits: Counter[int] = Counter()
+        for current_k in range(max_k, 2, -1):
+            table = self.table(current_k)
+            for start in range(len(query) - current_k + 1):
+                positions = table.get(query[start : start + current_k])
+                if positions:
+                    hits.update(positions)
+            if hits:
+                break
+        if not hits:
+            pos = text.find(query[: min(max_k, len(query))])
+            if pos >= 0:
+                hits[pos] = 1
+        ordered = sorted(hits.items(), key=lambda item: (-item[1], item[0]))
+        return [pos for pos, _ in ordered[:limit]]
+
+
+class CharBoundaryIndex:
+    """Map character offsets of a concatenated word string back to words.
+
+    ``boundaries`` holds ``n + 1`` non-decreasing offsets; word ``i`` covers
+    ``[boundaries[i], boundaries[i + 1])`` (empty words are allowed). Every
+    lookup is a bisect, so mapping a hit costs ``O(log n)`` instead of a
+    scan over all words.
+    """
+
+    __slots__ = ("boundaries", "_array")
+
+    def __init__(self, boundaries: Sequence[int]) -> None:
+        self.boundaries = boundaries if boundaries else [0]
+        self._array = None
+
+    @classmethod
+    def from_char_map(cls, char_map: Sequence[Tuple[int, int]]) -> "CharBoundaryIndex":
+        """Build from ``(start, end)`` word spans laid end to end."""
+
+        if not char_map:
+            return cls([0])
+        boundaries = [char_map[0][0]]
+        for start, end in char_map:
+            if start != boundaries[-1]:
+                raise ValueError("char_map spans must be contiguous")
+            boundaries.append(end)
+        return cls(boundaries)
+
+    def __len__(self) -> int:
+        return len(self.boundaries) - 1
+
+    def token_at(self, pos: int, *, right: bool = False) -> int:
+        """Return the word holding offset *pos*, clamped to a valid index.
+
+        With ``right`` the first word starting at or after *pos* is returned,
+        which suits exclusive range ends.
+        """
+
+        bounds = self.boundaries
+        last = len(bounds) - 2
+        if last < 0:
+            return 0
+        if right:
+            idx = bisect_left(bounds, pos, 0, last + 1)
+        else:
+            idx = bisect_right(bounds, pos, 0, last + 1) - 1
+        return max(0, min(idx, last))
+
+    def token_end(self, pos: int) -> int:
+        """Return how many words start before *pos* (an exclusive word end)."""
+
+        return bisect_left(self.boundaries, pos, 0, len(self.boundaries) - 1)
+
+    def word_range(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """Return the inclusive ``(first, last)`` words overlapping ``[start, end)``.
+
+        ``None`` is returned for empty ranges and ranges outside the text.
+        """
+
+        count = len(self.boundaries) - 1
+        if start >= end or count <= 0:
+            return None
+        bounds = self.boundaries
+        first = bisect_right(bounds, start, 1, count + 1) - 1
+        if first >= count:
+            return None
+        covering = bisect_left(bounds, end, 1, count + 1) - 1
+        last = min(covering, count - 1, bisect_left(bounds, end, 0, count) - 1)
+        if last < 0:
+            return None
+        return first, last
+
+    def word_ranges(self, ranges: Iterable[Tuple[int, int]]) -> List[Optional[Tuple[int, int]]]:
+        """Map many character ranges at once; same results as :meth:`word_range`."""
+
+        spans = list(ranges)
+        count = len(self.boundaries) - 1
+        if np is None or count <= 0 or len(spans) < 32:
+            return [self.word_range(start, end) for start, end in spans]
+        if self._array is None:
+            self._array = np.asarray(self.boundaries, dtype=np.int64)
+        bounds = self._array
+        queries = np.asarray(spans, dtype=np.int64).reshape(-1, 2)
+        starts = queries[:, 0]
+        ends = queries[:, 1]
+        first = np.searchsorted(bounds[1:], starts, side="right")
+        covering = np.searchsorted(bounds[1:], ends, side="left")
+        last = np.minimum(np.minimum(covering, count - 1), np.searchsorted(bounds[:-1], ends, side="left") - 1)
+        valid = (starts < ends) & (first < count) & (last >= 0)
+        return [
+            (int(lo), int(hi)) if ok else None
+            for lo, hi, ok in zip(first.tolist(), last.tolist(), valid.tolist())
+        ]
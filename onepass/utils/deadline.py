@@ -0,0 +1,92 @@
+"""Cheap cooperative deadline checks for hot matching loops."""
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+__all__ = ["Deadline"]
+
+_UNBOUNDED_MASK = (1 << 62) - 1
+
+
+class Deadline:
+    """Monotonic deadline whose clock reads are amortised over iterations.
+
+    Hot loops gate the check on a counter they already maintain::
+
+        if not (counter & budget.mask) and budget.expired():
+            break
+
+    so most iterations cost one integer test instead of a clock call. Every
+    clock read adapts ``mask`` (always ``2**k - 1``) so that reads happen
+    roughly every ``interval`` seconds: cheap anchor scans end up checking
+    rarely, edit-distance window loops on almost every iteration. Call
+    ``check_now()`` when a loop hands over to a costlier one so the mask
+    learned on cheap iterations does not delay the next check. Once expired
+    the answer is sticky.
+    """
+
+    __slots__ = ("expires_at", "interval", "max_mask", "mask", "_last_check", "_expired")
+
+    def __init__(
+        self,
+        expires_at: Optional[float],
+        *,
+        interval: float = 0.002,
+        max_mask: int = 255,
+    ) -> None:
+        self.expires_at = expires_at
+        self.interval = max(0.0, float(interval))
+        self.max_mask = max(0, int(max_mask))
+        self.mask = 0 if expires_at is not None else _UNBOUNDED_MASK
+        self._last_check = time.monotonic()
+        self._expired = False
+
+    @classmethod
+    def after(cls, timeout: Optional[float], **kwargs) -> "Deadline":
+        """Return a deadline ``timeout`` seconds from now (none if unset or <= 0)."""
+
+        if timeout and timeout > 0:
+            return cls(time.monotonic() + timeout, **kwargs)
+        return cls(None, **kwargs)
+
+    def __bool__(self) -> bool:
+        return self.expires_at is not None
+
+    def expired(self) -> bool:
+        """Read the clock, adapt ``mask`` and report whether time is up."""
+
+        if self._expired:
+            return True
+        if self.expires_at is None:
+            return False
+        now = time.monotonic()
+        if now > self.expires_at:
+            self._expired = True
+            self.mask = 0
+            return True
+        elapsed = now - self._last_check
+        if elapsed < self.interval * 0.5:
+            self.mask = min(self.max_mask, self.mask * 2 + 1)
+        elif elapsed > self.interval and self.mask:
+            # Shrink in proportion so one slow stretch cannot overshoot twice.
+            target = int((self.mask + 1) * self.interval / elapsed)
+            self.mask = (1 << max(0, target.bit_length() - 1)) - 1
+        self._last_check = now
+        return False
+
+    def check_now(self) -> bool:
+        """Check immediately and restart mask adaptation from every iteration."""
+
+        if self.expires_at is not None and not self._expired:
+            self.mask = 0
+        return self.expired()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (``0.0`` once expired, ``None`` without a deadline)."""
+
+        if self.expires_at is None:
+            return None
+        if self.check_now():
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
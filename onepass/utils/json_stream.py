@@ -0,0 +1,150 @@
+"""Incremental JSON reading for documents too large to load at once."""
+from __future__ import annotations
+
+import codecs
+import json
+from typing import BinaryIO, Iterator
+
+__all__ = ["JSONStreamReader"]
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",:]}"
+
+
+class JSONStreamReader:
+    """Walk a UTF-8 JSON document from a binary handle one value at a time.
+
+    Containers the caller cares about are entered with :meth:`iter_object`
+    and :meth:`iter_array`; every other value is decoded with
+    ``JSONDecoder.raw_decode`` from a sliding text buffer, so only the value
+    currently being read is ever materialised. Malformed input raises
+    :class:`json.JSONDecodeError` like ``json.loads`` would::
+
+        reader = JSONStreamReader(handle)
+        for key in reader.iter_object():
+            if key == "words":
+                for _ in reader.iter_array():
+                    handle_word(reader.read_value())
+            else:
+                reader.skip_value()
+        reader.finish()
+    """
+
+    __slots__ = ("_handle", "_chunk_size", "_decoder", "_utf8", "_buf", "_pos", "_eof")
+
+    def __init__(self, handle: BinaryIO, *, chunk_size: int = 1 << 20) -> None:
+        self._handle = handle
+        self._chunk_size = max(1, int(chunk_size))
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> bool:
+        """Append at least ``size`` bytes of input; return ``False`` at EOF."""
+
+        if self._eof:
+            return False
+        if self._pos:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        data = self._handle.read(max(size, self._chunk_size))
+        if not data:
+            self._eof = True
+        self._buf += self._utf8.decode(data or b"", final=not data)
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buf, self._pos)
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ("" at EOF)."""
+
+        while True:
+            buf = self._buf
+            pos = self._pos
+            length = len(buf)
+            while pos < length and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < length:
+                return buf[pos]
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def _consume(self, expected: str) -> None:
+        if self.peek() != expected:
+            raise self._error(f"Expecting {expected!r}")
+        self._pos += 1
+
+    def read_value(self) -> object:
+        """Decode and return the next complete JSON value."""
+
+        if not self.peek():
+            raise self._error("Expecting value")
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # The value may simply be cut off by the buffer edge; grow
+                # geometrically so a huge value is re-scanned O(log n) times.
+                if not self._fill(len(self._buf) - self._pos):
+                    raise
+                continue
+            # A number cut by the edge still decodes ("1e5" read as "1"), so a
+            # value must be followed by a delimiter unless the input is over.
+            buf = self._buf
+            if (end >= len(buf) or buf[end] not in _DELIMITERS) and self._fill(self._chunk_size):
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self) -> None:
+        """Consume the next value without keeping it."""
+
+        self.read_value()
+
+    def iter_object(self) -> Iterator[str]:
+        """Enter an object and yield its keys; consume each value before resuming."""
+
+        self._consume("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self._error("Expecting property name enclosed in double quotes")
+            key = self.read_value()
+            self._consume(":")
+            yield key  # type: ignore[misc]
+            separator = self.peek()
+            self._pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                self._pos -= 1
+                raise self._error("Expecting ',' delimiter")
+
+    def iter_array(self) -> Iterator[None]:
+        """Enter an array and yield once per element; consume each before resuming."""
+
+        self._consume("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            separator = self.peek()
+            self._pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                self._pos -= 1
+                raise self._error("Expecting ',' delimiter")
+
+    def finish(self) -> None:
+        """Require that only whitespace remains after the top-level value."""
+
+        if self.peek():
+            raise self._error("Extra data")
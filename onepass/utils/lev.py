@@ -1,10 +1,16 @@
 """Bounded Levenshtein distance utilities."""
 from __future__ import annotations
 
+import math
 from typing import Optional
 import time
 
-__all__ = ["bounded_levenshtein"]
+try:  # rapidfuzz ships a C++ kernel with native cutoff support
+    from rapidfuzz.distance import Levenshtein as _RF_LEVENSHTEIN  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    _RF_LEVENSHTEIN = None
+
+__all__ = ["best_substring_match", "bounded_levenshtein", "bounded_ratio", "levenshtein_within"]
 
 
 def bounded_levenshtein(
@@ -90,3 +96,146 @@ def bounded_levenshtein(
         return max_distance + 1
     result = prev[result_idx]
     return result if result <= max_distance else max_distance + 1
+
+
+def _myers_distance(a: str, b: str, max_distance: int) -> int:
+    """Bit-parallel Levenshtein distance (Myers 1999, Hyyrö 2003).
+
+    ``a`` is encoded as bit vectors (Python ints grow as needed) and ``b`` is
+    scanned one character per step, so the cost is ``O(len(b))`` big-int
+    operations. The scan stops once the distance can no longer fall back to
+    ``max_distance`` and ``max_distance + 1`` is returned.
+    """
+
+    length = len(a)
+    peq: dict[str, int] = {}
+    for idx, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << idx)
+    mask = (1 << length) - 1
+    high = 1 << (length - 1)
+    pv = mask
+    mv = 0
+    score = length
+    remaining = len(b)
+    for ch in b:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        remaining -= 1
+        if score - remaining > max_distance:
+            return max_distance + 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score if score <= max_distance else max_distance + 1
+
+
+def levenshtein_within(a: str, b: str, max_distance: int) -> int:
+    """Return the exact distance when it is ``<= max_distance``.
+
+    Larger distances collapse to ``max_distance + 1``. rapidfuzz is used when
+    installed; otherwise the bit-parallel kernel above yields the same value.
+    """
+
+    if max_distance < 0:
+        return 0
+    if a == b:
+        return 0
+    len_a = len(a)
+    len_b = len(b)
+    if abs(len_a - len_b) > max_distance:
+        return max_distance + 1
+    if len_a == 0 or len_b == 0:
+        return max(len_a, len_b)
+    if _RF_LEVENSHTEIN is not None:
+        return int(_RF_LEVENSHTEIN.distance(a, b, score_cutoff=max_distance))
+    # The longer string becomes the bit vector: the Python-level loop then
+    # runs over the shorter one.
+    if len_a < len_b:
+        a, b = b, a
+    return _myers_distance(a, b, max_distance)
+
+
+def bounded_ratio(a: str, b: str, max_ratio: float) -> float:
+    """Normalized edit distance ``d / max(len)`` bounded by ``max_ratio``.
+
+    Ratios within ``max_ratio`` are exact; anything beyond it is reported as
+    ``max_ratio + 1.0`` so callers only need a ``<= max_ratio`` check.
+    """
+
+    if not a and not b:
+        return 0.0
+    if not a or not b:
+        return 1.0
+    longest = max(len(a), len(b))
+    limit = int(math.ceil(longest * max(0.0, max_ratio))) + 1
+    distance = levenshtein_within(a, b, limit)
+    if distance > limit:
+        return max_ratio + 1.0
+    return distance / longest
+
+
+def _myers_columns(pattern: str, text: str, *, free_start: bool) -> list[int]:
+    """Edit distance of *pattern* after each character of *text*.
+
+    With ``free_start`` entry ``j`` is the best distance of *pattern* to any
+    substring ending at ``text[j]`` (approximate search); otherwise it is
+    the distance to the prefix ``text[: j + 1]``.
+    """
+
+    length = len(pattern)
+    peq: dict[str, int] = {}
+    for idx, ch in enumerate(pattern):
+        peq[ch] = peq.get(ch, 0) | (1 << idx)
+    mask = (1 << length) - 1
+    high = 1 << (length - 1)
+    carry = 0 if free_start else 1
+    pv = mask
+    mv = 0
+    score = length
+    columns: list[int] = []
+    append = columns.append
+    for ch in text:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        append(score)
+        ph = ((ph << 1) | carry) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+    return columns
+
+
+def best_substring_match(pattern: str, text: str, max_distance: int) -> tuple[int, int, int] | None:
+    """Locate the substring of *text* closest to *pattern*.
+
+    Returns ``(start, end, distance)`` for the right-most alignment with the
+    minimal distance, or ``None`` when that distance exceeds ``max_distance``.
+    """
+
+    if not pattern or not text or max_distance < 0:
+        return None
+    columns = _myers_columns(pattern, text, free_start=True)
+    best = min(columns)
+    if best > max_distance:
+        return None
+    end = len(columns) - columns[::-1].index(best)
+    lo = max(0, end - len(pattern) - best)
+    # Anchor the reversed pattern at ``end`` to recover the tightest start.
+    reverse = _myers_columns(pattern[::-1], text[lo:end][::-1], free_start=False)
+    span = reverse.index(min(reverse)) + 1
+    return end - span, end, reverse[span - 1]
@@ -19,7 +19,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 
+from .audio_analysis import set_cache_dir as set_audio_cache_dir
+from .pcm_render import render_pcm
+from .render_cache import RenderChunkCache
 from .edl_renderer import (
+    RENDER_ENGINES,
     build_filter_pipeline,
     load_edl,
     normalize_segments,
@@ -476,6 +480,79 @@ def _export_csv(context: WebContext, stem: str, regions: list[dict[str, Any]], d
     return target
 
 
+def _output_is_fresh(output: Path, *inputs: Path) -> bool:
+    """输出存在且不早于全部输入（EDL、源音频）时返回 ``True``。"""
+
+    try:
+        built = output.stat().st_mtime_ns
+        return all(built >= path.stat().st_mtime_ns for path in inputs)
+    except OSError:
+        return False
+
+
+def _render_pcm_output(
+    source: Path,
+    keeps: list[Any],
+    output: Path,
+    fmt: str,
+    samplerate: int | None,
+    channels: int | None,
+    crossfade_ms: float,
+    cache: RenderChunkCache | None = None,
+) -> None:
+    """使用 PCM 直拷引擎渲染；m4a 先写临时 WAV 再单独编码。
+
+    ``cache`` 保存各保留片段的解码结果，编辑少量区域后再次渲染只解码改动的片段。
+    """
+
+    pairs = [(segment.start, segment.end) for segment in keeps]
+    target = output if fmt == "wav" else output.with_name(f".{output.stem}.pcm.wav")
+    try:
+        render_pcm(
+            source,
+            pairs,
+            target,
+            samplerate=samplerate,
+            channels=channels,
+            crossfade_ms=crossfade_ms,
+            chunk_cache=cache,
+        )
+    except (RuntimeError, OSError) as exc:
+        LOGGER.error("[render] pcm engine failed: %s", exc)
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    if fmt == "wav":
+        return
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        "-loglevel",
+        "warning",
+        "-y",
+        "-i",
+        str(target),
+        "-c:a",
+        "aac",
+        "-b:a",
+        "192k",
+        "-movflags",
+        "+faststart",
+        str(output),
+    ]
+    try:
+        proc = subprocess.run(cmd, check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=False)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=500, detail="未找到 ffmpeg，请安装后重试") from exc
+    finally:
+        target.unlink(missing_ok=True)
+    if proc.returncode != 0:
+        stderr_text = (proc.stderr or b"").decode("utf-8", "ignore")
+        LOGGER.error("[render] ffmpeg encode failed rc=%s stderr=%s", proc.returncode, stderr_text.strip())
+        raise HTTPException(status_code=500, detail=f"ffmpeg 编码失败，退出码 {proc.returncode}")
+    if not output.exists():
+        raise HTTPException(status_code=500, detail="ffmpeg 未生成输出文件")
+
+
 def create_app(
     out_dir: Path,
     audio_root: Path | None = None,
@@ -484,6 +561,7 @@ def create_app(
 ) -> FastAPI:
     out_path = Path(out_dir).expanduser().resolve()
     audio_path = Path(audio_root).expanduser().resolve() if audio_root else None
+    set_audio_cache_dir(out_path / ".cache" / "audio")  # 与 CLI 共用音频分析缓存
     web_dir = Path(__file__).resolve().parents[1] / "web"
 
     token_store = PathTokenStore()
@@ -673,6 +751,13 @@ def create_app(
         fmt = str(payload.get("format", "wav")).lower()
         if fmt not in {"wav", "m4a"}:
             raise HTTPException(status_code=400, detail="format 仅支持 wav/m4a")
+        engine = str(payload.get("engine", "filter")).lower()
+        if engine not in RENDER_ENGINES:
+            raise HTTPException(status_code=400, detail=f"engine 仅支持 {'/'.join(RENDER_ENGINES)}")
+        try:
+            crossfade_ms = max(0.0, float(payload.get("crossfade_ms") or 0.0))
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(status_code=400, detail="crossfade_ms 需为数字") from exc
         _, bundle = _ensure_bundle(stem)
         edl_path = _pick_best_file(bundle.edl, EDL_PRIORITY, bundle.stem)
         if not edl_path:
@@ -690,7 +775,8 @@ def create_app(
         clean_dir.mkdir(parents=True, exist_ok=True)
         ext = ".clean.wav" if fmt == "wav" else ".clean.m4a"
         output = clean_dir / f"{stem}{ext}"
-        if output.exists() and not force:
+        # 编辑区域后 EDL 会更新，此时必须重新渲染（pcm 引擎只解码改动的片段）
+        if not force and _output_is_fresh(output, edl_path, source):
             token = context.token_store.register(output)
             total_keep = sum(segment.end - segment.start for segment in keeps)
             return _json_response(
@@ -704,6 +790,28 @@ def create_app(
                 }
             )
 
+        if engine == "pcm":
+            cache = RenderChunkCache(context.out_dir / ".cache" / "render")
+            _render_pcm_output(
+                source, keeps, output, fmt, edl_doc.samplerate, edl_doc.channels, crossfade_ms, cache
+            )
+            LOGGER.info("[render-cache] stem=%s reused=%s decoded=%s", stem, cache.hits, cache.misses)
+            token = context.token_store.register(output)
+            total_keep = sum(segment.end - segment.start for segment in keeps)
+            return _json_response(
+                {
+                    "ok": True,
+                    "path_token": token,
+                    "path": context.posix_from_out(output),
+                    "duration_ms": int(total_keep * 1000),
+                    "segments": len(keeps),
+                    "skipped": False,
+                    "engine": engine,
+                    "chunks_reused": cache.hits,
+                    "chunks_decoded": cache.misses,
+                }
+            )
+
         filter_complex, label = build_filter_pipeline(keeps, edl_doc.samplerate, edl_doc.channels)
         cmd = [
             "ffmpeg",
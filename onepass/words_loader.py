@@ -31,16 +31,24 @@ def _coerce_time(payload: Any, keys=("start", "ts", "begin"), default: float = 0
     return float(default)
 
 
+def token_from_entry(entry: Any) -> Token | None:
+    """Coerce a single word entry into a :class:`Token` (``None`` if it has no text)."""
+
+    text = _coerce_word(entry)
+    if not text:
+        return None
+    start = _coerce_time(entry, ("start", "ts", "begin"))
+    end = _coerce_time(entry, ("end", "te", "finish"), start)
+    return {"text": text, "start": start, "end": end}
+
+
 def load_tokens(json_obj: Any) -> List[Token]:
     tokens: List[Token] = []
 
     def _push(entry: Any) -> None:
-        text = _coerce_word(entry)
-        if not text:
-            return
-        start = _coerce_time(entry, ("start", "ts", "begin"))
-        end = _coerce_time(entry, ("end", "te", "finish"), start)
-        tokens.append({"text": text, "start": start, "end": end})
+        token = token_from_entry(entry)
+        if token is not None:
+            tokens.append(token)
 
     if isinstance(json_obj, dict):
         if isinstance(json_obj.get("words"), list):
@@ -60,4 +68,4 @@ def load_tokens(json_obj: Any) -> List[Token]:
     return tokens
 
 
-__all__ = ["Token", "load_tokens"]
+__all__ = ["Token", "load_tokens", "token_from_entry"]
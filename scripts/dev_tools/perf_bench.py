@@ -0,0 +1,381 @@
+"""性能基准：对齐与渲染热点的可复现微基准。
+
+仅使用标准库与合成数据，按子命令分别测量各热点，输出 JSON 便于对比。
+示例:
+    python scripts/dev_tools/perf_bench.py anchor --sizes 20000 80000 160000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from onepass.match_core import (
+    _iter_anchor_hits,
+    align_lines_global,
+    build_token_stream,
+    match_line_to_tokens,
+    match_lines_parallel,
+)
+from onepass.debug_utils import DebugSink
+from onepass.retake_keep_last import _refine_segments
+from onepass.utils import lev
+from onepass.utils.deadline import Deadline
+
+_ALPHABET = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处理"
+
+
+def _synthetic_tokens(count: int, seed: int) -> List[dict]:
+    """生成指定数量的词级 token，时间轴按固定步长递增。"""
+
+    rng = random.Random(seed)
+    tokens: List[dict] = []
+    cursor = 0.0
+    for _ in range(count):
+        text = "".join(rng.choice(_ALPHABET) for _ in range(rng.randint(1, 3)))
+        tokens.append({"text": text, "start": cursor, "end": cursor + 0.25})
+        cursor += 0.3
+    return tokens
+
+
+def _timeit(func: Callable[[], object], repeat: int) -> float:
+    """返回多次执行中的最短耗时（秒）。"""
+
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_anchor(args: argparse.Namespace) -> Dict[str, object]:
+    """对比 rfind 扫描与后缀数组锚点查找的单行匹配延迟。"""
+
+    rows: List[Dict[str, object]] = []
+    for size in args.sizes:
+        tokens = _synthetic_tokens(size // 2, seed=size)
+        plain = build_token_stream(tokens, None)
+        build_started = time.perf_counter()
+        indexed = build_token_stream(tokens, None, build_index=True)
+        build_elapsed = time.perf_counter() - build_started
+        text = plain.canonical_text
+        rng = random.Random(args.seed)
+        lines = []
+        for _ in range(args.lines):
+            start = rng.randrange(0, max(1, len(text) - 40))
+            lines.append(text[start : start + rng.randint(16, 40)])
+
+        def _run(stream) -> None:
+            for line in lines:
+                match_line_to_tokens(
+                    line,
+                    stream,
+                    None,
+                    min_anchor_ngram=args.anchor,
+                    max_windows=args.max_windows,
+                    match_timeout=None,
+                )
+
+        def _lookup(stream) -> None:
+            width = args.anchor
+            for line in lines:
+                for pos in range(len(line) - width + 1):
+                    for _ in _iter_anchor_hits(stream, line[pos : pos + width], True):
+                        pass
+
+        lookup_plain = _timeit(lambda: _lookup(plain), args.repeat)
+        lookup_indexed = _timeit(lambda: _lookup(indexed), args.repeat)
+        plain_sec = _timeit(lambda: _run(plain), args.repeat)
+        indexed_sec = _timeit(lambda: _run(indexed), args.repeat)
+        rows.append(
+            {
+                "text_len": len(text),
+                "index_build_sec": round(build_elapsed, 4),
+                "rfind_lookup_ms_per_line": round(lookup_plain * 1000 / len(lines), 3),
+                "index_lookup_ms_per_line": round(lookup_indexed * 1000 / len(lines), 3),
+                "rfind_ms_per_line": round(plain_sec * 1000 / len(lines), 3),
+                "index_ms_per_line": round(indexed_sec * 1000 / len(lines), 3),
+            }
+        )
+    return {"bench": "anchor", "rows": rows}
+
+
+def bench_lev(args: argparse.Namespace) -> Dict[str, object]:
+    """对比位并行内核、rapidfuzz 与带状 DP 的有界编辑距离耗时。"""
+
+    rng = random.Random(args.seed)
+    rows: List[Dict[str, object]] = []
+    for length in args.lengths:
+        pairs = []
+        for _ in range(args.pairs):
+            left = "".join(rng.choice(_ALPHABET[:40]) for _ in range(length))
+            right = list(left)
+            for _ in range(max(1, length // 10)):
+                right[rng.randrange(length)] = rng.choice(_ALPHABET[:40])
+            pairs.append((left, "".join(right)))
+        bound = int(length * args.ratio) + 1
+
+        def _myers() -> None:
+            for left, right in pairs:
+                lev._myers_distance(left, right, bound)
+
+        def _banded() -> None:
+            for left, right in pairs:
+                lev.bounded_levenshtein(left, right, bound)
+
+        row: Dict[str, object] = {
+            "length": length,
+            "myers_us_per_pair": round(_timeit(_myers, args.repeat) * 1e6 / len(pairs), 2),
+            "banded_us_per_pair": round(_timeit(_banded, args.repeat) * 1e6 / len(pairs), 2),
+        }
+        if lev._RF_LEVENSHTEIN is not None:
+            backend = lev._RF_LEVENSHTEIN
+
+            def _rapidfuzz() -> None:
+                for left, right in pairs:
+                    backend.distance(left, right, score_cutoff=bound)
+
+            row["rapidfuzz_us_per_pair"] = round(_timeit(_rapidfuzz, args.repeat) * 1e6 / len(pairs), 2)
+        rows.append(row)
+    return {"bench": "lev", "rows": rows}
+
+
+def _synthetic_retake_session(chars: int, seed: int) -> tuple[List[str], List[dict]]:
+    """生成原文行与带重录的朗读 token：约 10% 的行在读完后回退重读。"""
+
+    rng = random.Random(seed)
+    lines: List[str] = []
+    total = 0
+    while total < chars:
+        line = "".join(rng.choice(_ALPHABET) for _ in range(rng.randint(12, 36)))
+        lines.append(line)
+        total += len(line)
+    order: List[int] = []
+    for idx in range(len(lines)):
+        order.append(idx)
+        if idx and rng.random() < 0.1:
+            order.extend(range(max(0, idx - rng.randint(0, 2)), idx + 1))
+    tokens: List[dict] = []
+    cursor = 0.0
+    for idx in order:
+        for ch in lines[idx]:
+            tokens.append({"text": ch, "start": cursor, "end": cursor + 0.2})
+            cursor += 0.25
+        cursor += 0.8
+    return lines, tokens
+
+
+def bench_global(args: argparse.Namespace) -> Dict[str, object]:
+    """对比逐行独立搜索与整篇锚点链对齐的总耗时。"""
+
+    rows: List[Dict[str, object]] = []
+    for size in args.sizes:
+        lines, tokens = _synthetic_retake_session(size, seed=size)
+        stream = build_token_stream(tokens, None, build_index=True)
+
+        def _per_line() -> int:
+            return sum(
+                1
+                for line in lines
+                if match_line_to_tokens(
+                    line,
+                    stream,
+                    None,
+                    min_anchor_ngram=args.anchor,
+                    max_windows=args.max_windows,
+                    match_timeout=None,
+                )
+            )
+
+        def _global() -> int:
+            return sum(1 for item in align_lines_global(lines, stream, None, min_anchor_ngram=args.anchor) if item.matches)
+
+        row: Dict[str, object] = {"text_len": len(stream.canonical_text), "lines": len(lines)}
+        started = time.perf_counter()
+        row["global_matched"] = _global()
+        row["global_sec"] = round(time.perf_counter() - started, 3)
+        if not args.skip_line:
+            started = time.perf_counter()
+            row["line_matched"] = _per_line()
+            row["line_sec"] = round(time.perf_counter() - started, 3)
+        rows.append(row)
+    return {"bench": "global", "rows": rows}
+
+
+def bench_lines(args: argparse.Namespace) -> Dict[str, object]:
+    """逐行引擎：单进程与行级进程池的总耗时对比。"""
+
+    lines, tokens = _synthetic_retake_session(args.size, seed=args.seed)
+    stream = build_token_stream(tokens, None, build_index=True)
+    options = {"min_anchor_ngram": args.anchor, "max_windows": args.max_windows, "match_timeout": None}
+    items = [(idx, line, options) for idx, line in enumerate(lines)]
+    rows: List[Dict[str, object]] = []
+    for workers in args.workers:
+        started = time.perf_counter()
+        merged = match_lines_parallel(items, stream, None, workers=workers)
+        rows.append(
+            {
+                "workers": workers,
+                "lines": len(lines),
+                "matched": sum(1 for result, _ in merged.values() if result),
+                "sec": round(time.perf_counter() - started, 3),
+            }
+        )
+    return {"bench": "lines", "text_len": len(stream.canonical_text), "rows": rows}
+
+
+def bench_deadline(args: argparse.Namespace) -> Dict[str, object]:
+    """截止时间检查开销：逐次 time.time() 轮询 vs 摊销读钟的 Deadline。"""
+
+    iterations = args.iterations
+
+    def _poll_clock() -> None:
+        deadline = time.time() + 3600
+        for _ in range(iterations):
+            if time.time() > deadline:
+                break
+
+    def _poll_budget() -> None:
+        budget = Deadline.after(3600)
+        for idx in range(iterations):
+            if not (idx & budget.mask) and budget.expired():
+                break
+
+    def _bare() -> None:
+        for idx in range(iterations):
+            pass
+
+    bare = _timeit(_bare, args.repeat)
+    clock = _timeit(_poll_clock, args.repeat)
+    budget = _timeit(_poll_budget, args.repeat)
+
+    tokens = _synthetic_tokens(args.size // 2, seed=args.seed)
+    stream = build_token_stream(tokens, None, build_index=True)
+    text = stream.canonical_text
+    rng = random.Random(args.seed)
+    lines = []
+    for _ in range(args.lines):
+        start = rng.randrange(0, max(1, len(text) - 40))
+        lines.append(text[start : start + rng.randint(16, 40)])
+
+    def _match(timeout: float | None) -> None:
+        for line in lines:
+            match_line_to_tokens(line, stream, None, min_anchor_ngram=args.anchor, match_timeout=timeout)
+
+    untimed = _timeit(lambda: _match(None), args.repeat)
+    timed = _timeit(lambda: _match(3600.0), args.repeat)
+    return {
+        "bench": "deadline",
+        "iterations": iterations,
+        "clock_poll_ns_per_check": round((clock - bare) * 1e9 / iterations, 1),
+        "deadline_ns_per_check": round((budget - bare) * 1e9 / iterations, 1),
+        "text_len": len(text),
+        "match_untimed_ms_per_line": round(untimed * 1000 / len(lines), 3),
+        "match_timed_ms_per_line": round(timed * 1000 / len(lines), 3),
+    }
+
+
+def bench_refine(args: argparse.Namespace) -> Dict[str, object]:
+    """片段精修：合成保留片段上的停顿吸附、合并与碎片剔除耗时。"""
+
+    rng = random.Random(args.seed)
+    spans: List[tuple[float, float]] = []
+    pauses: List[tuple[float, float]] = []
+    cursor = 0.0
+    for _ in range(args.keeps):
+        cursor += rng.choice([0.02, 0.1, 0.4, 1.0])
+        length = rng.choice([0.05, 0.15, 0.6, 2.0])
+        spans.append((cursor, cursor + length))
+        pauses.append((cursor + length, cursor + length + 0.2))
+        cursor += length
+    duration = cursor + 1.0
+
+    def _run(collect_debug: bool) -> None:
+        keeps = [SimpleNamespace(start=start, end=end) for start, end in spans]
+        _refine_segments(
+            keeps,
+            audio_duration=duration,
+            pause_intervals=pauses,
+            pause_snap_limit=0.2,
+            pad_before=0.05,
+            pad_after=0.1,
+            merge_gap_sec=0.12,
+            min_segment_sec=0.5,
+            pause_align=True,
+            debug_label="bench",
+            debug_sink=DebugSink(["segments"] if collect_debug else ()),
+        )
+
+    return {
+        "bench": "refine",
+        "keeps": args.keeps,
+        "sec": round(_timeit(lambda: _run(False), args.repeat), 3),
+        "sec_with_debug": round(_timeit(lambda: _run(True), args.repeat), 3),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="OnePass 热点微基准")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数，取最短耗时（默认 3）")
+    parser.add_argument("--seed", type=int, default=1234, help="随机种子（默认 1234）")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    anchor = sub.add_parser("anchor", help="锚点查找：rfind vs 后缀数组")
+    anchor.add_argument("--sizes", type=int, nargs="+", default=[20000, 80000, 160000], help="转写文本长度")
+    anchor.add_argument("--lines", type=int, default=50, help="每个规模测量的行数")
+    anchor.add_argument("--anchor", type=int, default=4, help="锚点 n-gram 长度")
+    anchor.add_argument("--max-windows", type=int, default=200, help="每行候选窗口上限")
+    anchor.set_defaults(func=bench_anchor)
+
+    global_parser = sub.add_parser("global", help="整篇锚点链对齐 vs 逐行搜索")
+    global_parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 40000], help="原文字符数")
+    global_parser.add_argument("--anchor", type=int, default=6, help="锚点 n-gram 长度")
+    global_parser.add_argument("--max-windows", type=int, default=200, help="逐行模式的候选窗口上限")
+    global_parser.add_argument("--skip-line", action="store_true", help="仅测量整篇模式（大规模时逐行过慢）")
+    global_parser.set_defaults(func=bench_global)
+
+    lines_parser = sub.add_parser("lines", help="逐行匹配：行级进程池扩展性")
+    lines_parser.add_argument("--size", type=int, default=30000, help="原文字符数")
+    lines_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="进程数列表")
+    lines_parser.add_argument("--anchor", type=int, default=6, help="锚点 n-gram 长度")
+    lines_parser.add_argument("--max-windows", type=int, default=200, help="每行候选窗口上限")
+    lines_parser.set_defaults(func=bench_lines)
+
+    deadline_parser = sub.add_parser("deadline", help="截止时间检查开销")
+    deadline_parser.add_argument("--iterations", type=int, default=1_000_000, help="轮询循环次数")
+    deadline_parser.add_argument("--size", type=int, default=80000, help="匹配测量所用转写文本长度")
+    deadline_parser.add_argument("--lines", type=int, default=30, help="匹配测量的行数")
+    deadline_parser.add_argument("--anchor", type=int, default=2, help="锚点 n-gram 长度（越短命中越密）")
+    deadline_parser.set_defaults(func=bench_deadline)
+
+    refine_parser = sub.add_parser("refine", help="片段精修：吸附、合并与碎片剔除")
+    refine_parser.add_argument("--keeps", type=int, default=50000, help="合成保留片段数量")
+    refine_parser.set_defaults(func=bench_refine)
+
+    lev_parser = sub.add_parser("lev", help="有界编辑距离内核对比")
+    lev_parser.add_argument("--lengths", type=int, nargs="+", default=[16, 40, 120], help="字符串长度")
+    lev_parser.add_argument("--pairs", type=int, default=200, help="每个长度的样本对数")
+    lev_parser.add_argument("--ratio", type=float, default=0.35, help="距离上限比例")
+    lev_parser.set_defaults(func=bench_lev)
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    result = args.func(args)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
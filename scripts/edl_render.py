@@ -14,6 +14,7 @@ import argparse  # 解析命令行参数
 import sys  # 控制退出码
 from pathlib import Path  # 统一路径处理
 
+from onepass.audio_analysis import set_cache_dir  # 共享音频分析缓存
 from onepass.edl_renderer import (  # 导入核心渲染逻辑
     load_edl,
     normalize_segments,
@@ -34,6 +35,9 @@ def _parse_args() -> argparse.Namespace:
     parser.add_argument("--samplerate", type=int, default=None, help="目标采样率 (Hz)")  # 可选采样率
     parser.add_argument("--channels", type=int, default=None, help="目标声道数")  # 可选声道
     parser.add_argument("--dry-run", action="store_true", help="仅打印命令，不实际执行")  # Dry-Run 开关
+    parser.add_argument(
+        "--no-audio-cache", action="store_true", help="禁用音频分析磁盘缓存（默认写入 <out>/.cache/audio/）"
+    )  # 关闭音频分析缓存
     return parser.parse_args()  # 返回解析结果
 
 
@@ -46,6 +50,7 @@ def main() -> None:
     edl_path = Path(args.edl).expanduser().resolve()  # 规范化 EDL 路径
     audio_root = Path(args.audio_root).expanduser().resolve()  # 规范化音频目录
     out_dir = Path(args.out).expanduser().resolve()  # 规范化输出目录
+    set_cache_dir(None if args.no_audio_cache else out_dir / ".cache" / "audio")  # 时长探测结果写入输出目录下的缓存
 
     logger.info("启动 EDL 渲染流程", extra={"edl": str(edl_path), "audio_root": str(audio_root), "out": str(out_dir)})
 
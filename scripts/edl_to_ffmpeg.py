@@ -14,9 +14,11 @@ import shutil
 import subprocess
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Iterable, List, Sequence, Tuple
 
+from onepass.audio_analysis import audio_duration, set_cache_dir
 from onepass.edl_utils import edl_to_keep_intervals, human_sec, load_edl
 
 
@@ -24,6 +26,12 @@ class CommandError(RuntimeError):
     """Raised when an ffmpeg invocation fails."""
 
 
+OUTPUT_RATE = 48000
+# Gaps shorter than this are not split out by the segment muxer: the
+# resulting piece could be empty and shift every later index.
+_MIN_SEGMENT_GAP = 0.005
+
+
 def format_cmd(cmd: Sequence[str]) -> str:
     """Return a shell-style representation of *cmd*."""
 
@@ -60,7 +68,7 @@ def derive_ffprobe_candidates(ffmpeg_path: str) -> List[str]:
     return candidates
 
 
-def probe_duration(audio: Path, ffmpeg_exec: str) -> float:
+def _ffprobe_duration(audio: Path, ffmpeg_exec: str) -> float:
     """Return the duration of *audio* in seconds using ffprobe/ffmpeg."""
 
     error_messages: List[str] = []
@@ -105,6 +113,15 @@ def probe_duration(audio: Path, ffmpeg_exec: str) -> float:
     )
 
 
+def probe_duration(audio: Path, ffmpeg_exec: str) -> float:
+    """Return the duration of *audio*, reusing the shared audio analysis cache."""
+
+    duration = audio_duration(audio, lambda path: _ffprobe_duration(path, ffmpeg_exec))
+    if duration is None:
+        raise RuntimeError("Could not determine audio duration.")
+    return duration
+
+
 def ensure_ffmpeg_available(executable: str) -> None:
     """Verify that *executable* is runnable."""
 
@@ -173,7 +190,7 @@ def slice_interval(
         "-ac",
         "1",
         "-ar",
-        "48000",
+        str(OUTPUT_RATE),
         "-vn",
         "-sn",
         "-dn",
@@ -182,6 +199,144 @@ def slice_interval(
     run_cmd(cmd, dry_run=dry_run)
 
 
+def plan_slice_groups(
+    intervals: Sequence[Tuple[float, float]],
+    max_gap: float,
+) -> List[List[int]]:
+    """Group interval indices whose gaps are at most *max_gap* seconds.
+
+    Each group is decoded by a single ffmpeg process that seeks once and
+    splits the span with the segment muxer; the gap pieces are discarded.
+    ``max_gap <= 0`` yields one group per interval.
+    """
+
+    groups: List[List[int]] = []
+    for idx, (start, _) in enumerate(intervals):
+        if groups and max_gap > 0:
+            gap = start - intervals[groups[-1][-1]][1]
+            if _MIN_SEGMENT_GAP <= gap <= max_gap:
+                groups[-1].append(idx)
+                continue
+        groups.append([idx])
+    return groups
+
+
+def slice_group(
+    ffmpeg_exec: str,
+    audio: Path,
+    intervals: Sequence[Tuple[float, float]],
+    out_dir: Path,
+    prefix: str,
+    *,
+    dry_run: bool,
+) -> List[Path]:
+    """Render several nearby keep intervals with one seek via the segment muxer.
+
+    The span from the first start to the last end is decoded once and cut at
+    every interval boundary; pieces alternate keep/gap, so the keeps are the
+    even-numbered outputs. ``asetnsamples`` keeps packets at 1 ms so cuts
+    land within a millisecond of the requested time. Falls back to
+    :func:`slice_interval` if the muxer produced an unexpected piece count.
+    """
+
+    base = intervals[0][0]
+    cuts: List[str] = []
+    for idx, (start, end) in enumerate(intervals):
+        if idx:
+            cuts.append(f"{start - base:.6f}")
+        if idx + 1 < len(intervals):
+            cuts.append(f"{end - base:.6f}")
+    pattern = out_dir / f"{prefix}_%04d.wav"
+    cmd = [
+        ffmpeg_exec,
+        "-hide_banner",
+        "-y",
+        "-ss",
+        f"{base:.6f}",
+        "-to",
+        f"{intervals[-1][1]:.6f}",
+        "-i",
+        str(audio),
+        "-ac",
+        "1",
+        "-ar",
+        str(OUTPUT_RATE),
+        "-af",
+        f"asetnsamples=n={OUTPUT_RATE // 1000}:p=0",
+        "-vn",
+        "-sn",
+        "-dn",
+        "-f",
+        "segment",
+        "-segment_times",
+        ",".join(cuts),
+        "-reset_timestamps",
+        "1",
+        str(pattern),
+    ]
+    run_cmd(cmd, dry_run=dry_run)
+    expected = 2 * len(intervals) - 1
+    pieces = [out_dir / f"{prefix}_{idx:04d}.wav" for idx in range(expected)]
+    if dry_run:
+        return pieces[0::2]
+    produced = sorted(out_dir.glob(f"{prefix}_*.wav"))
+    if len(produced) != expected:
+        for path in produced:
+            path.unlink(missing_ok=True)
+        keeps: List[Path] = []
+        for idx, (start, end) in enumerate(intervals):
+            path = out_dir / f"{prefix}_keep{idx:04d}.wav"
+            slice_interval(ffmpeg_exec, audio, start, end, path, dry_run=dry_run)
+            keeps.append(path)
+        return keeps
+    for path in pieces[1::2]:
+        path.unlink(missing_ok=True)
+    return pieces[0::2]
+
+
+def slice_all(
+    ffmpeg_exec: str,
+    audio: Path,
+    intervals: Sequence[Tuple[float, float]],
+    out_dir: Path,
+    *,
+    jobs: int = 1,
+    segment_gap: float = 0.0,
+    dry_run: bool,
+) -> List[Path]:
+    """Render every keep interval, returning the slice paths in timeline order.
+
+    Up to *jobs* ffmpeg processes run at once (dry runs stay sequential so
+    the printed commands keep their order). Intervals separated by at most
+    *segment_gap* seconds share one decode through :func:`slice_group`.
+    """
+
+    groups = plan_slice_groups(intervals, segment_gap)
+
+    def _render(group_idx: int) -> List[Path]:
+        members = groups[group_idx]
+        if len(members) == 1:
+            start, end = intervals[members[0]]
+            path = out_dir / f"part_{members[0]:04d}.wav"
+            slice_interval(ffmpeg_exec, audio, start, end, path, dry_run=dry_run)
+            return [path]
+        return slice_group(
+            ffmpeg_exec,
+            audio,
+            [intervals[idx] for idx in members],
+            out_dir,
+            f"group_{group_idx:04d}",
+            dry_run=dry_run,
+        )
+
+    if jobs <= 1 or dry_run or len(groups) == 1:
+        results = [_render(idx) for idx in range(len(groups))]
+    else:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_render, range(len(groups))))
+    return [path for paths in results for path in paths]
+
+
 def concat_segments(
     ffmpeg_exec: str,
     segments: Sequence[Path],
@@ -209,6 +364,33 @@ def concat_segments(
     run_cmd(cmd, dry_run=dry_run)
 
 
+def build_xfade_graph(count: int, duration: float) -> Tuple[str, str]:
+    """Return ``(filter_complex, output_label)`` crossfading *count* inputs.
+
+    Inputs are merged pairwise level by level, a balanced tree of depth
+    ``ceil(log2(count))`` instead of a chain of ``count - 1`` nested
+    crossfades. Each ``acrossfade`` only touches the end of its left input
+    and the start of its right one, so the result matches the linear chain.
+    """
+
+    if count < 2:
+        raise ValueError("xfade requires at least two segments")
+    labels = [f"[{idx}:a]" for idx in range(count)]
+    filter_parts: List[str] = []
+    level = 0
+    while len(labels) > 1:
+        merged: List[str] = []
+        for pair in range(0, len(labels) - 1, 2):
+            out = f"[xf{level}_{pair // 2}]"
+            filter_parts.append(f"{labels[pair]}{labels[pair + 1]}acrossfade=d={duration:.3f}{out}")
+            merged.append(out)
+        if len(labels) % 2:
+            merged.append(labels[-1])
+        labels = merged
+        level += 1
+    return ";".join(filter_parts), labels[0]
+
+
 def xfade_segments(
     ffmpeg_exec: str,
     segments: Sequence[Path],
@@ -217,21 +399,13 @@ def xfade_segments(
     dry_run: bool,
     duration: float = 0.015,
 ) -> None:
-    """Apply cascading acrossfade between *segments*."""
+    """Apply acrossfade between *segments* using a tree-shaped graph."""
 
     cmd: List[str] = [ffmpeg_exec, "-hide_banner", "-y"]
     for segment in segments:
         cmd.extend(["-i", str(segment)])
 
-    filter_parts: List[str] = []
-    for idx in range(len(segments) - 1):
-        left = "[0:a]" if idx == 0 else f"[xf{idx}]"
-        right = f"[{idx + 1}:a]"
-        out = f"[xf{idx + 1}]"
-        filter_parts.append(f"{left}{right}acrossfade=d={duration:.3f}{out}")
-
-    filter_complex = ";".join(filter_parts)
-    final_label = f"[xf{len(segments) - 1}]"
+    filter_complex, final_label = build_xfade_graph(len(segments), duration)
     cmd.extend(
         [
             "-filter_complex",
@@ -241,7 +415,7 @@ def xfade_segments(
             "-ac",
             "1",
             "-ar",
-            "48000",
+            str(OUTPUT_RATE),
             "-c:a",
             "pcm_s16le",
             str(output),
@@ -295,7 +469,22 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
     parser.add_argument("--loudnorm", action="store_true", help="Apply EBU R128 loudness normalization")
     parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg executable path")
     parser.add_argument("--dry-run", action="store_true", help="Print commands without executing them")
+    parser.add_argument(
+        "--no-audio-cache",
+        action="store_true",
+        help="Disable the on-disk audio analysis cache (default: <out dir>/.cache/audio/ when --out is given)",
+    )
     parser.add_argument("--keep-temp", action="store_true", help="Keep temporary slice files")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of ffmpeg slice processes to run in parallel")
+    parser.add_argument(
+        "--segment-gap",
+        type=float,
+        default=0.0,
+        help=(
+            "Decode keep intervals separated by at most this many seconds in one ffmpeg pass "
+            "using the segment muxer (0 disables; cuts are accurate to about 1 ms)"
+        ),
+    )
     return parser.parse_args(argv)
 
 
@@ -341,6 +530,10 @@ def main(argv: Sequence[str] | None = None) -> int:
         out_dir = Path("out")
         out_path = out_dir / f"{audio_path.stem}.clean.wav"
     out_path = out_path.resolve()
+    if args.no_audio_cache:
+        set_cache_dir(None)
+    elif args.out is not None:
+        set_cache_dir(out_path.parent / ".cache" / "audio")
 
     try:
         duration = probe_duration(audio_path, ffmpeg_exec)
@@ -373,7 +566,7 @@ def main(argv: Sequence[str] | None = None) -> int:
             "-ac",
             "1",
             "-ar",
-            "48000",
+            str(OUTPUT_RATE),
             "-vn",
             "-sn",
             "-dn",
@@ -389,15 +582,19 @@ def main(argv: Sequence[str] | None = None) -> int:
     tmp_dir = Path(tempfile.mkdtemp(prefix="edl_render_"))
 
     try:
-        segment_paths: List[Path] = []
-        for idx, (start, end) in enumerate(intervals):
-            part_path = tmp_dir / f"part_{idx:04d}.wav"
-            try:
-                slice_interval(ffmpeg_exec, audio_path, start, end, part_path, dry_run=args.dry_run)
-            except CommandError as exc:
-                print(f"Error: {exc}", file=sys.stderr)
-                return 1
-            segment_paths.append(part_path)
+        try:
+            segment_paths = slice_all(
+                ffmpeg_exec,
+                audio_path,
+                intervals,
+                tmp_dir,
+                jobs=max(1, args.jobs),
+                segment_gap=max(0.0, args.segment_gap),
+                dry_run=args.dry_run,
+            )
+        except CommandError as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
 
         if len(segment_paths) == 1:
             stage_path = segment_paths[0]
@@ -26,6 +26,7 @@ from match_materials import is_canonical_stem, match_materials, parse_glob_list
 from scripts.ui_server import start_ui
 
 from onepass.asr_loader import load_words  # 载入词级 JSON
+from onepass.asr_cache import NormalizedASR, load_normalized_asr  # 规范化结果缓存
 from onepass.alignment.canonical import (
     CanonicalRules,
     concat_and_index,
@@ -38,6 +39,7 @@ from onepass.batch_utils import (  # 批处理通用工具
     write_json,
 )
 from onepass.edl_renderer import (  # 音频渲染依赖
+    RENDER_ENGINES,
     load_edl,
     normalize_segments,
     probe_duration,
@@ -69,7 +71,8 @@ from onepass.retake_keep_last import (  # 保留最后一遍导出函数
     export_sentence_srt,
     export_sentence_txt,
 )
-from onepass.silence_probe import probe_silence_ffmpeg
+from onepass.audio_analysis import lookup_analysis, set_cache_dir as set_audio_cache_dir
+from onepass.audio_analysis import silence_ranges as cached_silence_ranges
 from onepass.seg_prosody import ProsodyConfig, ProsodySplitResult, split_text_with_prosody
 from onepass.text_normalizer import (
     DEFAULT_HARD_PUNCT,
@@ -1786,10 +1789,16 @@ def _process_retake_item(
     dp_penalty_pre: float,
     dp_penalty_gap: float,
     dp_epsilon: float,
+    align_engine: str = "line",
+    line_workers: int = 1,
+    match_schedule: str = "stages",
+    asr_cache_dir: Path | None = None,
+    audio_cache_dir: Path | None = None,
 ) -> Tuple[str, dict]:
     """处理单个词级 JSON + 文本的组合。"""
 
     stem = stem_from_words_json(words_path)  # 解析输出前缀
+    set_audio_cache_dir(audio_cache_dir)  # 进程池 worker 不继承父进程的模块状态；None 表示禁用
     try:
         if not words_path.exists():
             # 尝试查找别名文件
@@ -1818,9 +1827,21 @@ def _process_retake_item(
                     f"期望目录: {expected_dir}\n"
                     f"请确认文件名与目录是否正确，或检查别名映射配置。"
                 )
+        normalized_asr: NormalizedASR | None = None
         try:
-            doc = load_words(words_path)  # 读取词级 JSON
-            words = list(doc)
+            if asr_cache_dir is not None and not sentence_strict:
+                # 按内容哈希缓存规范化结果，调参重跑时跳过解析与逐词规范化
+                normalized_asr = load_normalized_asr(
+                    words_path,
+                    alias_map=alias_map,
+                    match_alias_map=match_alias_map,
+                    build_index=fast_match,
+                    cache_dir=asr_cache_dir,
+                )
+                words = normalized_asr.words
+            else:
+                doc = load_words(words_path)  # 读取词级 JSON
+                words = doc.words  # 列式存储，无需展开成 Word 列表
         except FileNotFoundError:
             # 重新抛出，让外层处理
             raise
@@ -1858,21 +1879,28 @@ def _process_retake_item(
             if resolved_candidate.exists():
                 audio_path = resolved_candidate
         silence_ranges: list[tuple[float, float]] | None = []
+        audio_duration: float | None = None
+        silence_engine = "off"
         probe_needed = silence_probe_enabled and audio_path is not None and (pause_align or snap_silence)
         if probe_needed:
-            silence_ranges = probe_silence_ffmpeg(
+            # 优先复用分析缓存；未命中时进程内解码一次求包络，失败再回退 silencedetect
+            silence_ranges, silence_engine = cached_silence_ranges(
                 audio_path,
                 noise_db=silence_noise_db,
                 min_d=silence_min_d,
             )
+            analysis = lookup_analysis(audio_path)
+            if analysis is not None and analysis.duration:
+                audio_duration = analysis.duration
         else:
             silence_ranges = []
         LOGGER.info(
-            "[silence] stem=%s ranges=%s n=%.0fdB d=%.2fs",
+            "[silence] stem=%s ranges=%s n=%.0fdB d=%.2fs engine=%s",
             stem,
             len(silence_ranges or []),
             silence_noise_db,
             silence_min_d,
+            silence_engine,
         )
         effective_silence = silence_ranges if pause_align else None
 
@@ -1904,8 +1932,10 @@ def _process_retake_item(
                     segment_merge_gap_sec=merge_gap_sec,
                     silence_ranges=effective_silence,
                     audio_path=audio_path,
+                    audio_duration=audio_duration,
                     debug_label=stem,
                     no_collapse_align=no_collapse_align,
+                    collect_debug_rows=debug_csv is not None,
                 )
             return compute_retake_keep_last(
                 words,
@@ -1922,6 +1952,7 @@ def _process_retake_item(
                 merge_gap_sec=merge_gap_sec,
                 silence_ranges=effective_silence,
                 audio_path=audio_path,
+                audio_duration=audio_duration,
                 alias_map=alias_map,
                 match_alias_map=match_alias_map,
                 debug_label=stem,
@@ -1935,6 +1966,7 @@ def _process_retake_item(
                 no_collapse_align=no_collapse_align,
                 drop_ascii_parens=drop_ascii_parens,
                 collect_match_debug=match_debug,
+                collect_debug_rows=debug_csv is not None,
                 snap_silence=snap_silence,
                 snap_radius=snap_radius,
                 snap_min_duration=min_seg_dur,
@@ -1948,6 +1980,10 @@ def _process_retake_item(
                 dp_penalty_pre=dp_penalty_pre,
                 dp_penalty_gap=dp_penalty_gap,
                 dp_epsilon=dp_epsilon,
+                align_engine=align_engine,
+                line_workers=line_workers,
+                match_schedule=match_schedule,
+                normalized_asr=normalized_asr,
             )
 
         def _load_context_preview() -> str:
@@ -2288,6 +2324,11 @@ def _run_retake_batch(
     overcut_threshold: float,
     no_interaction: bool,
     debug_csv: Path | None,
+    align_engine: str = "line",
+    line_workers: int = 1,
+    match_schedule: str = "stages",
+    asr_cache_dir: Path | None = None,
+    audio_cache_dir: Path | None = None,
 ) -> dict:
     """执行目录批处理的配对与导出。"""
 
@@ -2388,6 +2429,11 @@ def _run_retake_batch(
             dp_penalty_pre=dp_penalty_pre,
             dp_penalty_gap=dp_penalty_gap,
             dp_epsilon=dp_epsilon,
+            align_engine=align_engine,
+            line_workers=line_workers,
+            match_schedule=match_schedule,
+            asr_cache_dir=asr_cache_dir,
+            audio_cache_dir=audio_cache_dir,
         )
                 )  # 提交任务
             for future in as_completed(futures):  # 收集结果
@@ -2470,6 +2516,11 @@ def _run_retake_batch(
                     overcut_threshold=overcut_threshold,
                     no_interaction=no_interaction,
                     debug_csv=debug_csv,
+                    align_engine=align_engine,
+                    line_workers=line_workers,
+                    match_schedule=match_schedule,
+                    asr_cache_dir=asr_cache_dir,
+                    audio_cache_dir=audio_cache_dir,
                 )  # 直接处理
                 items.append(item)
                 if item["status"] != "ok":  # 更新失败计数
@@ -2522,6 +2573,12 @@ def run_retake_keep_last(args: argparse.Namespace, *, report_path: Path, write_r
     overcut_mode = args.overcut_mode
     overcut_threshold = float(args.overcut_threshold)
     fast_match = bool(args.fast_match)
+    align_engine = str(getattr(args, "align_engine", "line") or "line")
+    line_workers = max(1, int(getattr(args, "line_workers", 1) or 1))
+    match_schedule = str(getattr(args, "match_schedule", "stages") or "stages")
+    asr_cache_dir = None if getattr(args, "no_asr_cache", False) else out_dir / ".cache" / "asr"
+    audio_cache_dir = None if getattr(args, "no_audio_cache", False) else out_dir / ".cache" / "audio"
+    set_audio_cache_dir(audio_cache_dir)
     max_windows = int(args.max_windows)
     match_timeout = float(args.match_timeout)
     compute_timeout_sec = float(args.compute_timeout_sec)
@@ -2660,6 +2717,11 @@ def run_retake_keep_last(args: argparse.Namespace, *, report_path: Path, write_r
             dp_penalty_pre=dp_penalty_pre,
             dp_penalty_gap=dp_penalty_gap,
             dp_epsilon=dp_epsilon,
+            align_engine=align_engine,
+            line_workers=line_workers,
+            match_schedule=match_schedule,
+            asr_cache_dir=asr_cache_dir,
+            audio_cache_dir=audio_cache_dir,
         )
         items = [item]
         failed = 0 if item["status"] == "ok" else 1
@@ -2721,6 +2783,11 @@ def run_retake_keep_last(args: argparse.Namespace, *, report_path: Path, write_r
             overcut_threshold,
             no_interaction,
             debug_csv,
+            align_engine=align_engine,
+            line_workers=line_workers,
+            match_schedule=match_schedule,
+            asr_cache_dir=asr_cache_dir,
+            audio_cache_dir=audio_cache_dir,
         )
         items = result["items"]
         summary = result["summary"]
@@ -2926,6 +2993,16 @@ def handle_retake_keep_last(args: argparse.Namespace) -> int:
         parts.append("--no-interaction")
     parts.append("--no-collapse-align" if args.no_collapse_align else "--collapse-align")
     parts.append("--fast-match" if args.fast_match else "--no-fast-match")
+    if getattr(args, "align_engine", "line") != "line":
+        parts.extend(["--align-engine", args.align_engine])
+    if int(getattr(args, "line_workers", 1) or 1) > 1:
+        parts.extend(["--line-workers", str(args.line_workers)])
+    if getattr(args, "match_schedule", "stages") != "stages":
+        parts.extend(["--match-schedule", args.match_schedule])
+    if getattr(args, "no_asr_cache", False):
+        parts.append("--no-asr-cache")
+    if getattr(args, "no_audio_cache", False):
+        parts.append("--no-audio-cache")
     parts.extend(["--max-windows", str(args.max_windows)])
     parts.extend(["--match-timeout", str(args.match_timeout)])
     parts.extend(["--compute-timeout-sec", str(args.compute_timeout_sec)])
@@ -3004,6 +3081,8 @@ def _process_render_item(
     out_dir: Path,
     samplerate: Optional[int],
     channels: Optional[int],
+    engine: str = "filter",
+    crossfade_ms: float = 0.0,
 ) -> dict:
     """处理单个 EDL 渲染任务。"""
 
@@ -3076,6 +3155,9 @@ def _process_render_item(
             dry_run=False,
             edl_doc=edl,
             source_audio_path=source_audio,
+            engine=engine,
+            crossfade_ms=crossfade_ms,
+            render_cache_dir=out_dir / ".cache" / "render" if engine == "pcm" else None,
         )  # 调用渲染
         keep_duration = sum(seg.end - seg.start for seg in keeps)  # 统计保留时长
         return {
@@ -3087,6 +3169,7 @@ def _process_render_item(
                 "keep_duration": keep_duration,
                 "samplerate": actual_samplerate,
                 "channels": actual_channels,
+                "engine": engine,
             },
             "status": "ok",
             "message": "渲染成功",
@@ -3118,12 +3201,20 @@ def run_render_audio(args: argparse.Namespace, *, report_path: Path, write_repor
         raise ValueError("--samplerate 必须为正整数")
     if channels is not None and channels <= 0:  # 校验声道数
         raise ValueError("--channels 必须为正整数")
+    engine = getattr(args, "render_engine", "filter") or "filter"  # 渲染引擎
+    crossfade_ms = float(getattr(args, "crossfade_ms", 0.0) or 0.0)
+    if crossfade_ms < 0:
+        raise ValueError("--crossfade-ms 不能为负数")
+    if crossfade_ms and engine != "pcm":
+        LOGGER.warning("--crossfade-ms 仅对 pcm 渲染引擎生效，当前引擎=%s", engine)
 
     if args.edl:  # 单文件模式
         LOGGER.info("[stage] render start total=1")
         single_start = time.perf_counter()
         items = [
-            _process_render_item(Path(args.edl), audio_root, out_dir, samplerate, channels)
+            _process_render_item(
+                Path(args.edl), audio_root, out_dir, samplerate, channels, engine, crossfade_ms
+            )
         ]
         summary = {
             "total": 1,
@@ -3155,6 +3246,8 @@ def run_render_audio(args: argparse.Namespace, *, report_path: Path, write_repor
                         out_dir,
                         samplerate,
                         channels,
+                        engine,
+                        crossfade_ms,
                     )
                     for edl_path in edl_files
                 ]
@@ -3167,7 +3260,9 @@ def run_render_audio(args: argparse.Namespace, *, report_path: Path, write_repor
                     last_progress = _progress_tick("render", processed, total, start, last_progress)
         else:  # 串行执行
             for edl_path in edl_files:
-                item = _process_render_item(edl_path, audio_root, out_dir, samplerate, channels)
+                item = _process_render_item(
+                    edl_path, audio_root, out_dir, samplerate, channels, engine, crossfade_ms
+                )
                 items.append(item)
                 if item["status"] != "ok":
                     failed += 1
@@ -3210,6 +3305,10 @@ def handle_render_audio(args: argparse.Namespace) -> int:
         parts.extend(["--samplerate", str(args.samplerate)])
     if args.channels:
         parts.extend(["--channels", str(args.channels)])
+    if getattr(args, "render_engine", "filter") != "filter":
+        parts.extend(["--render-engine", args.render_engine])
+    if getattr(args, "crossfade_ms", 0.0):
+        parts.extend(["--crossfade-ms", str(args.crossfade_ms)])
     LOGGER.info(
         "开始渲染任务: 模式=%s 源音频=%s 输出=%s",
         "单文件" if args.edl else "批处理",
@@ -3298,6 +3397,12 @@ def run_all_in_one(args: argparse.Namespace) -> dict:
     start = time.perf_counter()
 
     fast_match = bool(getattr(args, "fast_match", True))
+    align_engine = str(getattr(args, "align_engine", "line") or "line")
+    line_workers = max(1, int(getattr(args, "line_workers", 1) or 1))
+    match_schedule = str(getattr(args, "match_schedule", "stages") or "stages")
+    asr_cache_dir = None if getattr(args, "no_asr_cache", False) else out_dir / ".cache" / "asr"
+    audio_cache_dir = None if getattr(args, "no_audio_cache", False) else out_dir / ".cache" / "audio"
+    set_audio_cache_dir(audio_cache_dir)
     max_windows = int(getattr(args, "max_windows", 50))
     match_timeout = float(getattr(args, "match_timeout", 20.0))
     ratio_input = getattr(args, "max_distance_ratio", None)
@@ -3566,6 +3671,11 @@ def run_all_in_one(args: argparse.Namespace) -> dict:
             dp_penalty_pre=dp_penalty_pre,
             dp_penalty_gap=dp_penalty_gap,
             dp_epsilon=dp_epsilon,
+            align_engine=align_engine,
+            line_workers=line_workers,
+            match_schedule=match_schedule,
+            asr_cache_dir=asr_cache_dir,
+            audio_cache_dir=audio_cache_dir,
         )
         retake_items.append(item)
         if item.get("status") != "ok":
@@ -3676,6 +3786,8 @@ def run_all_in_one(args: argparse.Namespace) -> dict:
                 out=str(out_dir),
                 samplerate=None,
                 channels=None,
+                render_engine=getattr(args, "render_engine", "filter"),
+                crossfade_ms=getattr(args, "crossfade_ms", 0.0),
             )
             try:
                 render_payload = run_render_audio(render_namespace, report_path=report_path, write_report=False)
@@ -3845,6 +3957,10 @@ def handle_all_in_one(args: argparse.Namespace) -> int:
         "--glob-audio",
         args.glob_audio,
     ]
+    if getattr(args, "render_engine", "filter") != "filter":
+        parts.extend(["--render-engine", args.render_engine])
+    if getattr(args, "crossfade_ms", 0.0):
+        parts.extend(["--crossfade-ms", str(args.crossfade_ms)])
     if args.include_canonical_kits:
         parts.append("--include-canonical-kits")
     if args.min_len != DEFAULT_ALIGN_MIN_LEN:
@@ -3903,6 +4019,16 @@ def handle_all_in_one(args: argparse.Namespace) -> int:
         parts.append("--open-browser")
     parts.append("--no-collapse-align" if args.no_collapse_align else "--collapse-align")
     parts.append("--fast-match" if args.fast_match else "--no-fast-match")
+    if getattr(args, "align_engine", "line") != "line":
+        parts.extend(["--align-engine", args.align_engine])
+    if int(getattr(args, "line_workers", 1) or 1) > 1:
+        parts.extend(["--line-workers", str(args.line_workers)])
+    if getattr(args, "match_schedule", "stages") != "stages":
+        parts.extend(["--match-schedule", args.match_schedule])
+    if getattr(args, "no_asr_cache", False):
+        parts.append("--no-asr-cache")
+    if getattr(args, "no_audio_cache", False):
+        parts.append("--no-audio-cache")
     parts.extend(["--max-windows", str(args.max_windows)])
     parts.extend(["--match-timeout", str(args.match_timeout)])
     parts.extend(["--pause-gap-sec", str(args.pause_gap_sec)])
@@ -4442,6 +4568,34 @@ def build_parser() -> argparse.ArgumentParser:
         default=True,
         help="启用快速候选预筛与带宽受限匹配（默认开启）",
     )
+    retake.add_argument(
+        "--align-engine",
+        choices=["line", "global"],
+        default="line",
+        help="对齐引擎：line=逐行独立搜索；global=整篇锚点链一次对齐并保留重录候选（默认 line）",
+    )
+    retake.add_argument(
+        "--line-workers",
+        type=int,
+        default=1,
+        help="单个文档内逐行匹配的并行进程数，结果按行号合并（默认 1=串行）",
+    )
+    retake.add_argument(
+        "--match-schedule",
+        choices=["stages", "anytime"],
+        default="stages",
+        help="匹配调度：stages=超时后整体降级重跑；anytime=先精确定位再按预算细化难行，超时返回当前最好结果（默认 stages）",
+    )
+    retake.add_argument(
+        "--no-asr-cache",
+        action="store_true",
+        help="禁用词级 JSON 规范化结果的磁盘缓存（默认缓存到 <out>/.cache/asr/）",
+    )
+    retake.add_argument(
+        "--no-audio-cache",
+        action="store_true",
+        help="禁用音频时长/静音分析的磁盘缓存（默认缓存到 <out>/.cache/audio/）",
+    )
     retake.add_argument(
         "--max-windows",
         type=int,
@@ -4577,6 +4731,18 @@ def build_parser() -> argparse.ArgumentParser:
     render.add_argument("--out", required=True, help="输出目录")
     render.add_argument("--samplerate", type=int, help="渲染采样率 (可选)")
     render.add_argument("--channels", type=int, help="渲染声道数 (可选)")
+    render.add_argument(
+        "--render-engine",
+        choices=list(RENDER_ENGINES),
+        default="filter",
+        help="渲染引擎：filter=ffmpeg 滤镜图（默认），pcm=解码一次后按样本直拷，片段很多时更快",
+    )
+    render.add_argument(
+        "--crossfade-ms",
+        type=float,
+        default=0.0,
+        help="pcm 引擎在拼接处的交叉淡化时长（毫秒，默认 0=直接拼接）",
+    )
     render.set_defaults(func=handle_render_audio)
 
     serve = subparsers.add_parser("serve-web", help="启动本地可视化控制台")
@@ -4942,6 +5108,18 @@ def build_parser() -> argparse.ArgumentParser:
         default="auto",
         help="渲染策略：auto=有音频才渲染，always=总是渲染，never=跳过",
     )
+    pipeline.add_argument(
+        "--render-engine",
+        choices=list(RENDER_ENGINES),
+        default="filter",
+        help="渲染引擎：filter=ffmpeg 滤镜图（默认），pcm=解码一次后按样本直拷，片段很多时更快",
+    )
+    pipeline.add_argument(
+        "--crossfade-ms",
+        type=float,
+        default=0.0,
+        help="pcm 引擎在拼接处的交叉淡化时长（毫秒，默认 0=直接拼接）",
+    )
     pipeline.add_argument("--workers", type=int, help="批处理并发度")
     pipeline.add_argument("--no-interaction", action="store_true", help="无交互模式，直接执行")
     pipeline.add_argument("--verbose", action="store_true", help="输出调试日志")
@@ -4979,6 +5157,34 @@ def build_parser() -> argparse.ArgumentParser:
         default=True,
         help="启用快速候选预筛与带宽受限匹配（默认开启）",
     )
+    pipeline.add_argument(
+        "--align-engine",
+        choices=["line", "global"],
+        default="line",
+        help="对齐引擎：line=逐行独立搜索；global=整篇锚点链一次对齐并保留重录候选（默认 line）",
+    )
+    pipeline.add_argument(
+        "--line-workers",
+        type=int,
+        default=1,
+        help="单个文档内逐行匹配的并行进程数，结果按行号合并（默认 1=串行）",
+    )
+    pipeline.add_argument(
+        "--match-schedule",
+        choices=["stages", "anytime"],
+        default="stages",
+        help="匹配调度：stages=超时后整体降级重跑；anytime=先精确定位再按预算细化难行，超时返回当前最好结果（默认 stages）",
+    )
+    pipeline.add_argument(
+        "--no-asr-cache",
+        action="store_true",
+        help="禁用词级 JSON 规范化结果的磁盘缓存（默认缓存到 <out>/.cache/asr/）",
+    )
+    pipeline.add_argument(
+        "--no-audio-cache",
+        action="store_true",
+        help="禁用音频时长/静音分析的磁盘缓存（默认缓存到 <out>/.cache/audio/）",
+    )
     pipeline.add_argument(
         "--max-windows",
         type=int,
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import pytest
+
+from onepass._legacy_text_norm import apply_alias_map
+from onepass.alias_matcher import AliasMatcher
+from onepass.canonicalize import CanonicalAliasMap, apply_alias, load_alias_map
+
+ALPHABET = "甲乙丙ab"
+
+
+def _legacy_reference(text, alias_map):
+    """Replacement loop formerly used by ``apply_alias_map``."""
+
+    if not alias_map or not text:
+        return text
+    result = text
+    for canonical, variants in alias_map.items():
+        canonical_str = str(canonical or "").strip()
+        if not canonical_str:
+            continue
+        for variant in variants:
+            variant_str = str(variant or "").strip()
+            if not variant_str or variant_str == canonical_str:
+                continue
+            result = result.replace(variant_str, canonical_str)
+    return result
+
+
+def _canonical_reference(text, mapping):
+    """Replacement loop formerly used by ``canonicalize.apply_alias``."""
+
+    if not text or not mapping:
+        return text
+    result = text
+    for key in sorted(mapping.keys(), key=len, reverse=True):
+        replacement = mapping.get(key)
+        if not replacement or key not in result:
+            continue
+        result = result.replace(key, replacement)
+    return result
+
+
+def _word(rng: random.Random, low: int, high: int) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(low, high)))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_legacy_alias_map_matches_sequential_replace(seed: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(200):
+        alias_map = {
+            _word(rng, 0, 3): [_word(rng, 0, 3) for _ in range(rng.randint(0, 3))]
+            for _ in range(rng.randint(1, 6))
+        }
+        text = _word(rng, 0, 20)
+        assert apply_alias_map(text, alias_map) == _legacy_reference(text, alias_map)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_canonical_alias_matches_sequential_replace(seed: int) -> None:
+    rng = random.Random(100 + seed)
+    for _ in range(200):
+        mapping = {_word(rng, 1, 4): _word(rng, 0, 3) for _ in range(rng.randint(1, 8))}
+        text = _word(rng, 0, 20)
+        expected = _canonical_reference(text, mapping)
+        assert apply_alias(text, mapping) == expected
+        assert apply_alias(text, CanonicalAliasMap(mapping)) == expected
+
+
+def test_matcher_handles_cascades_and_overlaps() -> None:
+    rules = [("ab", "b"), ("bb", "c"), ("a", "bb"), ("b", "")]
+    for text in ["aab", "abab", "bab", "ba", "aaab"]:
+        expected = text
+        for key, value in rules:
+            expected = expected.replace(key, value)
+        assert AliasMatcher(rules).apply(text) == expected
+
+
+def test_bundled_alias_map_matches_reference() -> None:
+    mapping = load_alias_map(REPO_ROOT / "config" / "default_alias_map.json")
+    rng = random.Random(7)
+    pool = list(mapping) + list(mapping.values()) + ["的", "是", " ", "A"]
+    for _ in range(50):
+        text = "".join(rng.choice(pool) for _ in range(rng.randint(1, 30)))
+        assert apply_alias(text, mapping) == _canonical_reference(text, mapping)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+import mmap
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from onepass import asr_cache
+from onepass.asr_cache import asr_cache_key, load_normalized_asr
+from onepass.retake_keep_last import compute_retake_keep_last
+
+
+def _write_words(path: Path, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    alphabet = "甲乙丙丁戊己庚辛壬癸子丑寅卯"
+    lines = ["".join(rng.choice(alphabet) for _ in range(rng.randint(10, 18))) for _ in range(6)]
+    words = []
+    cursor = 0.0
+    for line in lines + lines[2:4]:
+        for ch in line:
+            words.append({"word": ch, "start": round(cursor, 3), "end": round(cursor + 0.2, 3)})
+            cursor += 0.25
+        words.append({"word": " ，", "start": round(cursor, 3), "end": round(cursor + 0.1, 3)})
+        cursor += 0.6
+    path.write_text(json.dumps({"words": words}, ensure_ascii=False), encoding="utf-8")
+    return lines
+
+
+def test_asr_cache_roundtrip_matches_fresh_normalization(tmp_path: Path) -> None:
+    words_path = tmp_path / "demo.words.json"
+    _write_words(words_path, 3)
+    cache_dir = tmp_path / ".cache"
+    alias = {"甲": ["乙"]}
+    fresh = load_normalized_asr(words_path, alias_map=alias, build_index=True)
+    stored = load_normalized_asr(words_path, alias_map=alias, build_index=True, cache_dir=cache_dir)
+    cached = load_normalized_asr(words_path, alias_map=alias, build_index=True, cache_dir=cache_dir)
+    assert not stored.cache_hit and cached.cache_hit
+    assert len(list(cache_dir.iterdir())) == 1
+    assert cached.words == fresh.words
+    assert cached.normalized_words == fresh.normalized_words
+    assert cached.asr_norm_str == fresh.asr_norm_str
+    assert cached.char_map == fresh.char_map
+    for name in ("tokens", "canonical_text", "raw_text", "char_boundaries", "alias_hits"):
+        assert getattr(cached.token_stream, name) == getattr(fresh.token_stream, name)
+    assert list(cached.token_stream.anchor_index.suffixes) == list(fresh.token_stream.anchor_index.suffixes)
+    raw = words_path.read_bytes()
+    assert asr_cache_key(raw, alias) != asr_cache_key(raw, None)
+    assert asr_cache_key(raw, alias) != asr_cache_key(raw + b" ", alias)
+
+
+def test_cache_read_closes_its_mapping(tmp_path: Path, monkeypatch) -> None:
+    words_path = tmp_path / "demo.words.json"
+    _write_words(words_path, 5)
+    cache_dir = tmp_path / ".cache"
+    load_normalized_asr(words_path, build_index=True, cache_dir=cache_dir)
+    maps: list[mmap.mmap] = []
+    original = mmap.mmap
+
+    def _tracking_mmap(*args, **kwargs):
+        maps.append(original(*args, **kwargs))
+        return maps[-1]
+
+    monkeypatch.setattr(asr_cache.mmap, "mmap", _tracking_mmap)
+    cached = load_normalized_asr(words_path, build_index=True, cache_dir=cache_dir)
+    assert cached.cache_hit and len(maps) == 1 and maps[0].closed
+    stream = cached.token_stream
+    assert stream.anchor_index.count(stream.canonical_text[:3]) >= 1
+
+
+def test_compute_with_cached_asr_matches_plain_words(tmp_path: Path) -> None:
+    words_path = tmp_path / "demo.words.json"
+    lines = _write_words(words_path, 5)
+    script = tmp_path / "demo.align.txt"
+    script.write_text("\n".join(lines), encoding="utf-8")
+    cache_dir = tmp_path / ".cache"
+    load_normalized_asr(words_path, build_index=True, cache_dir=cache_dir)
+    cached = load_normalized_asr(words_path, build_index=True, cache_dir=cache_dir)
+    assert cached.cache_hit
+    plain = compute_retake_keep_last(list(cached.words), script, pause_align=False, silence_ranges=[])
+    reused = compute_retake_keep_last(
+        list(cached.words),
+        script,
+        pause_align=False,
+        silence_ranges=[],
+        normalized_asr=cached,
+    )
+    assert reused.keeps == plain.keeps
+    assert reused.edl_keep_segments == plain.edl_keep_segments
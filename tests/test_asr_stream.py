@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import io
+import json
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import pytest
+
+from onepass.asr_loader import load_words
+from onepass.utils.json_stream import JSONStreamReader
+
+
+def _read_all(reader: JSONStreamReader) -> object:
+    """Rebuild a document through the reader's container API."""
+
+    head = reader.peek()
+    if head == "{":
+        return {key: _read_all(reader) for key in reader.iter_object()}
+    if head == "[":
+        return [_read_all(reader) for _ in reader.iter_array()]
+    return reader.read_value()
+
+
+def _random_entry(rng: random.Random, cursor: float) -> dict:
+    entry = {
+        rng.choice(["word", "text"]): rng.choice(["甲", " 乙", "丙丁", "", 'x"y', "é"]),
+        "start": round(cursor, 3),
+        "end": round(cursor + rng.choice([0.2, 0.0, -0.1, 0.35]), 3),
+        "probability": rng.random(),
+    }
+    if rng.random() < 0.1:
+        entry.pop("start")
+    return entry
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_reader_matches_json_loads(chunk_size: int) -> None:
+    payload = {
+        "language": "zh",
+        "text": "长文本" * 20,
+        "segments": [{"id": 1, "words": [{"word": "甲", "start": 0.0, "end": 1e-3}]}, []],
+        "numbers": [0, -1.5e10, 12345678901234567890, True, None],
+        "nested": {"a": [[], {}, {"b": "中\\n"}]},
+    }
+    raw = json.dumps(payload, ensure_ascii=False, indent=1).encode("utf-8")
+    reader = JSONStreamReader(io.BytesIO(raw), chunk_size=chunk_size)
+    assert _read_all(reader) == payload
+    reader.finish()
+
+
+@pytest.mark.parametrize("text", ['{"words": [1, 2', '{"words": [1 2]}', '[1, 2] 3', '{"a" 1}'])
+def test_reader_rejects_malformed_json(text: str) -> None:
+    reader = JSONStreamReader(io.BytesIO(text.encode("utf-8")), chunk_size=2)
+    with pytest.raises(json.JSONDecodeError):
+        _read_all(reader)
+        reader.finish()
+
+
+def _shapes(rng: random.Random) -> list[object]:
+    cursor = [0.0]
+
+    def entries(count: int) -> list[dict]:
+        out = []
+        for _ in range(count):
+            out.append(_random_entry(rng, cursor[0]))
+            cursor[0] += rng.choice([0.25, -0.3, 0.5])
+        return out
+
+    return [
+        {"words": entries(40)},
+        {"segments": [{"words": entries(5)} for _ in range(6)] + [{"text": "无词"}, 3]},
+        {"segments": [{"words": entries(5)}], "words": entries(10)},
+        {"words": [], "segments": [{"words": entries(8)}]},
+        {"words": "oops", "items": entries(12)},
+        {"alt_words": entries(3), "words2": entries(2), "words": entries(9)},
+        entries(20),
+        {"segments": [{"words": [{"word": 12, "start": 0.0, "end": 1.0}, {"word": "乙", "start": 1.0, "end": 2.0}]}]},
+    ]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_streaming_load_matches_full_parse(tmp_path: Path, seed: int) -> None:
+    rng = random.Random(seed)
+    for idx, shape in enumerate(_shapes(rng)):
+        text = json.dumps(shape, ensure_ascii=False)
+        if isinstance(shape, dict) and "words2" in shape:
+            text = text.replace('"words2"', '"words"', 1)  # 重复键：以最后一次出现为准
+        path = tmp_path / f"{seed}_{idx}.words.json"
+        path.write_text(text, encoding="utf-8")
+        try:
+            expected = load_words(path, stream=False)
+        except ValueError as exc:
+            with pytest.raises(ValueError, match=str(exc)[:8]):
+                load_words(path, stream=True)
+            continue
+        streamed = load_words(path, stream=True)
+        assert streamed.words == expected.words
+        assert streamed.meta == expected.meta
+
+
+def test_streaming_load_reports_invalid_json(tmp_path: Path) -> None:
+    path = tmp_path / "broken.words.json"
+    path.write_text('{"words": [{"word": "甲", "start": 0, "end": 1}', encoding="utf-8")
+    with pytest.raises(ValueError, match="解析 JSON 失败"):
+        load_words(path, stream=True)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import struct
+import sys
+import wave
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from onepass import audio_analysis
+from onepass.edl_renderer import probe_duration
+
+RATE = 8000
+
+
+def _write_wav(path: Path, pattern: list[tuple[float, float]]) -> Path:
+    frames = bytearray()
+    for seconds, amplitude in pattern:
+        for idx in range(int(seconds * RATE)):
+            value = amplitude if idx % 2 else -amplitude
+            frames += struct.pack("<h", int(value * 32767))
+    with wave.open(str(path), "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(RATE)
+        writer.writeframes(bytes(frames))
+    return path
+
+
+@pytest.fixture()
+def cache_dir(tmp_path: Path):
+    target = tmp_path / "cache"
+    audio_analysis.set_cache_dir(target)
+    audio_analysis._memory.clear()
+    yield target
+    audio_analysis.set_cache_dir(None)
+    audio_analysis._memory.clear()
+
+
+def test_silences_and_duration_persist_in_sidecar(tmp_path: Path, cache_dir: Path) -> None:
+    audio = _write_wav(tmp_path / "a.wav", [(0.5, 0.5), (0.4, 0.0), (0.5, 0.5)])
+    ranges, source = audio_analysis.silence_ranges(audio, -35.0, 0.18)
+    assert source == "native"
+    assert len(ranges) == 1 and abs(ranges[0][0] - 0.5) < 0.011
+    assert audio_analysis.silence_ranges(audio, -35.0, 0.18) == (ranges, "cache")
+    assert len(list(cache_dir.glob("*.bin"))) == 1
+
+    audio_analysis._memory.clear()  # 模拟新进程：只能读 sidecar
+    record = audio_analysis.lookup_analysis(audio)
+    assert record is not None and record.envelope is not None
+    assert (record.sample_rate, record.channels) == (RATE, 1)
+    assert record.duration == pytest.approx(1.4)
+    assert probe_duration(audio) == pytest.approx(1.4)
+    assert audio_analysis.silence_ranges(audio, -35.0, 0.5) == ([], "cache")
+
+
+def test_changed_file_invalidates_record(tmp_path: Path, cache_dir: Path) -> None:
+    audio = _write_wav(tmp_path / "b.wav", [(1.0, 0.5)])
+    assert audio_analysis.audio_duration(audio) == pytest.approx(1.0)
+    _write_wav(audio, [(2.0, 0.5)])
+    audio_analysis._memory.clear()
+    assert audio_analysis.audio_duration(audio) == pytest.approx(2.0)
+
+
+def test_probe_result_is_reused(tmp_path: Path, cache_dir: Path) -> None:
+    audio = tmp_path / "c.m4a"
+    audio.write_bytes(b"not really audio")
+    calls: list[Path] = []
+
+    def _probe(path: Path) -> float:
+        calls.append(path)
+        return 12.5
+
+    assert audio_analysis.audio_duration(audio, _probe) == 12.5
+    audio_analysis._memory.clear()
+    assert audio_analysis.audio_duration(audio, _probe) == 12.5
+    assert len(calls) == 1
+
+
+def test_streamed_wav_header_falls_back_to_probe(tmp_path: Path, cache_dir: Path) -> None:
+    audio = _write_wav(tmp_path / "d.wav", [(0.5, 0.5)])
+    raw = bytearray(audio.read_bytes())
+    data_at = raw.index(b"data")
+    raw[data_at + 4 : data_at + 8] = b"\xff\xff\xff\xff"  # ffmpeg 管道输出的未知长度
+    audio.write_bytes(bytes(raw))
+
+    assert audio_analysis.audio_duration(audio, lambda _path: 0.5) == pytest.approx(0.5)
+    audio_analysis._memory.clear()
+    assert audio_analysis.audio_duration(audio) == pytest.approx(0.5)
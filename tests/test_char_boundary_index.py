@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import bisect
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import pytest
+
+from onepass.text_index import CharBoundaryIndex
+
+
+def _scan_word_range(char_range, char_map):
+    """Linear reference kept from the former ``_char_range_to_word_range``."""
+
+    start_char, end_char = char_range
+    if start_char >= end_char:
+        return None
+    start_idx = None
+    end_idx = None
+    for idx, (w_start, w_end) in enumerate(char_map):
+        if start_idx is None and start_char < w_end:
+            start_idx = idx
+        if w_start < end_char:
+            end_idx = idx
+        if w_end >= end_char and start_idx is not None:
+            break
+    if start_idx is None or end_idx is None:
+        return None
+    return start_idx, end_idx
+
+
+def _scan_char_to_token(char_boundaries, pos, right=False):
+    if not char_boundaries:
+        return 0
+    if right:
+        idx = bisect.bisect_left(char_boundaries, pos)
+    else:
+        idx = bisect.bisect_right(char_boundaries, pos) - 1
+    return max(0, min(idx, len(char_boundaries) - 2))
+
+
+def _random_char_map(rng: random.Random, count: int) -> list[tuple[int, int]]:
+    char_map = []
+    cursor = 0
+    for _ in range(count):
+        width = rng.choice([0, 1, 1, 2, 3])
+        char_map.append((cursor, cursor + width))
+        cursor += width
+    return char_map
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_word_range_matches_linear_scan(seed: int) -> None:
+    rng = random.Random(seed)
+    char_map = _random_char_map(rng, rng.randint(0, 40))
+    index = CharBoundaryIndex.from_char_map(char_map)
+    total = char_map[-1][1] if char_map else 0
+    ranges = [(a, b) for a in range(-1, total + 3) for b in range(-1, total + 3)]
+    expected = [_scan_word_range(span, char_map) for span in ranges]
+    assert [index.word_range(a, b) for a, b in ranges] == expected
+    assert index.word_ranges(ranges) == expected
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_token_lookups_match_boundary_bisect(seed: int) -> None:
+    rng = random.Random(100 + seed)
+    char_map = _random_char_map(rng, rng.randint(1, 30))
+    boundaries = [0] + [end for _, end in char_map]
+    index = CharBoundaryIndex(boundaries)
+    for pos in range(-2, boundaries[-1] + 3):
+        assert index.token_at(pos) == _scan_char_to_token(boundaries, pos)
+        assert index.token_at(pos, right=True) == _scan_char_to_token(boundaries, pos, right=True)
+        assert min(index.token_end(pos), len(char_map)) == min(bisect.bisect_left(boundaries, pos), len(char_map))
+
+
+def test_from_char_map_rejects_gaps() -> None:
+    with pytest.raises(ValueError):
+        CharBoundaryIndex.from_char_map([(0, 2), (3, 4)])
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from onepass.utils import deadline as deadline_mod
+from onepass.utils.deadline import Deadline
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.reads = 0
+
+    def monotonic(self) -> float:
+        self.reads += 1
+        return self.now
+
+
+def _poll(budget: Deadline, counter: int) -> bool:
+    return not (counter & budget.mask) and budget.expired()
+
+
+def test_deadline_without_limit_never_expires() -> None:
+    budget = Deadline.after(None)
+    assert not budget
+    assert not any(_poll(budget, idx) for idx in range(10000))
+    assert budget.remaining() is None
+    assert not Deadline.after(0)
+
+
+def test_deadline_amortises_clock_reads_and_stays_expired(monkeypatch) -> None:
+    clock = _FakeClock()
+    monkeypatch.setattr(deadline_mod, "time", clock)
+    budget = Deadline(clock.now + 1.0, interval=0.01, max_mask=255)
+    reads_before = clock.reads
+    for idx in range(10000):
+        assert not _poll(budget, idx)
+    # 时钟未前进时掩码扩大，读钟次数远少于迭代次数
+    assert clock.reads - reads_before < 100
+    clock.now += 2.0
+    polls = 0
+    while not _poll(budget, 10000 + polls):
+        polls += 1
+    assert polls <= 256
+    assert budget.expired() and budget.check_now()
+    assert budget.remaining() == 0.0
+
+
+def test_deadline_shrinks_mask_for_slow_iterations(monkeypatch) -> None:
+    clock = _FakeClock()
+    monkeypatch.setattr(deadline_mod, "time", clock)
+    budget = Deadline(clock.now + 10.0, interval=0.01, max_mask=1023)
+    for idx in range(4000):
+        _poll(budget, idx)
+    fast_mask = budget.mask
+    # 进入更慢的循环前重置掩码
+    budget.check_now()
+    for idx in range(200):
+        # 每次迭代耗时 5ms：掩码应收敛到每 1-2 次迭代读一次钟
+        clock.now += 0.005
+        _poll(budget, idx)
+    assert fast_mask == 1023
+    assert budget.mask <= 1
+    assert not budget.expired()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from scripts.edl_to_ffmpeg import build_xfade_graph, plan_slice_groups, slice_all
+
+
+def test_plan_groups_nearby_intervals() -> None:
+    intervals = [(0.0, 1.0), (1.2, 2.0), (2.001, 3.0), (10.0, 11.0), (11.5, 12.0)]
+    assert plan_slice_groups(intervals, 0.5) == [[0, 1], [2], [3, 4]]
+    assert plan_slice_groups(intervals, 0.0) == [[0], [1], [2], [3], [4]]
+
+
+def test_xfade_graph_is_balanced_tree() -> None:
+    graph, label = build_xfade_graph(5, 0.015)
+    parts = graph.split(";")
+    assert len(parts) == 4
+    assert parts[0] == "[0:a][1:a]acrossfade=d=0.015[xf0_0]"
+    assert parts[1] == "[2:a][3:a]acrossfade=d=0.015[xf0_1]"
+    assert parts[2] == "[xf0_0][xf0_1]acrossfade=d=0.015[xf1_0]"
+    assert parts[3] == "[xf1_0][4:a]acrossfade=d=0.015[xf2_0]"
+    assert label == "[xf2_0]"
+    graph, _ = build_xfade_graph(1024, 0.015)
+    assert "[xf9_0]" in graph and "[xf10_0]" not in graph
+
+
+def test_slice_all_dry_run_uses_segment_muxer(tmp_path: Path, capsys) -> None:
+    intervals = [(1.0, 2.0), (2.5, 3.0), (9.0, 9.5)]
+    paths = slice_all("ffmpeg", Path("in.wav"), intervals, tmp_path, jobs=4, segment_gap=1.0, dry_run=True)
+    assert [path.name for path in paths] == ["group_0000_0000.wav", "group_0000_0002.wav", "part_0002.wav"]
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert len(lines) == 2
+    assert "-segment_times 1.000000,1.500000" in lines[0]
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import math
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from onepass.utils import lev
+from onepass.utils.lev import bounded_ratio, levenshtein_within
+
+
+def _reference_ratio(left: str, right: str, max_ratio: float) -> float:
+    """match_core 旧版全矩阵实现，作为行为基线。"""
+
+    if not left and not right:
+        return 0.0
+    if not left or not right:
+        return 1.0
+    n, m = len(left), len(right)
+    limit = int(math.ceil(max(n, m) * max(0.0, max_ratio))) + 1
+    prev = list(range(m + 1))
+    for i in range(1, n + 1):
+        current = [i] + [0] * m
+        min_row = current[0]
+        for j in range(1, m + 1):
+            cost = 0 if left[i - 1] == right[j - 1] else 1
+            current[j] = min(prev[j] + 1, current[j - 1] + 1, prev[j - 1] + cost)
+            min_row = min(min_row, current[j])
+        if limit > 0 and min_row > limit:
+            return max_ratio + 1.0
+        prev = current
+    return prev[m] / max(n, m)
+
+
+def _full_distance(left: str, right: str) -> int:
+    prev = list(range(len(right) + 1))
+    for i, lc in enumerate(left, 1):
+        current = [i]
+        for j, rc in enumerate(right, 1):
+            current.append(min(prev[j] + 1, current[j - 1] + 1, prev[j - 1] + (lc != rc)))
+        prev = current
+    return prev[-1]
+
+
+def _random_pairs(seed: int, count: int):
+    rng = random.Random(seed)
+    for _ in range(count):
+        left = "".join(rng.choice("甲乙丙丁a") for _ in range(rng.randint(0, 70)))
+        right = list(left)
+        for _ in range(rng.randint(0, 8)):
+            op = rng.random()
+            pos = rng.randint(0, len(right))
+            if op < 0.4 and right:
+                right[min(pos, len(right) - 1)] = rng.choice("甲乙丙丁a")
+            elif op < 0.7:
+                right.insert(pos, rng.choice("甲乙丙丁a"))
+            elif right:
+                del right[min(pos, len(right) - 1)]
+        if rng.random() < 0.2:
+            right = [rng.choice("甲乙丙丁a") for _ in range(rng.randint(0, 70))]
+        yield left, "".join(right)
+
+
+def _accepts(value: float, max_ratio: float) -> bool:
+    return value <= max_ratio
+
+
+def test_myers_kernel_matches_full_distance() -> None:
+    for left, right in _random_pairs(3, 300):
+        if not left or not right:
+            continue
+        exact = _full_distance(left, right)
+        for bound in (0, 2, 5, 40, 200):
+            pattern, text = (left, right) if len(left) >= len(right) else (right, left)
+            got = lev._myers_distance(pattern, text, bound)
+            assert got == (exact if exact <= bound else bound + 1)
+
+
+def test_bounded_ratio_matches_reference_with_and_without_rapidfuzz(monkeypatch) -> None:
+    backends = [lev._RF_LEVENSHTEIN, None] if lev._RF_LEVENSHTEIN is not None else [None]
+    for backend in backends:
+        monkeypatch.setattr(lev, "_RF_LEVENSHTEIN", backend)
+        for left, right in _random_pairs(5, 300):
+            for max_ratio in (0.0, 0.12, 0.25, 0.35, 1.0):
+                expected = _reference_ratio(left, right, max_ratio)
+                actual = bounded_ratio(left, right, max_ratio)
+                assert _accepts(actual, max_ratio) == _accepts(expected, max_ratio)
+                if _accepts(expected, max_ratio):
+                    assert actual == expected
+        assert levenshtein_within("kitten", "sitting", 3) == 3
+        assert levenshtein_within("kitten", "sitting", 2) == 3
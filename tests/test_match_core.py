@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from onepass import match_core
+from onepass.asr_loader import Word
+from onepass.match_core import (
+    align_lines_global,
+    build_token_stream,
+    match_line_to_tokens,
+    match_lines_parallel,
+)
+from onepass.retake_keep_last import compute_retake_keep_last
+from onepass.text_index import QGramIndex, SuffixArrayIndex
+
+_ALPHABET = "甲乙丙丁戊己庚辛壬癸"
+
+
+def _random_tokens(rng: random.Random, count: int) -> list[dict]:
+    tokens = []
+    cursor = 0.0
+    for _ in range(count):
+        text = "".join(rng.choice(_ALPHABET) for _ in range(rng.randint(1, 3)))
+        tokens.append({"text": text, "start": cursor, "end": cursor + 0.3})
+        cursor += 0.35
+    return tokens
+
+
+def test_suffix_array_occurrences_match_bruteforce() -> None:
+    rng = random.Random(7)
+    text = "".join(rng.choice("abc") for _ in range(400))
+    index = SuffixArrayIndex(text)
+    for length in (1, 2, 3, 5):
+        for _ in range(20):
+            start = rng.randrange(0, len(text) - length)
+            pattern = text[start : start + length]
+            expected = [i for i in range(len(text) - length + 1) if text.startswith(pattern, i)]
+            assert index.occurrences(pattern) == expected
+            assert index.count(pattern) == len(expected)
+    assert index.occurrences("zzz") == []
+
+
+def _reference_candidates(text: str, query: str, k: int, limit: int) -> list[int]:
+    max_k = min(max(k, 3), len(text), len(query))
+    hits: dict[int, int] = {}
+    for current_k in range(max_k, 2, -1):
+        for start in range(len(query) - current_k + 1):
+            gram = query[start : start + current_k]
+            for pos in range(len(text) - current_k + 1):
+                if text.startswith(gram, pos):
+                    hits[pos] = hits.get(pos, 0) + 1
+        if hits:
+            break
+    if not hits and text and query:
+        pos = text.find(query[:max_k])
+        if pos >= 0:
+            hits[pos] = 1
+    ordered = sorted(hits.items(), key=lambda item: (-item[1], item[0]))
+    return [pos for pos, _ in ordered[:limit]]
+
+
+def test_qgram_index_candidates_match_reference() -> None:
+    rng = random.Random(23)
+    for _ in range(60):
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 120)))
+        index = QGramIndex(text)
+        for _ in range(5):
+            query = "".join(rng.choice("abcde") for _ in range(rng.randint(0, 10)))
+            k = rng.randint(1, 7)
+            limit = rng.randint(1, 12)
+            assert index.candidates(query, k, limit) == _reference_candidates(text, query, k, limit)
+            if query:
+                assert index.occurrences(query) == SuffixArrayIndex(text).occurrences(query)
+    index = QGramIndex("abcabcabc")
+    index.candidates("abcab", 4, 5)
+    index.candidates("bca", 3, 5)
+    assert sorted(index._tables) == [3, 4]
+
+
+def test_anchor_index_preserves_match_windows() -> None:
+    rng = random.Random(11)
+    tokens = _random_tokens(rng, 300)
+    plain = build_token_stream(tokens, None)
+    indexed = build_token_stream(tokens, None, build_index=True)
+    assert indexed.anchor_index is not None
+    text = plain.canonical_text
+    for _ in range(40):
+        start = rng.randrange(0, len(text) - 12)
+        line = list(text[start : start + rng.randint(6, 12)])
+        if rng.random() < 0.5:
+            line[rng.randrange(len(line))] = rng.choice(_ALPHABET)
+        query = "".join(line)
+        for prefer_latest in (True, False):
+            plain_meta: dict = {}
+            indexed_meta: dict = {}
+            expected = match_line_to_tokens(
+                query,
+                plain,
+                None,
+                min_anchor_ngram=3,
+                max_windows=8,
+                match_timeout=None,
+                prefer_latest=prefer_latest,
+                debug_details=plain_meta,
+            )
+            actual = match_line_to_tokens(
+                query,
+                indexed,
+                None,
+                min_anchor_ngram=3,
+                max_windows=8,
+                match_timeout=None,
+                prefer_latest=prefer_latest,
+                debug_details=indexed_meta,
+            )
+            assert actual == expected
+            assert indexed_meta == plain_meta
+
+
+def test_qgram_prefilter_keeps_results_and_reports_pruning(monkeypatch) -> None:
+    if match_core.np is None:
+        return
+    rng = random.Random(17)
+    tokens = _random_tokens(rng, 400)
+    text = build_token_stream(tokens, None).canonical_text
+    queries = []
+    for _ in range(30):
+        start = rng.randrange(0, len(text) - 16)
+        line = list(text[start : start + rng.randint(8, 16)])
+        if rng.random() < 0.5:
+            line[rng.randrange(len(line))] = rng.choice(_ALPHABET)
+        queries.append("".join(line))
+    filtered: list[tuple[object, dict]] = []
+    for query in queries:
+        meta: dict = {}
+        stream = build_token_stream(tokens, None)
+        filtered.append((match_line_to_tokens(query, stream, None, min_anchor_ngram=3, match_timeout=None, debug_details=meta), meta))
+    monkeypatch.setattr(match_core, "np", None)
+    pruned_total = 0
+    for query, (expected, filtered_meta) in zip(queries, filtered):
+        meta = {}
+        stream = build_token_stream(tokens, None)
+        actual = match_line_to_tokens(query, stream, None, min_anchor_ngram=3, match_timeout=None, debug_details=meta)
+        assert actual == expected
+        assert meta["pruned_windows"] == 0
+        pruned_total += filtered_meta.pop("pruned_windows")
+        meta.pop("pruned_windows")
+        assert meta == filtered_meta
+    assert pruned_total > 0
+
+
+def _retake_script(seed: int) -> tuple[list[str], list[tuple[int, float, float]], list[dict]]:
+    rng = random.Random(seed)
+    alphabet = _ALPHABET + "子丑寅卯辰巳午未申酉戌亥"
+    lines = ["".join(rng.choice(alphabet) for _ in range(rng.randint(12, 24))) for _ in range(12)]
+    # 第 2-3 行、5-7 行与最后一行各重录一次
+    order = [0, 1, 2, 3, 2, 3, 4, 5, 6, 7, 5, 6, 7, 8, 9, 10, 11, 11]
+    readings: list[tuple[int, float, float]] = []
+    tokens: list[dict] = []
+    cursor = 0.0
+    for line_idx in order:
+        start = cursor
+        for ch in lines[line_idx]:
+            tokens.append({"text": ch, "start": cursor, "end": cursor + 0.2})
+            cursor += 0.25
+        readings.append((line_idx, start, cursor - 0.05))
+        cursor += 1.0
+    return lines, readings, tokens
+
+
+def test_global_alignment_prefers_last_reading_and_lists_retakes() -> None:
+    lines, readings, tokens = _retake_script(5)
+    stream = build_token_stream(tokens, None)
+    results = align_lines_global(lines, stream, None, min_anchor_ngram=6)
+    for line_idx, result in enumerate(results):
+        expected = [(start, end) for idx, start, end in readings if idx == line_idx]
+        got = [(match.time_start, match.time_end) for match in result.matches]
+        assert got == expected
+        assert result.matches[-1].method == "global-chain"
+        assert all(match.method == "global-retake" for match in result.matches[:-1])
+
+
+def test_compute_retake_global_engine_keeps_every_line(tmp_path: Path) -> None:
+    lines, readings, tokens = _retake_script(5)
+    script = tmp_path / "demo.align.txt"
+    script.write_text("\n".join(lines), encoding="utf-8")
+    words = [Word(text=tok["text"], start=tok["start"], end=tok["end"]) for tok in tokens]
+    result = compute_retake_keep_last(
+        words,
+        script,
+        align_engine="global",
+        pause_align=False,
+        silence_ranges=[],
+    )
+    assert result.stats["match_engine"] == "anchor-chain"
+    assert result.stats["unmatched_lines"] == 0
+    last_reading = {idx: (start, end) for idx, start, end in readings}
+    assert [keep.line_no for keep in result.keeps] == list(range(1, len(lines) + 1))
+    for keep in result.keeps:
+        start, end = last_reading[keep.line_no - 1]
+        assert abs(keep.start - start) < 0.2 and abs(keep.end - end) < 0.2
+
+
+def test_parallel_line_matching_matches_sequential(tmp_path: Path) -> None:
+    rng = random.Random(29)
+    tokens = _random_tokens(rng, 300)
+    stream = build_token_stream(tokens, None, build_index=True)
+    text = stream.canonical_text
+    items = []
+    for idx in range(24):
+        start = rng.randrange(0, len(text) - 12)
+        options = {"min_anchor_ngram": 3, "max_windows": 8, "match_timeout": None}
+        items.append((idx, text[start : start + rng.randint(6, 12)], options))
+    merged = match_lines_parallel(items, stream, None, workers=3)
+    assert sorted(merged) == list(range(24))
+    for idx, line, options in items:
+        details: dict = {}
+        expected = match_line_to_tokens(line, stream, None, debug_details=details, **options)
+        assert merged[idx] == (expected, details)
+
+    lines, _, script_tokens = _retake_script(7)
+    script = tmp_path / "demo.align.txt"
+    script.write_text("\n".join(lines), encoding="utf-8")
+    words = [Word(text=tok["text"], start=tok["start"], end=tok["end"]) for tok in script_tokens]
+    serial = compute_retake_keep_last(words, script, pause_align=False, silence_ranges=[])
+    parallel = compute_retake_keep_last(words, script, pause_align=False, silence_ranges=[], line_workers=2)
+    assert parallel.keeps == serial.keeps
+    assert parallel.edl_keep_segments == serial.edl_keep_segments
+
+
+def test_parallel_line_matching_spawn_and_concurrent_calls(monkeypatch) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    rng = random.Random(31)
+    streams = [build_token_stream(_random_tokens(rng, 120), None, build_index=True) for _ in range(2)]
+    options = {"min_anchor_ngram": 3, "max_windows": 8, "match_timeout": None}
+    jobs = [[(idx, stream.canonical_text[idx * 5 : idx * 5 + 8], options) for idx in range(6)] for stream in streams]
+    expected = [
+        {idx: match_line_to_tokens(line, stream, None, debug_details={}, **opts) for idx, line, opts in items}
+        for stream, items in zip(streams, jobs)
+    ]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        merged = list(pool.map(lambda pair: match_lines_parallel(pair[1], pair[0], None, workers=2), zip(streams, jobs)))
+    for got, want in zip(merged, expected):
+        assert {idx: result for idx, (result, _) in got.items()} == want
+    assert not match_core._FORK_SHARED
+
+    monkeypatch.setattr(match_core.sys, "platform", "darwin")
+    spawned = match_lines_parallel(jobs[0][:2], streams[0], None, workers=2)
+    assert {idx: result for idx, (result, _) in spawned.items()} == {idx: expected[0][idx] for idx in (0, 1)}
+
+
+def test_stage_degradation_rematches_only_unresolved_lines(tmp_path: Path, monkeypatch) -> None:
+    from onepass import retake_keep_last
+
+    lines, _, script_tokens = _retake_script(7)
+    script = tmp_path / "demo.align.txt"
+    script.write_text("\n".join(lines), encoding="utf-8")
+    words = [Word(text=tok["text"], start=tok["start"], end=tok["end"]) for tok in script_tokens]
+
+    original = retake_keep_last.match_line_to_tokens
+    calls: list[str] = []
+
+    def _flaky(line, *args, **kwargs):
+        calls.append(line)
+        # 第 5 行在首个阶段超时，触发降级
+        if len(calls) == 5:
+            raise TimeoutError("simulated")
+        return original(line, *args, **kwargs)
+
+    monkeypatch.setattr(retake_keep_last, "match_line_to_tokens", _flaky)
+    degraded = compute_retake_keep_last(words, script, pause_align=False, silence_ranges=[])
+    line_stage = degraded.stats["line_stage"]
+    base_lines = {int(idx) for idx, label in line_stage.items() if label == "base"}
+    assert base_lines and base_lines <= {1, 2, 3, 4}
+    # 降级后只重匹配首阶段未命中或超时的行，已命中行直接复用
+    retried = [lines.index(line) + 1 for line in calls[5:]]
+    assert retried == [idx for idx in range(1, len(lines) + 1) if idx not in base_lines]
+    assert {line_stage[str(idx)] for idx in retried} == {"stage-1"}
+    assert degraded.stats["stage_resolved"] == {"base": len(base_lines), "stage-1": len(retried)}
+    assert degraded.stats["degrade_history"][0]["reason"] == "timeout"
+
+
+def test_anytime_schedule_shares_budget_and_keeps_best_so_far(tmp_path: Path, monkeypatch) -> None:
+    import time
+
+    from onepass import retake_keep_last
+
+    lines, _, script_tokens = _retake_script(7)
+    # 后半段行做单字替换，精确定位失败，交给细化阶段
+    edited = [line if idx < 6 else line[:3] + "Ｘ" + line[4:] for idx, line in enumerate(lines)]
+    script = tmp_path / "demo.align.txt"
+    script.write_text("\n".join(edited), encoding="utf-8")
+    words = [Word(text=tok["text"], start=tok["start"], end=tok["end"]) for tok in script_tokens]
+
+    original = retake_keep_last.match_line_to_tokens
+    slow_line = retake_keep_last.normalize_for_align(edited[6])
+
+    def _pathological(line, *args, **kwargs):
+        if line == slow_line:
+            # 病态行：耗尽分到的时间片后以超时失败
+            time.sleep(kwargs["match_timeout"])
+            kwargs["debug_details"].update({"failure_reason": "time-window", "timed_out": True})
+            return None
+        return original(line, *args, **kwargs)
+
+    monkeypatch.setattr(retake_keep_last, "match_line_to_tokens", _pathological)
+    result = compute_retake_keep_last(
+        words,
+        script,
+        pause_align=False,
+        silence_ranges=[],
+        match_schedule="anytime",
+        compute_timeout_sec=1.0,
+    )
+    anytime = result.stats["anytime"]
+    assert anytime["exact_resolved"] == 6
+    assert anytime["refine_resolved"] == len(lines) - 7
+    assert result.stats["line_stage"].get("7") is None
+    assert result.stats["unmatched_lines"] == 1
+    assert result.stats["fallback_used"] is False
+    assert set(result.stats["phase_timings"]) == {"exact_sec", "refine_sec", "assemble_sec"}
+    assert sorted(map(int, result.stats["line_stage"])) == [idx for idx in range(1, len(lines) + 1) if idx != 7]
+    assert 7 not in {keep.line_no for keep in result.keeps}
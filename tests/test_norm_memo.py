@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from onepass._legacy_text_norm import normalize_for_align
+from onepass.asr_loader import Word
+from onepass.match_core import _normalize_token_text
+from onepass.norm_memo import NormalizationMemo, memo_snapshot, memo_stats
+from onepass.retake_keep_last import compute_retake_keep_last
+
+
+def test_memo_counts_hits_and_evicts_least_recent() -> None:
+    calls: list[str] = []
+
+    def _upper(text: str) -> str:
+        calls.append(text)
+        return text.upper()
+
+    memo = NormalizationMemo("test-upper", _upper, maxsize=2, max_text_len=8)
+    assert [memo("a"), memo("b"), memo("a"), memo("c"), memo("b")] == ["A", "B", "A", "C", "B"]
+    assert calls == ["a", "b", "c", "b"]
+    assert (memo.hits, memo.misses, len(memo)) == (1, 4, 2)
+    assert memo("x" * 9) == "X" * 9  # 超长文本直接计算，不计入缓存
+    assert (memo.hits, memo.misses, len(memo)) == (1, 4, 2)
+
+
+def test_memo_separates_alias_maps() -> None:
+    first = {"ms": "毫秒"}
+    second = {"ms": "ms"}
+    assert _normalize_token_text("ms", first) == _normalize_token_text.func("ms", first)
+    assert _normalize_token_text("ms", second) == _normalize_token_text.func("ms", second)
+    assert _normalize_token_text("ms", None) == _normalize_token_text.func("ms", None)
+    assert _normalize_token_text("ms", first) != _normalize_token_text("ms", second)
+
+
+def test_memo_bounds_alias_references_and_wraps_func() -> None:
+    def _tag(text: str, alias: dict[str, str] | None) -> str:
+        """Tag text with its alias size."""
+
+        return f"{text}:{len(alias or {})}"
+
+    memo = NormalizationMemo("test-alias", _tag, maxsize=1024)
+    maps = [{str(idx): "x" for idx in range(idx + 1)} for idx in range(40)]
+    for alias in maps:
+        assert memo("a", alias) == _tag("a", alias)
+    assert len(memo._aliases) <= 16
+    assert len(memo) <= 16
+    assert memo("a", maps[-1]) == "a:40" and memo.hits == 1
+    assert memo.__name__ == "_tag" and memo.__doc__ == "Tag text with its alias size."
+    assert memo.__wrapped__ is _tag
+
+
+def test_memoized_normalize_for_align_matches_plain() -> None:
+    samples = ["Hello，World!", "  甲乙 丙…丁  ", "", "Ａｂｃ​"]
+    for text in samples * 2:
+        assert normalize_for_align(text) == normalize_for_align.func(text)
+
+
+def test_compute_reports_memo_stats(tmp_path: Path) -> None:
+    lines = ["甲乙丙丁戊己庚辛", "子丑寅卯辰巳午未", "甲乙丙丁戊己庚辛"]
+    words = []
+    cursor = 0.0
+    for line in lines:
+        for ch in line:
+            words.append(Word(text=ch, start=cursor, end=cursor + 0.2))
+            cursor += 0.25
+        cursor += 0.6
+    script = tmp_path / "demo.txt"
+    script.write_text("\n".join(lines), encoding="utf-8")
+    before = memo_snapshot()
+    result = compute_retake_keep_last(words, script, pause_align=False, silence_ranges=[])
+    memo = result.stats["norm_memo"]
+    assert {"align", "token", "query", "units"} <= set(memo)
+    assert memo["align"]["hits"] > 0
+    assert all(0.0 <= entry["hit_rate"] <= 1.0 for entry in memo.values())
+    assert memo_stats(before)["align"]["hits"] >= memo["align"]["hits"]
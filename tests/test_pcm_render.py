@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import struct
+import sys
+import wave
+from array import array
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from onepass.edl_renderer import EDLDoc, EDLSegment, render_audio
+from onepass.pcm_render import read_wav_layout, render_pcm
+
+RATE = 1000
+
+
+def _write_ramp(path: Path, frames: int, channels: int = 1) -> Path:
+    """第 i 帧各声道的采样值均为 i，便于核对拷贝的样本区间。"""
+
+    with wave.open(str(path), "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(RATE)
+        writer.writeframes(array("h", [i for i in range(frames) for _ in range(channels)]).tobytes())
+    return path
+
+
+def _read_samples(path: Path) -> list[int]:
+    with wave.open(str(path), "rb") as reader:
+        return list(array("h", reader.readframes(reader.getnframes())))
+
+
+def test_render_copies_exact_sample_ranges(tmp_path: Path) -> None:
+    source = _write_ramp(tmp_path / "src.wav", 2000, channels=2)
+    output = render_pcm(source, [(0.1, 0.2), (0.5, 0.55), (0.55, 0.6), (1.9, 5.0)], tmp_path / "out.wav")
+    samples = _read_samples(output)
+    expected = list(range(100, 200)) + list(range(500, 600)) + list(range(1900, 2000))
+    assert samples[0::2] == expected
+    assert samples[1::2] == expected
+    assert not list(tmp_path.glob(".*"))  # 临时文件已清理
+
+
+def test_crossfade_overlaps_each_join(tmp_path: Path) -> None:
+    source = _write_ramp(tmp_path / "src.wav", 1000)
+    output = render_pcm(source, [(0.0, 0.1), (0.5, 0.6)], tmp_path / "xf.wav", crossfade_ms=10)
+    samples = _read_samples(output)
+    assert len(samples) == 190
+    assert samples[:90] == list(range(90))
+    assert samples[100:] == list(range(510, 600))
+    fade = samples[90:100]
+    assert fade[0] > 90 and fade[-1] < 509 and fade == sorted(fade)
+
+
+def test_write_failure_propagates_original_error(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    source = _write_ramp(tmp_path / "src.wav", 1000)
+    original = wave.Wave_write.writeframesraw
+    calls = [0]
+
+    def _flaky(self, data):
+        calls[0] += 1
+        if calls[0] == 3:
+            raise OSError("disk full")
+        return original(self, data)
+
+    monkeypatch.setattr(wave.Wave_write, "writeframesraw", _flaky)
+    with pytest.raises(OSError, match="disk full"):
+        render_pcm(source, [(0.0, 0.1), (0.3, 0.4), (0.5, 0.6)], tmp_path / "out.wav", crossfade_ms=5)
+    assert not (tmp_path / "out.wav").exists()
+
+
+def test_layout_rejects_non_pcm_and_reads_extensible(tmp_path: Path) -> None:
+    float_wav = tmp_path / "float.wav"
+    fmt = struct.pack("<HHIIHH", 3, 1, RATE, RATE * 4, 4, 32)
+    data = b"\0" * 16
+    float_wav.write_bytes(
+        b"RIFF" + struct.pack("<I", 4 + 8 + len(fmt) + 8 + len(data)) + b"WAVE"
+        + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data
+    )
+    assert read_wav_layout(float_wav) is None
+
+    ext = tmp_path / "ext.wav"
+    fmt = struct.pack("<HHIIHHHHI", 0xFFFE, 2, RATE, RATE * 4, 4, 16, 22, 16, 3) + struct.pack("<H", 1) + b"\0" * 14
+    data = b"\1\0" * 8
+    ext.write_bytes(
+        b"RIFF" + struct.pack("<I", 4 + 8 + len(fmt) + 8 + len(data)) + b"WAVE"
+        + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", 0xFFFFFFFF) + data
+    )
+    layout = read_wav_layout(ext)
+    assert layout is not None
+    assert (layout.channels, layout.sample_width, layout.frames) == (2, 2, 4)
+
+
+def test_render_audio_pcm_engine(tmp_path: Path) -> None:
+    source = _write_ramp(tmp_path / "demo.wav", 3000)
+    doc = EDLDoc(
+        source_audio=str(source),
+        segments=[EDLSegment(0.0, 1.0, "drop"), EDLSegment(2.0, 2.5, "drop")],
+    )
+    output = render_audio(
+        tmp_path / "demo.edl.json",
+        tmp_path,
+        tmp_path / "clean",
+        None,
+        None,
+        edl_doc=doc,
+        source_audio_path=source,
+        engine="pcm",
+    )
+    assert output.name == "demo.clean.wav"
+    assert _read_samples(output) == list(range(1000, 2000)) + list(range(2500, 3000))
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import copy
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Sequence
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from onepass.debug_utils import DebugSink  # noqa: E402
+from onepass.retake_keep_last import _refine_segments, _snap_value  # noqa: E402
+
+
+def _reference_refine_segments(
+    keep_items: Sequence[object],
+    *,
+    audio_duration: float,
+    pause_intervals: Sequence[tuple[float, float]],
+    pause_snap_limit: float,
+    pad_before: float,
+    pad_after: float,
+    merge_gap_sec: float,
+    min_segment_sec: float,
+    pause_align: bool,
+    debug_label: str | None,
+) -> tuple[set[int], list[tuple[float, float]], dict[str, object], list[dict]]:
+    """原逐段合并实现（列表删除 + 字典调试行），作为流式版本的基准。"""
+
+    # 预处理参数，确保均为非负
+    pad_before = max(0.0, pad_before)
+    pad_after = max(0.0, pad_after)
+    merge_gap_sec = max(0.0, merge_gap_sec)
+    min_segment_sec = max(0.0, min_segment_sec)
+    pause_candidates: list[float] = []
+    for start, end in pause_intervals:
+        pause_candidates.extend([start, end])
+    pause_candidates = sorted(set(pause_candidates))
+    pause_used = pause_align and bool(pause_candidates)
+    debug_rows: dict[int, dict] = {}
+    segments: list[dict] = []
+    pause_snaps = 0
+    too_short_dropped = 0
+    for index, item in enumerate(keep_items):
+        orig_start = getattr(item, "start", 0.0)
+        orig_end = getattr(item, "end", 0.0)
+        if orig_end <= orig_start:
+            row = {
+                "item": debug_label or "",
+                "index": index,
+                "orig_start": orig_start,
+                "orig_end": orig_end,
+                "snap_start": orig_start,
+                "snap_end": orig_end,
+                "pad_start": orig_start,
+                "pad_end": orig_end,
+                "final_start": None,
+                "final_end": None,
+                "snap_start_used": False,
+                "snap_end_used": False,
+                "merged_into": "",
+                "dropped": True,
+                "notes": "invalid_source",
+            }
+            debug_rows[index] = row
+            continue
+        snapped_start = orig_start
+        snapped_end = orig_end
+        snap_start_used = False
+        snap_end_used = False
+        if pause_used:
+            snapped = _snap_value(snapped_start, pause_candidates, pause_snap_limit)
+            if snapped != snapped_start and snapped < orig_end:
+                snapped_start = snapped
+                snap_start_used = True
+                pause_snaps += 1
+            snapped = _snap_value(snapped_end, pause_candidates, pause_snap_limit)
+            if snapped != snapped_end and snapped > snapped_start:
+                snapped_end = snapped
+                snap_end_used = True
+                pause_snaps += 1
+        padded_start = max(0.0, snapped_start - pad_before)
+        padded_end = min(audio_duration, snapped_end + pad_after)
+        if padded_end - padded_start <= 1e-6:
+            row = {
+                "item": debug_label or "",
+                "index": index,
+                "orig_start": orig_start,
+                "orig_end": orig_end,
+                "snap_start": snapped_start,
+                "snap_end": snapped_end,
+                "pad_start": padded_start,
+                "pad_end": padded_end,
+                "final_start": None,
+                "final_end": None,
+                "snap_start_used": snap_start_used,
+                "snap_end_used": snap_end_used,
+                "merged_into": "",
+                "dropped": True,
+                "notes": "clamped_to_zero",
+            }
+            debug_rows[index] = row
+            too_short_dropped += 1
+            continue
+        row = {
+            "item": debug_label or "",
+            "index": index,
+            "orig_start": orig_start,
+            "orig_end": orig_end,
+            "snap_start": snapped_start,
+            "snap_end": snapped_end,
+            "pad_start": padded_start,
+            "pad_end": padded_end,
+            "final_start": None,
+            "final_end": None,
+            "snap_start_used": snap_start_used,
+            "snap_end_used": snap_end_used,
+            "merged_into": "",
+            "dropped": False,
+            "notes": "",
+        }
+        debug_rows[index] = row
+        segments.append(
+            {
+                "start": padded_start,
+                "end": padded_end,
+                "indices": [index],
+            }
+        )
+    segments.sort(key=lambda item: item["start"])
+    auto_merged = 0
+    merged_segments: list[dict] = []
+    for segment in segments:
+        if not merged_segments:
+            merged_segments.append(segment)
+            continue
+        prev = merged_segments[-1]
+        gap = segment["start"] - prev["end"]
+        if gap <= merge_gap_sec:
+            prev["end"] = max(prev["end"], segment["end"])
+            prev_indices = prev["indices"]
+            for idx in segment["indices"]:
+                if idx not in prev_indices:
+                    prev_indices.append(idx)
+                debug_rows[idx]["merged_into"] = prev_indices[0]
+                note = debug_rows[idx]["notes"]
+                debug_rows[idx]["notes"] = ";".join(filter(None, [note, "merge_gap"]))
+            auto_merged += 1
+        else:
+            merged_segments.append(segment)
+
+    refined_segments = merged_segments
+    i = 0
+    while i < len(refined_segments):
+        segment = refined_segments[i]
+        duration = segment["end"] - segment["start"]
+        if duration >= min_segment_sec or len(refined_segments) == 1:
+            i += 1
+            continue
+        if i > 0:
+            prev = refined_segments[i - 1]
+            prev["end"] = max(prev["end"], segment["end"])
+            for idx in segment["indices"]:
+                if idx not in prev["indices"]:
+                    prev["indices"].append(idx)
+                debug_rows[idx]["merged_into"] = prev["indices"][0]
+                note = debug_rows[idx]["notes"]
+                debug_rows[idx]["notes"] = ";".join(filter(None, [note, "merge_short_prev"]))
+            auto_merged += 1
+            refined_segments.pop(i)
+            continue
+        if i + 1 < len(refined_segments):
+            nxt = refined_segments[i + 1]
+            nxt["start"] = min(nxt["start"], segment["start"])
+            nxt_indices = nxt["indices"]
+            for idx in segment["indices"]:
+                if idx not in nxt_indices:
+                    nxt_indices.insert(0, idx)
+                debug_rows[idx]["merged_into"] = nxt_indices[0]
+                note = debug_rows[idx]["notes"]
+                debug_rows[idx]["notes"] = ";".join(filter(None, [note, "merge_short_next"]))
+            auto_merged += 1
+            refined_segments.pop(i)
+            continue
+        for idx in segment["indices"]:
+            debug_rows[idx]["dropped"] = True
+            note = debug_rows[idx]["notes"]
+            debug_rows[idx]["notes"] = ";".join(filter(None, [note, "dropped_short"]))
+        too_short_dropped += len(segment["indices"])
+        refined_segments.pop(i)
+    active_indices: set[int] = set()
+    final_segments: list[tuple[float, float]] = []
+    for segment in refined_segments:
+        start = max(0.0, min(audio_duration, segment["start"]))
+        end = max(0.0, min(audio_duration, segment["end"]))
+        if end - start <= 1e-6:
+            for idx in segment["indices"]:
+                debug_rows[idx]["dropped"] = True
+                note = debug_rows[idx]["notes"]
+                debug_rows[idx]["notes"] = ";".join(filter(None, [note, "dropped_after_merge"]))
+            too_short_dropped += len(segment["indices"])
+            continue
+        final_segments.append((start, end))
+        unique_indices = []
+        seen: set[int] = set()
+        for idx in segment["indices"]:
+            if idx in seen:
+                continue
+            seen.add(idx)
+            unique_indices.append(idx)
+        segment["indices"] = unique_indices
+        for idx in unique_indices:
+            active_indices.add(idx)
+            debug_rows[idx]["final_start"] = start
+            debug_rows[idx]["final_end"] = end
+            item_obj = keep_items[idx]
+            if hasattr(item_obj, "start") and hasattr(item_obj, "end"):
+                setattr(item_obj, "start", start)
+                setattr(item_obj, "end", end)
+    debug_list = []
+    for idx in range(len(keep_items)):
+        row = debug_rows.get(
+            idx,
+            {
+                "item": debug_label or "",
+                "index": idx,
+                "orig_start": None,
+                "orig_end": None,
+                "snap_start": None,
+                "snap_end": None,
+                "pad_start": None,
+                "pad_end": None,
+                "final_start": None,
+                "final_end": None,
+                "snap_start_used": False,
+                "snap_end_used": False,
+                "merged_into": "",
+                "dropped": True,
+                "notes": "missing",
+            },
+        )
+        debug_list.append(row)
+    stats = {
+        "pause_used": bool(pause_used),
+        "pause_snaps": int(pause_snaps),
+        "auto_merged": int(auto_merged),
+        "too_short_dropped": int(too_short_dropped),
+        "pad_ms": {
+            "before": int(round(pad_before * 1000)),
+            "after": int(round(pad_after * 1000)),
+        },
+    }
+    return active_indices, final_segments, stats, debug_list
+
+
+def _random_keeps(rng: random.Random, count: int) -> list[SimpleNamespace]:
+    keeps = []
+    cursor = 0.0
+    for _ in range(count):
+        cursor += rng.choice([0.0, 0.05, 0.1, 0.3, 0.8, 2.0])
+        length = rng.choice([-0.1, 0.0, 0.02, 0.1, 0.2, 0.5, 1.5])
+        start = round(cursor + rng.uniform(-0.3, 0.3), 3)
+        keeps.append(SimpleNamespace(start=start, end=round(start + length, 3)))
+    return keeps
+
+
+def test_streaming_refine_matches_reference() -> None:
+    rng = random.Random(14)
+    for trial in range(200):
+        keeps = _random_keeps(rng, rng.randint(0, 40))
+        horizon = max([keep.end for keep in keeps] + [1.0])
+        pauses = sorted(
+            (t, t + 0.2) for t in (round(rng.uniform(0.0, horizon), 2) for _ in range(rng.randint(0, 8)))
+        )
+        params = dict(
+            audio_duration=horizon - rng.choice([0.0, 0.5]),
+            pause_intervals=pauses,
+            pause_snap_limit=rng.choice([0.0, 0.2]),
+            pad_before=rng.choice([0.0, 0.05]),
+            pad_after=rng.choice([0.0, 0.1]),
+            merge_gap_sec=rng.choice([0.0, 0.1, 0.4]),
+            min_segment_sec=rng.choice([0.0, 0.3, 1.0, 4.0]),
+            pause_align=rng.random() < 0.5,
+            debug_label="demo",
+        )
+        expected_keeps = copy.deepcopy(keeps)
+        quiet_keeps = copy.deepcopy(keeps)
+        expected = _reference_refine_segments(expected_keeps, **params)
+        sink = DebugSink(["segments"])
+        result = _refine_segments(keeps, debug_sink=sink, **params)
+        assert (*result, sink.rows("segments")) == expected, trial
+        assert keeps == expected_keeps
+        assert _refine_segments(quiet_keeps, **params) == expected[:3]
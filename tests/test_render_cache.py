@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import os
+import sys
+import wave
+from array import array
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from onepass import pcm_render
+from onepass.pcm_render import read_wav_layout, render_pcm
+from onepass.render_cache import RenderChunkCache, source_fingerprint
+
+RATE = 1000
+
+
+def _write_ramp(path: Path, frames: int, channels: int = 1) -> Path:
+    with wave.open(str(path), "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(RATE)
+        writer.writeframes(array("h", [i for i in range(frames) for _ in range(channels)]).tobytes())
+    return path
+
+
+def _read_samples(path: Path) -> list[int]:
+    with wave.open(str(path), "rb") as reader:
+        return list(array("h", reader.readframes(reader.getnframes())))
+
+
+def test_cache_roundtrip_and_prune(tmp_path: Path) -> None:
+    source = _write_ramp(tmp_path / "src.wav", 10)
+    fingerprint = source_fingerprint(source)
+    assert fingerprint and source_fingerprint(tmp_path / "missing.wav") is None
+    cache = RenderChunkCache(tmp_path / "cache", max_bytes=150)
+    first = cache.key(fingerprint, 0, 50, RATE, 1)
+    assert first != cache.key(fingerprint, 0, 50, RATE, 2)
+    assert cache.get(first) is None
+    cache.put(first, b"a" * 100)
+    os.utime(cache.path_for(first), ns=(1, 1))
+    second = cache.key(fingerprint, 50, 100, RATE, 1)
+    cache.put(second, b"b" * 100)
+    assert cache.get(first).read_bytes() == b"a" * 100
+    assert (cache.hits, cache.misses) == (1, 1)
+    os.utime(cache.path_for(second), ns=(1, 1))  # second 成为最久未用
+    assert cache.prune() == 100
+    assert cache.get(second) is None and cache.get(first) is not None
+
+
+def test_rerender_only_decodes_changed_segments(tmp_path: Path, monkeypatch) -> None:
+    source = _write_ramp(tmp_path / "src.wav", 2000)
+    calls: dict[str, list] = {"full": [], "range": []}
+
+    def fake_decode_to_wav(src, target, samplerate, channels, ffmpeg):
+        calls["full"].append(src)
+        _write_ramp(target, 2000, channels=channels)
+        return read_wav_layout(target)
+
+    def fake_decode_range(src, first, last, sample_rate, channels, ffmpeg):
+        calls["range"].append((first, last))
+        return array("h", [i for i in range(first, last) for _ in range(channels)]).tobytes()
+
+    monkeypatch.setattr(pcm_render, "_decode_to_wav", fake_decode_to_wav)
+    monkeypatch.setattr(pcm_render, "_decode_range", fake_decode_range)
+    cache = RenderChunkCache(tmp_path / "cache")
+
+    # 请求双声道，源为单声道，因此需要解码；首次渲染改动面大，整段解码一次
+    output = render_pcm(source, [(0.0, 0.8), (1.0, 1.2)], tmp_path / "a.wav", channels=2, chunk_cache=cache)
+    assert len(calls["full"]) == 1 and not calls["range"]
+    assert _read_samples(output)[0::2] == list(range(800)) + list(range(1000, 1200))
+
+    output = render_pcm(source, [(0.0, 0.8), (1.0, 1.3)], tmp_path / "b.wav", channels=2, chunk_cache=cache)
+    assert len(calls["full"]) == 1
+    assert calls["range"] == [(1000, 1300)]
+    assert cache.hits == 1
+    samples = _read_samples(output)
+    assert samples[0::2] == list(range(800)) + list(range(1000, 1300))
+    assert samples[1::2] == samples[0::2]
+    assert not list(tmp_path.glob(".*"))
+
+
+def test_cached_render_holds_one_chunk_open_at_a_time(tmp_path: Path, monkeypatch) -> None:
+    resource = pytest.importorskip("resource")
+    source = _write_ramp(tmp_path / "src.wav", 4000)
+    keeps = [(idx * 0.02, idx * 0.02 + 0.01) for idx in range(150)]
+
+    def fake_decode_to_wav(src, target, samplerate, channels, ffmpeg):
+        _write_ramp(target, 4000, channels=channels)
+        return read_wav_layout(target)
+
+    monkeypatch.setattr(pcm_render, "_decode_to_wav", fake_decode_to_wav)
+    cache = RenderChunkCache(tmp_path / "cache")
+    render_pcm(source, keeps, tmp_path / "warm.wav", channels=2, chunk_cache=cache)
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    limit = len(os.listdir("/proc/self/fd")) + 40 if os.path.isdir("/proc/self/fd") else 100
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(limit, hard), hard))
+    try:
+        output = render_pcm(source, keeps, tmp_path / "out.wav", channels=2, chunk_cache=cache, crossfade_ms=2)
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    assert cache.hits == 150
+    assert len(_read_samples(output)) == (150 * 10 - 149 * 2) * 2
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import random
 import sys
 from pathlib import Path
 
@@ -7,7 +8,8 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from onepass.dp_path import select_best_path
+from onepass.dp_path import _candidate_value, _gap_penalty, select_best_path
+from onepass import repeat_detect
 from onepass.repeat_detect import RepeatCandidate, cluster_candidates
 from legacy.text_split import smart_split
 
@@ -51,6 +53,56 @@ def test_cluster_candidates_groups_and_ranks() -> None:
     assert clusters[1].candidates[0].candidate_id == 3
 
 
+def _full_distance(left: str, right: str) -> float:
+    n, m = len(left), len(right)
+    prev = list(range(m + 1))
+    for i in range(1, n + 1):
+        current = [i] + [0] * m
+        for j in range(1, m + 1):
+            cost = 0 if left[i - 1] == right[j - 1] else 1
+            current[j] = min(prev[j] + 1, current[j - 1] + 1, prev[j - 1] + cost)
+        prev = current
+    return prev[m] / max(n, m, 1)
+
+
+def _linear_line_keys(texts: list[str], dist_max: float) -> list[str]:
+    """逐个键比较完整编辑距离的原始写法，作为索引查找的基准。"""
+
+    existing: list[str] = []
+    keys = []
+    for base in texts:
+        for key in existing:
+            if base == key or _full_distance(base, key) <= dist_max:
+                keys.append(key)
+                break
+        else:
+            existing.append(base)
+            keys.append(base)
+    return keys
+
+
+def test_line_key_index_matches_linear_scan() -> None:
+    rng = random.Random(13)
+    seeds = ["".join(rng.choice("甲乙丙丁戊己") for _ in range(rng.randint(3, 16))) for _ in range(12)]
+    texts = []
+    for _ in range(150):
+        text = list(rng.choice(seeds))
+        for _ in range(rng.randint(0, 4)):
+            op = rng.randrange(3)
+            pos = rng.randrange(len(text) + 1)
+            if op == 0:
+                text.insert(pos, rng.choice("甲乙丙丁戊己"))
+            elif text and pos < len(text):
+                if op == 1:
+                    del text[pos]
+                else:
+                    text[pos] = rng.choice("甲乙丙丁戊己")
+        texts.append("".join(text) or "_")
+    for dist_max in (0.0, 0.1, 0.15, 0.3, 0.6):
+        index = repeat_detect._LineKeyIndex(dist_max)
+        assert [index.assign(text) for text in texts] == _linear_line_keys(texts, dist_max)
+
+
 def _repeat_candidate(**kwargs) -> RepeatCandidate:
     defaults = dict(
         line_key="line",
@@ -106,6 +158,72 @@ def test_select_best_path_prefers_latest_versions() -> None:
     assert all(row["candidate_id"] in result.best_ids for row in result.path_rows)
 
 
+def _quadratic_best_ids(candidates, *, epsilon, gap_threshold, bonus_late, penalty_pre, penalty_gap):
+    """原二重循环实现，作为 ``select_best_path`` 的回归基准。"""
+
+    ordered = sorted(candidates, key=lambda c: (c.t0, c.t1, c.candidate_id))
+    n = len(ordered)
+    scores = [0.0] * n
+    prev = [-1] * n
+    epsilon = max(0.0, float(epsilon))
+    threshold = max(0.0, float(gap_threshold))
+    for idx, candidate in enumerate(ordered):
+        base = _candidate_value(candidate, bonus_late, penalty_pre)[0]
+        scores[idx] = base
+        for j in range(idx):
+            if ordered[j].t1 > candidate.t0 + epsilon:
+                continue
+            penalty = _gap_penalty(candidate.t0 - ordered[j].t1, threshold, epsilon, penalty_gap)
+            value = scores[j] + base + penalty
+            if value > scores[idx]:
+                scores[idx] = value
+                prev[idx] = j
+    best_ids = []
+    cursor = max(range(n), key=lambda i: (scores[i], ordered[i].t1))
+    while cursor >= 0:
+        best_ids.append(ordered[cursor].candidate_id)
+        cursor = prev[cursor]
+    return best_ids[::-1]
+
+
+def _random_candidates(rng: random.Random, count: int, step: float) -> list[RepeatCandidate]:
+    candidates = []
+    for candidate_id in range(count):
+        t0 = rng.randrange(0, 200) * step
+        rank = rng.randint(1, 3)
+        candidates.append(
+            _repeat_candidate(
+                candidate_id=candidate_id,
+                line_idx=rng.randrange(0, 30),
+                t0=t0,
+                t1=t0 + rng.randrange(0, 12) * step,
+                score=rng.randrange(-8, 8) * 0.25,
+                length=rng.randrange(0, 30),
+                rank=rank,
+                is_last=rank == 3 or rng.random() < 0.3,
+            )
+        )
+    return candidates
+
+
+def test_select_best_path_matches_quadratic_reference() -> None:
+    rng = random.Random(12)
+    for trial in range(60):
+        # 0.25 步长下浮点加法精确，平局大量出现，用来校验平局规则
+        step = 0.25 if trial % 2 == 0 else 0.1
+        candidates = _random_candidates(rng, rng.randint(1, 120), step)
+        params = dict(
+            epsilon=rng.choice([0.0, 0.25, 0.5]),
+            gap_threshold=rng.choice([0.0, 1.0, 5.0]),
+            bonus_late=rng.choice([0.0, 0.25, 0.5]),
+            penalty_pre=rng.choice([0.0, -0.5, -2.0]),
+            penalty_gap=rng.choice([0.0, -0.25, -1.0]),
+        )
+        result = select_best_path(candidates, **params)
+        assert result.best_ids == _quadratic_best_ids(candidates, **params)
+        assert [row["candidate_id"] for row in result.path_rows] == result.best_ids
+
+
 def test_smart_split_honors_hard_punct_left_attach() -> None:
     text = "甲。乙。丙，丁。"
     segments = smart_split(
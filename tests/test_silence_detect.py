@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import math
+import struct
+import sys
+import wave
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from onepass.silence_detect import analyze_audio, detect_silence, envelope_from_samples
+
+RATE = 8000
+
+
+def _tone(seconds: float, amplitude: float) -> list[float]:
+    count = int(round(seconds * RATE))
+    return [amplitude * math.sin(2 * math.pi * 440 * i / RATE) for i in range(count)]
+
+
+def _write_wav(path: Path, samples: list[float], channels: int = 1) -> Path:
+    with wave.open(str(path), "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(RATE)
+        writer.writeframes(b"".join(struct.pack("<h", int(value * 32767)) for value in samples))
+    return path
+
+
+def _approx(ranges, expected, tol=0.011) -> bool:
+    return len(ranges) == len(expected) and all(
+        abs(a - c) <= tol and abs(b - d) <= tol for (a, b), (c, d) in zip(ranges, expected)
+    )
+
+
+def test_wav_silence_ranges_follow_threshold_and_min_duration(tmp_path: Path) -> None:
+    samples = _tone(0.5, 0.5) + [0.0] * int(0.3 * RATE) + _tone(0.5, 0.5)
+    samples += [0.0] * int(0.1 * RATE) + _tone(0.3, 0.5) + [0.0] * int(0.4 * RATE)
+    audio = _write_wav(tmp_path / "a.wav", samples)
+    envelope = analyze_audio(audio)
+    assert envelope is not None
+    assert envelope.duration == pytest.approx(len(samples) / RATE)
+    ranges = envelope.detect(-35.0, 0.18)
+    assert _approx(ranges, [(0.5, 0.8), (1.7, 2.1)])
+    assert _approx(envelope.detect(-35.0, 0.05), [(0.5, 0.8), (1.3, 1.4), (1.7, 2.1)])
+    assert detect_silence(audio, -35.0, 0.18) == ranges
+
+
+def test_detect_many_matches_individual_runs() -> None:
+    samples = _tone(0.4, 0.5) + _tone(0.4, 0.01) + _tone(0.4, 0.5) + _tone(0.4, 0.001)
+    envelope = envelope_from_samples(samples, RATE)
+    params = [(-30.0, 0.2), (-45.0, 0.2), (-70.0, 0.2), (-30.0, 0.5)]
+    sweep = envelope.detect_many(params)
+    for noise_db, min_d in params:
+        assert sweep[(noise_db, min_d)] == envelope.detect(noise_db, min_d)
+    assert _approx(sweep[(-30.0, 0.2)], [(0.4, 0.8), (1.2, 1.6)])
+    assert _approx(sweep[(-45.0, 0.2)], [(1.2, 1.6)])
+    assert sweep[(-70.0, 0.2)] == []
+    assert sweep[(-30.0, 0.5)] == []
+
+
+def test_peak_requires_every_channel_quiet_and_rms_is_optional() -> None:
+    left = _tone(1.0, 0.5)
+    right = [0.0] * RATE
+    interleaved = [value for pair in zip(left, right) for value in pair]
+    envelope = envelope_from_samples(interleaved, RATE, channels=2)
+    assert envelope.duration == pytest.approx(1.0)
+    assert envelope.detect(-35.0, 0.1) == []
+    spike = [0.0] * RATE
+    spike[RATE // 2] = 0.05  # 峰值约 -26 dB，所在帧 RMS 约 -45 dB
+    single = envelope_from_samples(spike, RATE)
+    assert len(single.detect(-35.0, 0.1)) == 2
+    assert single.detect(-35.0, 0.1, measure="rms") == [(0.0, 1.0)]
+    with pytest.raises(ValueError):
+        single.detect(measure="loudness")
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from onepass import silence_probe  # noqa: E402
+from onepass.boundary import snap_segment, snap_segments  # noqa: E402
+from onepass.silence_probe import SilenceIndex, nearest_silence_boundary  # noqa: E402
+
+
+def _random_ranges(rng: random.Random, count: int) -> list[tuple[float, float]]:
+    ranges = []
+    cursor = 0.0
+    for _ in range(count):
+        cursor += round(rng.uniform(0.05, 2.0), 2)
+        length = round(rng.uniform(0.05, 0.8), 2)
+        ranges.append((cursor, cursor + length))
+        cursor += length
+    return ranges
+
+
+def _reference_snap(t0, t1, ranges, radius, min_duration):
+    start, end = t0, t1
+    new_start = nearest_silence_boundary(start, ranges, radius)
+    new_end = nearest_silence_boundary(end, ranges, radius)
+    if new_start is not None and new_start < end:
+        start = new_start
+    if new_end is not None and new_end > start:
+        end = new_end
+    label = {
+        (True, True): "both",
+        (True, False): "start",
+        (False, True): "end",
+        (False, False): "no-snap",
+    }[(new_start is not None, new_end is not None)]
+    end = max(end, start)
+    return start, end, label, end - start < min_duration
+
+
+def test_silence_index_matches_linear_scan(monkeypatch):
+    rng = random.Random(11)
+    ranges = _random_ranges(rng, 60)
+    horizon = ranges[-1][1] + 1.0
+    # 包含恰好位于两边界中点的查询，覆盖距离相同的取舍
+    queries = [round(rng.uniform(-1.0, horizon), 2) for _ in range(400)]
+    queries += [(ranges[i][1] + ranges[i + 1][0]) / 2 for i in range(len(ranges) - 1)]
+    index = SilenceIndex.from_ranges(ranges)
+    for radius in (0.0, 0.1, 0.35, 5.0):
+        expected = [nearest_silence_boundary(t, ranges, radius) for t in queries]
+        assert [index.nearest(t, radius) for t in queries] == expected
+        assert index.nearest_many(queries, radius) == expected
+        monkeypatch.setattr(silence_probe, "np", None)
+        assert index.nearest_many(queries, radius) == expected
+        monkeypatch.undo()
+
+
+def test_snap_segments_matches_per_segment_snap():
+    rng = random.Random(5)
+    ranges = _random_ranges(rng, 40)
+    horizon = ranges[-1][1]
+    spans = []
+    for _ in range(200):
+        start = round(rng.uniform(0.0, horizon), 2)
+        spans.append((start, start + round(rng.uniform(0.01, 3.0), 2)))
+    index = SilenceIndex.from_ranges(ranges)
+    batched = snap_segments(spans, index, 0.3, 0.2)
+    assert batched == [snap_segment(t0, t1, ranges, 0.3, 0.2) for t0, t1 in spans]
+    assert batched == [_reference_snap(t0, t1, ranges, 0.3, 0.2) for t0, t1 in spans]
+    assert snap_segments(spans, [], 0.3, 0.2) == [snap_segment(t0, t1, None, 0.3, 0.2) for t0, t1 in spans]
+
+
+def test_compute_passes_prebuilt_index_to_snap(tmp_path, monkeypatch):
+    from onepass import retake_keep_last
+    from onepass.asr_loader import Word
+
+    lines = ["甲乙丙丁戊己庚辛", "子丑寅卯辰巳午未"]
+    words = []
+    cursor = 0.0
+    for line in lines:
+        for ch in line:
+            words.append(Word(text=ch, start=cursor, end=cursor + 0.2))
+            cursor += 0.25
+        cursor += 0.6
+    script = tmp_path / "demo.txt"
+    script.write_text("\n".join(lines), encoding="utf-8")
+    seen = []
+    original = retake_keep_last._apply_silence_snap
+
+    def _spy(*args, **kwargs):
+        seen.append(kwargs.get("silence_index"))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(retake_keep_last, "_apply_silence_snap", _spy)
+    silences = [(1.95, 2.55)]
+    retake_keep_last.compute_retake_keep_last(words, script, pause_align=False, silence_ranges=silences)
+    assert len(seen) == 1 and isinstance(seen[0], SilenceIndex)
+    assert seen[0].boundaries == SilenceIndex.from_ranges(silences).boundaries
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import pytest
+
+from onepass.asr_loader import Word, WordArray, load_words
+from onepass.match_core import build_token_stream
+from onepass.retake_keep_last import _word_range_to_time, infer_pause_boundaries
+
+
+def _random_words(seed: int, count: int) -> list[Word]:
+    rng = random.Random(seed)
+    alphabet = ["甲", "乙丙", "a", "", "，", "Hello", "丁戊己"]
+    words = []
+    cursor = 0.0
+    for _ in range(count):
+        start = round(cursor, 3)
+        end = round(cursor + rng.uniform(0.05, 0.4), 3)
+        words.append(Word(text=rng.choice(alphabet), start=start, end=end))
+        cursor = end + rng.choice([0.0, 0.05, 0.5])
+    return words
+
+
+def test_word_array_matches_word_list() -> None:
+    words = _random_words(3, 80)
+    packed = WordArray.from_words(words)
+    assert len(packed) == len(words)
+    assert list(packed) == words
+    assert packed == words
+    assert packed.texts() == [word.text for word in words]
+    assert packed[-1] == words[-1]
+    assert packed[5:17] == words[5:17]
+    assert packed[::-3] == words[::-3]
+    assert WordArray.from_words(packed) is packed
+    with pytest.raises(IndexError):
+        packed[len(words)]
+
+
+def test_word_array_time_lookups_match_word_list() -> None:
+    words = _random_words(7, 120)
+    packed = WordArray.from_words(words)
+    for lo in range(0, 120, 7):
+        for hi in range(lo, 120, 11):
+            assert _word_range_to_time((lo, hi), packed) == _word_range_to_time((lo, hi), words)
+    assert infer_pause_boundaries(packed, 0.3) == infer_pause_boundaries(list(words), 0.3)
+
+
+def test_load_words_returns_sorted_word_array(tmp_path: Path) -> None:
+    payload = {
+        "segments": [
+            {
+                "words": [
+                    {"word": "乙", "start": 0.5, "end": 0.8},
+                    {"word": "甲", "start": 0.1, "end": 0.4},
+                    {"word": "丙", "start": 0.5, "end": 0.6},
+                ]
+            }
+        ]
+    }
+    path = tmp_path / "demo.words.json"
+    path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    doc = load_words(path)
+    assert isinstance(doc.words, WordArray)
+    assert [(word.text, word.start, word.end) for word in doc] == [
+        ("甲", 0.1, 0.4),
+        ("丙", 0.5, 0.6),
+        ("乙", 0.5, 0.8),
+    ]
+
+
+def test_token_stream_from_word_array_matches_dicts() -> None:
+    words = _random_words(11, 60)
+    payload = [{"text": word.text, "start": word.start, "end": word.end} for word in words]
+    packed = build_token_stream(WordArray.from_words(words), None)
+    plain = build_token_stream(payload, None)
+    assert packed.canonical_text == plain.canonical_text
+    assert packed.raw_text == plain.raw_text
+    assert packed.char_boundaries == plain.char_boundaries
+    assert list(packed.starts) == [word.start for word in words]
+    assert list(packed.ends) == [word.end for word in words]
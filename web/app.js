@@ -875,10 +875,10 @@ async function requestRender(force = false) {
     const payload = await fetchJson(`${API_BASE}/render`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ stem: state.selectedStem.stem, force, format: "wav" }),
+      body: JSON.stringify({ stem: state.selectedStem.stem, force, format: "wav", engine: "pcm" }),
     })
     state.renderedAudioToken = payload.path_token || null
-    showToast(payload.skipped ? "剪辑音频已存在，未重复渲染。" : "剪辑音频渲染完成！", "success")
+    showToast(payload.skipped ? "剪辑音频已是最新，未重复渲染。" : "剪辑音频渲染完成！", "success")
     if (!payload.skipped && payload.path_token) {
       loadAudioFromToken(payload.path_token, "剪辑音频")
       setPlaybackMode("rendered")